@@ -15,36 +15,89 @@ The Day/Stout/Warren (DSW) Algorithm
 http://penguin.ewu.edu/~trolfe/DSWpaper/
 """
 
+from bstvis.tree import cost
 
-def dsw(t, advanced=True):
+# The granularity of the snapshots (calls of t.view()), from coarse to fine.
+# Each one includes the coarser ones.
+PHASE = 'phase'          # before, after the vine and at the end
+COMPRESS = 'compress'    # after every compress pass
+ROTATION = 'rotation'    # after every rotation
+SNAPSHOTS = (None, PHASE, COMPRESS, ROTATION)
+
+
+def dsw(t, advanced=True, snapshots=None, root=None):
     """
     Day algorithm - almost perfect binary search tree if advanced is False.
     Warren, Stoud algorithm - perfect binary search tree if advanced is True.
+
+    Both run in O(n) time. Snapshots are not: every t.view() lays out and
+    copies the whole tree when a TreeView is attached.
+
+    Args:
+        t (BinaryTree): The tree to rebalance.
+        advanced (bool, optional): Build a perfect tree, default True.
+        snapshots (str, optional): Call t.view() per PHASE, per COMPRESS
+            pass or per ROTATION, default None, i.e. never.
+        root (Node, optional): Rebalance only the subtree of this node in
+            O(size of the subtree), default t.root. The heights of its
+            ancestors are updated.
+
+    Returns:
+        int: The number of rotations.
     """
-    p = t.root
+    level = SNAPSHOTS.index(snapshots)
+    view_phase = level >= SNAPSHOTS.index(PHASE)
+    view_compress = level >= SNAPSHOTS.index(COMPRESS)
+    view_rotation = level >= SNAPSHOTS.index(ROTATION)
+
+    p = t.root if root is None else root
     if not p:
-        return
-    t.view(highlight_nodes=[p])
+        return 0
+    if view_phase:
+        t.view(highlight_nodes=[p])
+
+    # The subtree hangs below top_parent (None for the whole tree). Its
+    # root changes with the rotations.
+    top_parent = p.parent
+    top_is_left = top_parent is not None and top_parent.left == p
+
+    def top():
+        """The current root of the subtree."""
+        if top_parent is None:
+            return t.root
+        return top_parent.left if top_is_left else top_parent.right
 
     # n is the number of nodes.
     n = 1
+    # Node.rotate counts the rotations for cost.active, we count them for
+    # the return value and the pointer moves.
+    rotations = 0
+    moves = 0
 
     # Phase 1: Make a right leaning chain/linked list (vine)
     #  - Go to the maximum node.
     while p.right:
         p = p.right
-        # t.view(highlight_nodes=[p])
+        moves += 1
 
     # Go up and rotate all left children.
-    while p.left or p.parent:
+    while True:
         while p.left:
             p.left.rotate()
-            # t.view(highlight_nodes=[p])
+            rotations += 1
+            if view_rotation:
+                t.view(highlight_nodes=[p])
+
+        if p.parent is top_parent:
+            break
+        p = p.parent
+        n += 1
+        moves += 1
 
-        if p.parent:
-            p = p.parent
-            n += 1
-            # t.view(highlight_nodes=[p])
+    if cost.active is not None:
+        cost.active.moves += moves
+    if view_phase:
+        t.view(highlight_nodes=[top()])
 
     # Phase 2: Compress the tree by rotating every other node.
     # TODO: Explain Phase 2.
@@ -56,8 +109,14 @@ def dsw(t, advanced=True):
         for c in range(count):
             p = p.right
             p.rotate()
-            t.view(highlight_nodes=[p])
+            if view_rotation:
+                t.view(highlight_nodes=[p])
             p = p.right
+        if cost.active is not None:
+            cost.active.moves += 2 * count
+        if view_compress and count:
+            t.view(highlight_nodes=[top()])
+        return count
 
     # Day - almost perfect binary tree
     if not advanced:
@@ -68,7 +127,7 @@ def dsw(t, advanced=True):
 
         while m > 0:
             # Rotate m times.
-            compress(t.root, m)
+            rotations += compress(top(), m)
 
             n -= m + 1
             m = n//2
@@ -77,10 +136,18 @@ def dsw(t, advanced=True):
     else:
         d = (1 << (n+1).bit_length() - 1) - 1
 
-        compress(t.root, n - d)
+        rotations += compress(top(), n - d)
         while d > 0:
             d //= 2
-            compress(t.root, d)
+            rotations += compress(top(), d)
+
+    # The size of the subtree is the same, but its height changed.
+    if top_parent is not None:
+        top_parent._update_path()
+
+    if view_phase:
+        t.view(highlight_nodes=[top()])
+    return rotations
 
 
 def main():
@@ -100,8 +167,7 @@ def main():
 
     t.view()
 
-    dsw(t, advanced=False)
-    t.view()
+    dsw(t, advanced=False, snapshots=ROTATION)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Wilber's lower bounds for the cost of an access sequence in the BST model.
+
+Interleave bound (Wilber 1):
+    Take the perfect reference tree P of the keys (the tree TangoTree starts
+    with). For every node y of P label each access to its subtree 'left' if
+    the key is in the left subtree of y or is y itself and 'right' otherwise.
+    The bound is the sum over all y of the number of label changes.
+    Every BST needs at least interleave / 2 - n operations.
+
+Funnel bound (Wilber 2):
+    The funnel of an access to x are the keys y accessed before such that no
+    key between x and y (including x) was accessed after the last access to
+    y. The bound is the sum over all accesses of the number of times the
+    funnel, ordered by time, alternates between keys left and right of x.
+
+    The funnel keys right of x are the prefix maxima of the last access
+    times going right from x which are greater than the last access of x
+    (and symmetric on the left). Going back in time the funnel consists of
+    runs of keys on the same side. A run on the right ends at the first key
+    right of x accessed after every funnel key on the left, so each run is
+    found with one query on a segment tree of the last access times.
+
+R. Wilber - Lower Bounds for Accessing Binary Search Trees with Rotations
+E. Demaine, D. Harmon, J. Iacono, M. Patrascu - Dynamic Optimality - Almost
+"""
+
+from array import array
+
+from bstvis.tree.flat import NIL
+from bstvis.tree.naive import perfect_split
+
+
+def reference_tree(n):
+    """
+    The perfect reference tree P of n keys as arrays indexed by the position
+    of the key, i.e. it has the same shape as the tree built by
+    TangoTree.from_sorted().
+
+    Returns:
+        tuple: (root, left, right) - the root and the children (or NIL).
+    """
+    left = array('q', [NIL]) * n
+    right = array('q', [NIL]) * n
+    if n == 0:
+        return NIL, left, right
+
+    root = perfect_split(n)
+    # The stack contains (node, lo, hi) where keys[lo:hi] is its subtree.
+    stack = [(root, 0, n)]
+    while stack:
+        mid, lo, hi = stack.pop()
+        if lo < mid:
+            child = lo + perfect_split(mid - lo)
+            left[mid] = child
+            stack.append((child, lo, mid))
+        if mid + 1 < hi:
+            child = mid + 1 + perfect_split(hi - mid - 1)
+            right[mid] = child
+            stack.append((child, mid + 1, hi))
+    return root, left, right
+
+
+def interleave_bound(keys, accesses):
+    """
+    Compute Wilber's interleave bound in O(m log n).
+
+    Args:
+        keys (list): The sorted keys.
+        accesses (iterable): The accessed keys, each in keys.
+
+    Returns:
+        int: The number of label changes over all nodes of P.
+    """
+    index = {key: i for i, key in enumerate(keys)}
+    root, left, right = reference_tree(len(keys))
+
+    # The label of the last access through each node of P:
+    # 0 - none yet, 1 - left (or the node itself), 2 - right.
+    last = bytearray(len(keys))
+
+    bound = 0
+    for key in accesses:
+        i = index[key]
+        y = root
+        while True:
+            label = 1 if i <= y else 2
+            previous = last[y]
+            if previous != label:
+                if previous:
+                    bound += 1
+                last[y] = label
+            if i < y:
+                y = left[y]
+            elif i > y:
+                y = right[y]
+            else:
+                break
+    return bound
+
+
+def funnel_bound(keys, accesses):
+    """
+    Compute Wilber's funnel bound in O((m + bound) log n).
+
+    Each access costs O(log n) per alternation of its funnel, independent of
+    the size of the funnel.
+
+    Args:
+        keys (list): The sorted keys.
+        accesses (iterable): The accessed keys, each in keys.
+
+    Returns:
+        int: The number of alternations over all funnels.
+    """
+    index = {key: i for i, key in enumerate(keys)}
+    times = LastAccess(len(keys))
+
+    bound = 0
+    for t, key in enumerate(accesses):
+        i = index[key]
+        last = times.get(i)
+
+        # The funnel keys not yet consumed are the keys accessed after last
+        # up to time left_max left of i and up to time right_max right of i.
+        # A run ends at the key nearest to i accessed after the other side.
+        left_max = times.max(0, i)
+        right_max = times.max(i + 1, len(keys))
+        right = right_max > left_max
+        while max(left_max, right_max) > last:
+            if right:
+                # consume the run of funnel keys accessed after left_max
+                _, right_max = times.first_after(i + 1, max(left_max, last))
+                if left_max <= last:
+                    break
+            else:
+                _, left_max = times.last_after(i, max(right_max, last))
+                if right_max <= last:
+                    break
+            bound += 1
+            right = not right
+
+        times.set(i, t)
+    return bound
+
+
+class LastAccess(object):
+
+    """
+    The last access times of n keys (-1 for none yet) in a max segment tree.
+
+    Args:
+        n (int): The number of keys.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        size = 1
+        while size < n:
+            size *= 2
+        self.size = size
+        # tree[size + i] is the time of key i, tree[j] the maximum of the
+        # children 2 * j and 2 * j + 1
+        self.tree = array('q', [-1]) * (2 * size)
+
+    def get(self, i):
+        """Returns the time of key i."""
+        return self.tree[self.size + i]
+
+    def set(self, i, t):
+        """Set the time of key i to t, which is greater than all times."""
+        tree = self.tree
+        i += self.size
+        while i:
+            tree[i] = t
+            i >>= 1
+
+    def max(self, lo, hi):
+        """Returns the maximum time of the keys in range(lo, hi) or -1."""
+        tree = self.tree
+        m = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                if tree[lo] > m:
+                    m = tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if tree[hi] > m:
+                    m = tree[hi]
+            lo >>= 1
+            hi >>= 1
+        return m
+
+    def first_after(self, lo, time):
+        """
+        Find the first key i >= lo accessed after time.
+
+        Returns:
+            tuple: (i, m) - the key or n if there is none and the maximum
+                time of the keys in range(lo, i) or -1.
+        """
+        if lo >= self.n:
+            return self.n, -1
+        tree = self.tree
+        # The subtrees skipped on the way partition range(lo, i).
+        m = -1
+        i = lo + self.size
+        while tree[i] <= time:
+            if tree[i] > m:
+                m = tree[i]
+            # continue with the subtree right of i
+            while i & 1:
+                i >>= 1
+            if i == 0:
+                return self.n, m
+            i += 1
+        while i < self.size:
+            i *= 2
+            if tree[i] <= time:
+                if tree[i] > m:
+                    m = tree[i]
+                i += 1
+        return i - self.size, m
+
+    def last_after(self, hi, time):
+        """
+        Find the last key i < hi accessed after time (see first_after()).
+
+        Returns:
+            tuple: (i, m) - the key or -1 if there is none and the maximum
+                time of the keys in range(i + 1, hi) or -1.
+        """
+        if hi <= 0:
+            return -1, -1
+        tree = self.tree
+        m = -1
+        i = hi - 1 + self.size
+        while tree[i] <= time:
+            if tree[i] > m:
+                m = tree[i]
+            # continue with the subtree left of i
+            while not i & 1:
+                i >>= 1
+            if i == 1:
+                return -1, m
+            i -= 1
+        while i < self.size:
+            i = 2 * i + 1
+            if tree[i] <= time:
+                if tree[i] > m:
+                    m = tree[i]
+                i -= 1
+        return i - self.size, m
@@ -0,0 +1,9 @@
+"""
+Benchmarks for the tree implementations.
+
+Each module has a main() and can be run with
+    python3 -m bstvis.bench.<module>
+
+bstvis.bench.workloads generates access sequences and bstvis.bench.replay
+replays them against any tree.
+"""
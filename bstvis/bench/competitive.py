@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare the cost of the trees with Wilber's lower bounds.
+
+The cost of an access in the BST model is the number of nodes touched,
+i.e. the pointer moves plus the rotations plus one for the root. Dividing
+the total cost by the interleave and the funnel bound (see
+bstvis.algorithm.wilber) estimates how far a tree is from optimal on a
+sequence. Constant factors of the bounds are ignored, so only compare the
+ratios with each other.
+
+    python3 -m bstvis.bench.competitive [n] [m] [file]
+"""
+
+import sys
+
+from bstvis.algorithm.wilber import funnel_bound, interleave_bound
+from bstvis.bench import workloads
+from bstvis.bench.replay import replay
+from bstvis.tree.multisplay import MultiSplayTree
+from bstvis.tree.rb import RBTree
+from bstvis.tree.splay import SplayTree
+from bstvis.tree.tango_strict import TangoTree
+
+TREES = [
+    ('RBTree', RBTree.from_sorted),
+    ('SplayTree', SplayTree.from_sorted),
+    ('TangoTree', TangoTree.from_sorted),
+    ('MultiSplayTree', MultiSplayTree.from_sorted),
+]
+
+
+def access_cost(result):
+    """
+    Returns the number of nodes touched by the accesses of a replay.
+    """
+    return (result.costs['moves'] + result.costs['rotations'] +
+            result.accesses)
+
+
+def report(keys, sequence, trees=TREES):
+    """
+    Compute the bounds for a sequence and the cost of each tree.
+
+    Args:
+        keys (list): The sorted keys.
+        sequence (callable): Returns a new iterator over the accesses. It is
+            called once for each bound and each tree, so the sequence is
+            never kept in memory.
+        trees (list, optional): (name, build) tuples where build(keys)
+            returns a tree, default RBTree, SplayTree, TangoTree and
+            MultiSplayTree (see TREES).
+
+    Returns:
+        dict: 'interleave' and 'funnel' -> bound and
+            tree name -> (cost, cost / interleave, cost / funnel).
+    """
+    interleave = interleave_bound(keys, sequence())
+    funnel = funnel_bound(keys, sequence())
+    result = {'interleave': interleave, 'funnel': funnel}
+
+    for name, build in trees:
+        cost = access_cost(replay(build(keys), sequence()))
+        result[name] = (cost,
+                        cost / interleave if interleave else float('inf'),
+                        cost / funnel if funnel else float('inf'))
+    return result
+
+
+def main(n=1000, m=10000, path=None):
+    keys = list(range(n))
+
+    if path is not None:
+        sequences = [(path, lambda: workloads.read(path))]
+    else:
+        sequences = [(name, lambda workload=workload: workload(n, m))
+                     for name, workload in workloads.WORKLOADS.items()]
+
+    for name, sequence in sequences:
+        r = report(keys, sequence)
+        print("{}: interleave bound {}, funnel bound {}".format(
+            name, r['interleave'], r['funnel']))
+        for tree_name, _ in TREES:
+            cost, to_interleave, to_funnel = r[tree_name]
+            print("{:>14}: cost {:>9}, {:6.2f} x interleave, "
+                  "{:6.2f} x funnel".format(
+                      tree_name, cost, to_interleave, to_funnel))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:2]), *args[2:3])
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare pointer-based searches with the frozen layouts.
+
+The same perfect tree is searched as a NaiveBST built with from_sorted()
+(NaiveBST._search) and frozen in the Eytzinger and van Emde Boas layout
+(see bstvis.tree.frozen). The accesses are uniform and half of them are
+misses. With NumPy the vectorized batch search of the layouts is timed as
+well.
+
+    python3 -m bstvis.bench.frozen [n] [m]
+"""
+
+import random
+import sys
+import time
+
+from bstvis.tree.frozen import LAYOUTS
+from bstvis.tree.naive import NaiveBST
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def timed(search, keys):
+    """Returns the seconds to search all keys, ignoring KeyErrors."""
+    start = time.perf_counter()
+    for key in keys:
+        try:
+            search(key)
+        except KeyError:
+            pass
+    return time.perf_counter() - start
+
+
+def main(n=1000000, m=1000000):
+    random.seed(0)
+
+    # Even keys are in the tree, odd keys are misses.
+    t = NaiveBST.from_sorted(list(range(0, 2*n, 2)))
+    keys = [random.randrange(2*n) for _ in range(m)]
+
+    print("{} keys, {} searches".format(n, m))
+    print("{:>10} {:>10} {:>8}".format('tree', 'search', 'seconds'))
+    print("{:>10} {:>10} {:>8.3f}".format(
+        'NaiveBST', 'pointer', timed(t._search, keys)))
+    for layout in LAYOUTS:
+        frozen = t.freeze(layout)
+        print("{:>10} {:>10} {:>8.3f}".format(
+            layout, 'scalar', timed(frozen.__contains__, keys)))
+        if np is not None:
+            batch = np.array(keys)
+            start = time.perf_counter()
+            frozen.contains_many(batch)
+            print("{:>10} {:>10} {:>8.3f}".format(
+                layout, 'numpy', time.perf_counter() - start))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measure the memory used per node for each tree type.
+
+The memory is measured with tracemalloc, i.e. it includes everything that is
+allocated while the tree is built (nodes and the tree object) but not the
+keys themselves.
+
+    python3 -m bstvis.bench.memory [n]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from bstvis.tree.naive import NaiveBST
+from bstvis.tree.rb import RBTree
+from bstvis.tree.splay import SplayTree
+from bstvis.tree.tango_strict import TangoTree
+
+
+def _build_insert(tree_class):
+    def build(keys):
+        t = tree_class()
+        for key in keys:
+            t.insert(key)
+        return t
+    return build
+
+
+TREE_BUILDERS = [
+    ('NaiveBST', _build_insert(NaiveBST)),
+    ('RBTree', _build_insert(RBTree)),
+    ('SplayTree', _build_insert(SplayTree)),
+    ('TangoTree', lambda keys: TangoTree(keys)),
+]
+
+
+def bytes_per_node(build, keys):
+    """
+    Build a tree from keys and return the number of bytes allocated per key.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t = build(keys)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del t
+    return (after - before) / len(keys)
+
+
+def main(n=1000000):
+    random.seed(0)
+
+    keys = list(range(n))
+    random.shuffle(keys)
+
+    print("{} keys".format(n))
+    for name, build in TREE_BUILDERS:
+        print("{:>10}: {:8.1f} bytes/node".format(
+            name, bytes_per_node(build, keys)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
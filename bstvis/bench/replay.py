@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Replay access sequences against a tree.
+
+    t = SplayTree.from_sorted(list(range(n)))
+    result = replay(t, workloads.zipf(n, m))
+    print(result)
+
+The accesses are consumed lazily, so the sequence can be a generator from
+bstvis.bench.workloads or a file streamed with workloads.read().
+
+    python3 -m bstvis.bench.replay [n] [m] [file]
+"""
+
+import random
+import sys
+import time
+
+from bstvis.bench import workloads
+from bstvis.tree.cost import CostCounter
+
+
+class ReplayResult(object):
+
+    """
+    The measurements of a replay.
+
+    Attributes:
+        accesses (int): The number of accesses.
+        misses (int): The number of accessed keys which were not found.
+        seconds (float): The total time of the accesses.
+        costs (dict): operation -> count (see bstvis.tree.cost) or None.
+        latencies (list): A uniform sample of the latencies in seconds.
+    """
+
+    def __init__(self, accesses, misses, seconds, costs, latencies):
+        self.accesses = accesses
+        self.misses = misses
+        self.seconds = seconds
+        self.costs = costs
+        self.latencies = sorted(latencies)
+
+    @property
+    def ops_per_sec(self):
+        return self.accesses / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q):
+        """
+        Returns the q-th percentile (0 <= q <= 100) of the latency sample in
+        seconds.
+        """
+        if not self.latencies:
+            return 0.0
+        i = round(q / 100 * (len(self.latencies) - 1))
+        return self.latencies[i]
+
+    def per_access(self, operation):
+        """Returns the average count of operation per access."""
+        if not self.costs or not self.accesses:
+            return 0.0
+        return self.costs[operation] / self.accesses
+
+    def __str__(self):
+        lines = ["{} accesses ({} misses) in {:.3f} s: {:.0f} ops/s".format(
+            self.accesses, self.misses, self.seconds, self.ops_per_sec)]
+        if self.costs:
+            lines.append("per access: " + ", ".join(
+                "{:.1f} {}".format(self.per_access(operation), operation)
+                for operation in CostCounter.FIELDS))
+        lines.append("latency: " + ", ".join(
+            "p{} {:.1f} us".format(q, self.percentile(q) * 1e6)
+            for q in (50, 90, 99, 100)))
+        return "\n".join(lines)
+
+
+def replay(t, accesses, operation='search', count_costs=True,
+           sample_size=10000, seed=0):
+    """
+    Apply an operation to every key of an access sequence.
+
+    Args:
+        t (BinaryTree): The tree.
+        accesses (iterable): The keys to access.
+        operation (str, optional): The name of the method of t to call with
+            each key, default 'search'. A KeyError counts as a miss.
+        count_costs (bool, optional): Count the operations of the tree with
+            a CostCounter, default True. Counting slows the accesses down a
+            little.
+        sample_size (int, optional): The number of latencies to keep. They
+            are sampled uniformly from all accesses (reservoir sampling), so
+            the memory does not grow with the sequence, default 10000.
+        seed (int, optional): The seed for the sampling, default 0.
+
+    Returns:
+        ReplayResult: The measurements.
+    """
+    access = getattr(t, operation)
+    rng = random.Random(seed)
+    clock = time.perf_counter
+    sample = []
+    count = 0
+    misses = 0
+    total = 0.0
+
+    counter = CostCounter() if count_costs else None
+    if counter is not None:
+        counter.__enter__()
+    try:
+        for key in accesses:
+            start = clock()
+            try:
+                access(key)
+            except KeyError:
+                misses += 1
+            latency = clock() - start
+
+            total += latency
+            if count < sample_size:
+                sample.append(latency)
+            else:
+                i = rng.randrange(count + 1)
+                if i < sample_size:
+                    sample[i] = latency
+            count += 1
+    finally:
+        if counter is not None:
+            counter.__exit__(None, None, None)
+
+    return ReplayResult(count, misses, total,
+                        counter.counts() if counter is not None else None,
+                        sample)
+
+
+def main(n=10000, m=100000, path=None):
+    from bstvis.tree.rb import RBTree
+    from bstvis.tree.splay import SplayTree
+    from bstvis.tree.tango_strict import TangoTree
+
+    keys = list(range(n))
+    trees = [('RBTree', RBTree.from_sorted),
+             ('SplayTree', SplayTree.from_sorted),
+             ('TangoTree', TangoTree.from_sorted)]
+
+    if path is not None:
+        sequences = [(path, lambda: workloads.read(path))]
+    else:
+        sequences = [(name, lambda workload=workload: workload(n, m))
+                     for name, workload in workloads.WORKLOADS.items()]
+
+    for name, sequence in sequences:
+        for tree_name, build in trees:
+            print("{} on {}:".format(name, tree_name))
+            print(replay(build(keys), sequence()))
+            print()
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:2]), *args[2:3])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare bottom-up and top-down splaying.
+
+Both variants search the same access sequence on a splay tree built from the
+same keys. For every access distribution the number of pointer moves and
+rotations (see bstvis.tree.cost) and the wall time are reported. The time
+is measured in a separate run without counting.
+
+    python3 -m bstvis.bench.splay [n] [m]
+"""
+
+import random
+import sys
+
+from bstvis.bench import workloads
+from bstvis.bench.replay import replay
+from bstvis.tree.splay import SplayTree
+
+WORKLOADS = ['uniform', 'sequential', 'zipf']
+
+
+def build(keys, top_down):
+    """Insert keys into a new splay tree."""
+    t = SplayTree(top_down=top_down)
+    for key in keys:
+        t.insert(key)
+    return t
+
+
+def main(n=100000, m=1000000):
+    random.seed(0)
+
+    keys = list(range(n))
+    random.shuffle(keys)
+
+    print("{} keys, {} accesses".format(n, m))
+    print("{:>10} {:>10} {:>12} {:>12} {:>8}".format(
+        'workload', 'splay', 'moves', 'rotations', 'seconds'))
+    for name in WORKLOADS:
+        workload = workloads.WORKLOADS[name]
+        for top_down in (False, True):
+            costs = replay(build(keys, top_down), workload(n, m)).costs
+            seconds = replay(build(keys, top_down), workload(n, m),
+                             count_costs=False).seconds
+            print("{:>10} {:>10} {:>12} {:>12} {:>8.3f}".format(
+                name, 'top-down' if top_down else 'bottom-up',
+                costs['moves'], costs['rotations'], seconds))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
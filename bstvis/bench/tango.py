@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compare the access throughput of TangoTree, MultiSplayTree, RBTree and
+SplayTree.
+
+Every tree holds the keys range(n) and searches the same access sequence.
+The accesses per second and the operations per access (see
+bstvis.tree.cost) are reported for each access distribution.
+
+    python3 -m bstvis.bench.tango [n] [m]
+"""
+
+import sys
+
+from bstvis.bench import workloads
+from bstvis.bench.replay import replay
+from bstvis.tree.multisplay import MultiSplayTree
+from bstvis.tree.rb import RBTree
+from bstvis.tree.splay import SplayTree
+from bstvis.tree.tango_strict import TangoTree
+
+TREES = [
+    ('TangoTree', TangoTree.from_sorted),
+    ('MultiSplayTree', MultiSplayTree.from_sorted),
+    ('RBTree', RBTree.from_sorted),
+    ('SplayTree', SplayTree.from_sorted),
+]
+
+
+def main(n=100000, m=10000):
+    keys = list(range(n))
+    print("{} keys, {} accesses".format(n, m))
+    print("{:>15} {:>14} {:>10} {:>8} {:>10} {:>8}".format(
+        'workload', 'tree', 'access/s', 'moves', 'rotations', 'writes'))
+    for name, workload in workloads.WORKLOADS.items():
+        for tree_name, build in TREES:
+            result = replay(build(keys), workload(n, m))
+            rate = replay(build(keys), workload(n, m),
+                          count_costs=False).ops_per_sec
+            print("{:>15} {:>14} {:>10.0f} {:>8.1f} {:>10.1f} {:>8.1f}".format(
+                name, tree_name, rate, result.per_access('moves'),
+                result.per_access('rotations'), result.per_access('writes')))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Generators for access sequences on the keys range(n).
+
+All generators are lazy and take a seed, so the same sequence can be
+replayed against several trees without keeping it in memory:
+
+    uniform         independent uniformly random keys
+    sequential      0, 1, ..., n - 1, 0, 1, ... (sequential access)
+    working_set     mostly keys which were accessed recently
+    dynamic_finger  a random walk with small steps
+    zipf            few keys are accessed very often
+    bit_reversal    the bit reversal permutation, bad for most static trees
+
+deepest() is adversarial: it always accesses a deepest node of the tree.
+
+Sequences bigger than the memory can be written to a file with write() and
+streamed with read().
+"""
+
+import itertools
+import random
+from array import array
+from collections import deque
+
+
+def uniform(n, m, seed=0):
+    """m keys drawn uniformly from range(n)."""
+    rng = random.Random(seed)
+    for _ in range(m):
+        yield rng.randrange(n)
+
+
+def sequential(n, m, seed=0):
+    """The keys 0, 1, ..., n - 1 repeated until there are m of them."""
+    for i in range(m):
+        yield i % n
+
+
+def working_set(n, m, seed=0, w=64, p=0.9):
+    """
+    With probability p access one of the last w accessed keys, otherwise a
+    uniformly random key.
+    """
+    rng = random.Random(seed)
+    recent = deque(maxlen=w)
+    for _ in range(m):
+        if recent and rng.random() < p:
+            key = recent[rng.randrange(len(recent))]
+        else:
+            key = rng.randrange(n)
+        recent.append(key)
+        yield key
+
+
+def dynamic_finger(n, m, seed=0, d=16):
+    """
+    A random walk over the keys where each step moves at most d keys.
+    """
+    rng = random.Random(seed)
+    key = rng.randrange(n)
+    for _ in range(m):
+        key = min(max(key + rng.randint(-d, d), 0), n - 1)
+        yield key
+
+
+def zipf(n, m, seed=0, s=1.0):
+    """
+    m keys where the k-th most popular key has probability proportional to
+    1 / k^s. The popularity is shuffled over the keys.
+    """
+    rng = random.Random(seed)
+    keys = list(range(n))
+    rng.shuffle(keys)
+    cum_weights = list(itertools.accumulate(
+        1 / (k + 1) ** s for k in range(n)))
+    chunk = 4096
+    for i in range(0, m, chunk):
+        yield from rng.choices(keys, cum_weights=cum_weights,
+                               k=min(chunk, m - i))
+
+
+def bit_reversal(n, m, seed=0):
+    """
+    The keys in bit reversal order, i.e. key i is accessed at position
+    reverse(i), repeated until there are m of them.
+
+    Raises:
+        ValueError: If m keys are requested from an empty range(n).
+    """
+    if n <= 0:
+        if m > 0:
+            raise ValueError("Can not access {} keys of range({})".format(
+                m, n))
+        return
+    bits = (n - 1).bit_length()
+    count = 0
+    while True:
+        for i in range(1 << bits):
+            key = int(format(i, '0{}b'.format(bits))[::-1], 2) if bits else 0
+            if key < n:
+                if count == m:
+                    return
+                yield key
+                count += 1
+
+
+def deepest(t, m):
+    """
+    Adversarial sequence: always access a deepest node of the tree t.
+
+    Uses the height of the nodes to descend, so each key costs O(height).
+    """
+    for _ in range(m):
+        p = t.root
+        if p is None:
+            return
+        while p.left is not None or p.right is not None:
+            left_height = p.left.height if p.left is not None else -1
+            right_height = p.right.height if p.right is not None else -1
+            p = p.left if left_height >= right_height else p.right
+        yield p.key
+
+
+WORKLOADS = {
+    'uniform': uniform,
+    'sequential': sequential,
+    'working_set': working_set,
+    'dynamic_finger': dynamic_finger,
+    'zipf': zipf,
+    'bit_reversal': bit_reversal,
+}
+
+
+def write(path, keys, chunk=65536):
+    """
+    Write a sequence of integer keys to a file (64 bit each).
+
+    The keys are consumed lazily, so the sequence does not have to fit
+    into memory.
+
+    Returns:
+        int: The number of keys written.
+    """
+    count = 0
+    keys = iter(keys)
+    with open(path, 'wb') as f:
+        while True:
+            buf = array('q', itertools.islice(keys, chunk))
+            if not buf:
+                return count
+            buf.tofile(f)
+            count += len(buf)
+
+
+def read(path, chunk=65536):
+    """
+    Generate the keys of a file written by write() chunk by chunk.
+    """
+    itemsize = array('q').itemsize
+    with open(path, 'rb') as f:
+        while True:
+            buf = array('q')
+            buf.frombytes(f.read(chunk * itemsize))
+            if not buf:
+                return
+            yield from buf
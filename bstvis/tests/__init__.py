@@ -1 +1 @@
-import test_bintree
\ No newline at end of file
+from . import test_bintree
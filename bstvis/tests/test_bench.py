@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+from bstvis.bench import workloads
+from bstvis.bench.replay import replay
+from bstvis.tree.naive import NaiveBST
+from bstvis.tree.splay import SplayTree
+
+
+class TestWorkloads(unittest.TestCase):
+
+    def test_generators(self):
+        n, m = 100, 1000
+        for name, workload in workloads.WORKLOADS.items():
+            keys = list(workload(n, m, seed=1))
+            self.assertEqual(len(keys), m, name)
+            self.assertTrue(all(0 <= key < n for key in keys), name)
+            self.assertEqual(keys, list(workload(n, m, seed=1)), name)
+
+    def test_bit_reversal(self):
+        self.assertEqual(list(workloads.bit_reversal(8, 8)),
+                         [0, 4, 2, 6, 1, 5, 3, 7])
+        self.assertEqual(sorted(workloads.bit_reversal(6, 6)), list(range(6)))
+        self.assertEqual(list(workloads.bit_reversal(1, 3)), [0, 0, 0])
+        self.assertEqual(list(workloads.bit_reversal(0, 0)), [])
+        self.assertRaises(ValueError, list, workloads.bit_reversal(0, 5))
+
+    def test_deepest(self):
+        t = NaiveBST()
+        for key in (3, 1, 5, 4):
+            t.insert(key)
+        self.assertEqual(list(workloads.deepest(t, 2)), [4, 4])
+
+    def test_file(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            keys = list(workloads.zipf(50, 1000))
+            self.assertEqual(workloads.write(path, iter(keys), chunk=64),
+                             1000)
+            self.assertEqual(list(workloads.read(path, chunk=100)), keys)
+        finally:
+            os.remove(path)
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_replay(self):
+        t = SplayTree.from_sorted(list(range(100)))
+        result = replay(t, list(range(150)), sample_size=10)
+        self.assertEqual(result.accesses, 150)
+        self.assertEqual(result.misses, 50)
+        self.assertEqual(len(result.latencies), 10)
+        self.assertGreater(result.costs['rotations'], 0)
+        self.assertLessEqual(result.percentile(50), result.percentile(100))
+
+        result = replay(t, [], count_costs=False)
+        self.assertIsNone(result.costs)
+        self.assertEqual(result.ops_per_sec, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,18 @@
 import random
 import unittest
 
+from bstvis.tree.bintree import Node
+from bstvis.tree.flat import FlatBST, FlatRBTree, FlatSplayTree
+from bstvis.tree.naive import NaiveBST
+from bstvis.tree.rb import RBTree
+from bstvis.tree.splay import SplayTree
+from bstvis.algorithm import dsw as dsw_module
+from bstvis.algorithm.dsw import dsw
+from bstvis.tree.cost import CostCounter
+from bstvis.tree.rb import RBNode, BLACK
+from bstvis.tree.tango_strict import TangoNode, TangoTree
+from bstvis.util import node_fields
+
 class TestSequenceFunctions(unittest.TestCase):
 
     def setUp(self):
@@ -25,5 +37,280 @@ class TestSequenceFunctions(unittest.TestCase):
         for element in random.sample(self.seq, 5):
             self.assertTrue(element in self.seq)
 
+class TestNodeFields(unittest.TestCase):
+
+    def test_slots(self):
+        for node in (Node(1), RBNode(1), TangoNode(1)):
+            self.assertFalse(hasattr(node, '__dict__'))
+
+    def test_node_fields(self):
+        fields = node_fields(RBNode(1, 'a', color=BLACK, bh=1))
+        self.assertEqual(fields['key'], 1)
+        self.assertEqual(fields['data'], 'a')
+        self.assertEqual(fields['color'], BLACK)
+        self.assertEqual(fields['bh'], 1)
+        self.assertIsNone(fields['parent'])
+
+    def test_node_fields_dict_fallback(self):
+        class DictNode(Node):
+            __slots__ = ('__dict__',)
+
+        node = DictNode(1)
+        node.info = 'extra'
+        fields = node_fields(node)
+        self.assertEqual(fields['key'], 1)
+        self.assertEqual(fields['info'], 'extra')
+
+class TestTraversals(unittest.TestCase):
+
+    def setUp(self):
+        #     4
+        #    / \
+        #   2   5
+        #  / \   \
+        # 1   3   6
+        self.t = NaiveBST()
+        for key in [4, 2, 5, 1, 3, 6]:
+            self.t.insert(key)
+
+    def keys(self, nodes):
+        return [node.key for node in nodes]
+
+    def test_traversals(self):
+        self.assertEqual(self.keys(self.t.inorder()), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(self.keys(self.t.preorder()), [4, 2, 1, 3, 5, 6])
+        self.assertEqual(self.keys(self.t.postorder()), [1, 3, 2, 6, 5, 4])
+        self.assertEqual(self.keys(self.t.level_order()), [4, 2, 5, 1, 3, 6])
+        self.assertEqual(self.t.root.preorder(), [4, 2, 1, 3, 5, 6])
+
+    def test_subtree(self):
+        left = self.t.root.left
+        self.assertEqual(self.keys(self.t.inorder(left)), [1, 2, 3])
+
+    def test_empty(self):
+        t = NaiveBST()
+        self.assertEqual(list(t.inorder()), [])
+        self.assertEqual(list(t.postorder()), [])
+        self.assertEqual(t.height(), -1)
+
+    def test_degenerated(self):
+        # sorted inserts create a vine deeper than the recursion limit
+        t = NaiveBST()
+        n = 5000
+        for key in range(n):
+            t.insert(key)
+        self.assertEqual(t.height(), n - 1)
+        self.assertEqual(self.keys(t.inorder()), list(range(n)))
+        self.assertEqual(len(list(t.postorder())), n)
+        self.assertEqual(len(repr(t).splitlines()), n)
+
+def check_augmentation(test, node):
+    """Assert size and height of all subtrees and return them."""
+    if node is None:
+        return 0, -1
+    left_size, left_height = check_augmentation(test, node.left)
+    right_size, right_height = check_augmentation(test, node.right)
+    test.assertEqual(node.size, left_size + right_size + 1)
+    test.assertEqual(node.height, max(left_height, right_height) + 1)
+    return node.size, node.height
+
+class TestAugmentation(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.keys = list(range(200))
+        random.shuffle(self.keys)
+
+    def test_insert(self):
+        for tree_class in (NaiveBST, RBTree, SplayTree):
+            t = tree_class()
+            for key in self.keys:
+                t.insert(key)
+                check_augmentation(self, t.root)
+            self.assertEqual(len(t), len(self.keys))
+
+    def test_delete(self):
+        for tree_class in (NaiveBST, RBTree, SplayTree):
+            t = tree_class()
+            for key in self.keys:
+                t.insert(key)
+            for key in self.keys[:150]:
+                self.assertTrue(t.delete(key))
+                self.assertFalse(t.delete(key))
+                check_augmentation(self, t.root)
+            self.assertEqual([node.key for node in t.inorder()],
+                             sorted(self.keys[150:]))
+            for key in self.keys[150:]:
+                self.assertTrue(t.delete(key))
+            self.assertIsNone(t.root)
+
+    def test_rotations(self):
+        t = NaiveBST()
+        for key in self.keys:
+            t.insert(key)
+        dsw(t)
+        check_augmentation(self, t.root)
+        self.assertEqual(t.height(), 7)
+
+    def test_order_statistics(self):
+        keys = list(range(0, 200, 2))
+        shuffled = keys[:]
+        random.shuffle(shuffled)
+        for tree_class in (NaiveBST, RBTree, SplayTree,
+                           FlatBST, FlatRBTree, FlatSplayTree):
+            inserted = tree_class()
+            for key in shuffled:
+                inserted.insert(key)
+            for t in (tree_class.from_sorted(keys), inserted):
+                check_augmentation(self, t.root)
+                self.assertEqual(len(t), 100)
+                for i in range(100):
+                    self.assertEqual(t.select(i), 2 * i)
+                    self.assertEqual(t.rank(2 * i), i)
+                    self.assertEqual(t.rank(2 * i + 1), i + 1)
+                self.assertRaises(IndexError, t.select, 100)
+
+class TestSearchMany(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.keys = list(range(0, 200, 2))
+        random.shuffle(self.keys)
+        self.queries = [random.randrange(-10, 210) for _ in range(500)]
+
+    def test_search_many(self):
+        for t in (NaiveBST(), RBTree(), SplayTree(),
+                  SplayTree(top_down=True)):
+            for key in self.keys:
+                t.insert(key, str(key))
+            expected = [str(key) if key in self.keys else None
+                        for key in self.queries]
+            self.assertEqual(t.search_many(self.queries, default=None),
+                             expected)
+            self.assertEqual(t.contains_many(self.queries),
+                             [e is not None for e in expected])
+            self.assertEqual(t.search_many([]), [])
+            self.assertRaises(KeyError, t.search_many, [0, 1])
+            check_augmentation(self, t.root)
+
+    def test_tango(self):
+        t = TangoTree(range(12), [str(i) for i in range(12)])
+        self.assertEqual(t.search_many([11, 4, 20, 0, 8, 2, 6], None),
+                         ['11', '4', None, '0', '8', '2', '6'])
+
+        # the batch costs the same as accessing the keys in sorted order
+        batch = [11, 4, 20, -1, 0, 8, 2, 6]
+        t = TangoTree(range(12))
+        with CostCounter() as batch_cost:
+            t.search_many(batch, None)
+        t = TangoTree(range(12))
+        with CostCounter() as single_cost:
+            for key in sorted(batch):
+                if 0 <= key < 12:
+                    t.search(key)
+        self.assertEqual(batch_cost.counts(), single_cost.counts())
+
+
+class TestRange(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        keys = list(range(0, 100, 2))
+        random.shuffle(keys)
+        self.t = RBTree()
+        for key in keys:
+            self.t.insert(key, str(key))
+
+    def test_range(self):
+        self.assertEqual(list(self.t.range(11, 20)), [12, 14, 16, 18])
+        self.assertEqual(list(self.t.range(10, 11)), [10])
+        self.assertEqual(list(self.t.range(hi=5)), [0, 2, 4])
+        self.assertEqual(list(self.t.range(95)), [96, 98])
+        self.assertEqual(list(self.t.range(50, 50)), [])
+        self.assertEqual(list(self.t.range()), list(range(0, 100, 2)))
+        self.assertEqual(list(self.t.items(3, 7)), [(4, '4'), (6, '6')])
+
+    def test_cursor(self):
+        c = self.t.cursor(31)
+        self.assertEqual((c.key, c.data), (32, '32'))
+        self.assertTrue(c.predecessor())
+        self.assertEqual(c.key, 30)
+
+        c = self.t.cursor()
+        keys = [c.key]
+        while c.successor():
+            keys.append(c.key)
+        self.assertEqual(keys, list(range(0, 100, 2)))
+        self.assertFalse(c)
+        self.assertFalse(self.t.cursor(99))
+
+
+class TestCost(unittest.TestCase):
+
+    def test_search(self):
+        t = NaiveBST.from_sorted(list(range(7)))
+        with CostCounter() as cost:
+            t.search(0)
+        self.assertEqual(cost.counts(), {'moves': 2, 'rotations': 0,
+                                         'comparisons': 3, 'writes': 0})
+        self.assertRaises(KeyError, t.search, 7)
+        self.assertEqual(cost.moves, 2)
+
+    def test_nested(self):
+        t = NaiveBST()
+        with CostCounter() as outer:
+            for key in range(10):
+                t.insert(key)
+            with CostCounter() as inner:
+                dsw(t)
+        self.assertEqual(inner.rotations, 7)
+        self.assertEqual(inner.writes, 14)
+        self.assertEqual(outer.rotations, 7)
+        self.assertEqual(outer.moves, 36 + inner.moves)
+
+
+class TestDSW(unittest.TestCase):
+
+    class Viewer(object):
+        """Count the snapshots instead of drawing them."""
+
+        def __init__(self):
+            self.views = 0
+
+        def view(self, *args, **kwargs):
+            self.views += 1
+
+    def test_snapshots(self):
+        views = {}
+        for snapshots in dsw_module.SNAPSHOTS:
+            t = NaiveBST()
+            t._viewer = viewer = self.Viewer()
+            for key in range(100):
+                t.insert(key)
+            with CostCounter() as cost:
+                rotations = dsw(t, snapshots=snapshots)
+            self.assertEqual(rotations, cost.rotations)
+            self.assertEqual(t.height(), 6)
+            check_augmentation(self, t.root)
+            views[snapshots] = viewer.views
+
+        self.assertEqual(views[None], 0)
+        self.assertEqual(views[dsw_module.PHASE], 3)
+        self.assertGreater(views[dsw_module.COMPRESS], 3)
+        self.assertEqual(views[dsw_module.ROTATION],
+                         views[dsw_module.COMPRESS] + rotations)
+
+    def test_subtree(self):
+        t = NaiveBST()
+        for key in [50] + list(range(100)):
+            t.insert(key)
+        dsw(t, root=t.root.right)
+        self.assertEqual(t.root.key, 50)
+        self.assertEqual(t.root.right.height, 5)
+        self.assertEqual(t.root.left.height, 49)
+        check_augmentation(self, t.root)
+        self.assertEqual([p.key for p in t.inorder()], list(range(100)))
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,106 @@
+import pickle
+import random
+import unittest
+
+from bstvis.tree.flat import FlatBST, FlatRBTree, FlatSplayTree
+from bstvis.tree.naive import NaiveBST
+from bstvis.tree.rb import RBTree
+from bstvis.tree.splay import SplayTree
+from bstvis.tests.test_bintree import check_augmentation
+
+
+def same_shape(a, b, fields=('key',)):
+    if a is None or b is None:
+        return a is None and b is None
+    return (all(getattr(a, f) == getattr(b, f) for f in fields) and
+            same_shape(a.left, b.left, fields) and
+            same_shape(a.right, b.right, fields))
+
+
+class TestFlatTrees(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.keys = list(range(100))
+        random.shuffle(self.keys)
+
+    def test_like_pointer_trees(self):
+        for flat_class, tree_class, fields in (
+                (FlatBST, NaiveBST, ('key',)),
+                (FlatRBTree, RBTree, ('key', 'color', 'bh'))):
+            flat = flat_class()
+            t = tree_class()
+            for key in self.keys:
+                flat.insert(key)
+                t.insert(key)
+            self.assertTrue(same_shape(flat.root, t.root, fields))
+            check_augmentation(self, flat.root)
+            self.assertEqual(flat.height(), t.height())
+
+    def test_search(self):
+        for flat_class in (FlatBST, FlatRBTree, FlatSplayTree):
+            t = flat_class()
+            for key in self.keys:
+                self.assertTrue(t.insert(key, str(key)))
+            self.assertFalse(t.insert(self.keys[0], 'updated'))
+            for key in self.keys[1:]:
+                self.assertEqual(t.search(key), str(key))
+            self.assertEqual(t.search(self.keys[0]), 'updated')
+            self.assertRaises(KeyError, t.search, 100)
+
+    def test_search_many(self):
+        queries = [random.randrange(-10, 110) for _ in range(300)]
+        for flat_class in (FlatBST, FlatRBTree, FlatSplayTree):
+            t = flat_class()
+            for key in self.keys:
+                t.insert(key, str(key))
+            self.assertEqual(t.search_many(queries, default=None),
+                             [str(key) if 0 <= key < 100 else None
+                              for key in queries])
+
+    def test_delete_like_pointer_trees(self):
+        deletes = self.keys[::2] + [100, -1]
+        random.shuffle(deletes)
+        for flat_class, tree_class, fields in (
+                (FlatBST, NaiveBST, ('key',)),
+                (FlatRBTree, RBTree, ('key', 'color', 'bh')),
+                (FlatSplayTree, SplayTree, ('key',))):
+            flat = flat_class()
+            t = tree_class()
+            for key in self.keys:
+                flat.insert(key)
+                t.insert(key)
+            for key in deletes:
+                self.assertEqual(flat.delete(key), t.delete(key))
+                self.assertTrue(same_shape(flat.root, t.root, fields))
+                check_augmentation(self, flat.root)
+            self.assertEqual(len(flat), 50)
+
+            # deleted ids are reused
+            for key in self.keys[::2]:
+                flat.insert(key)
+                t.insert(key)
+            self.assertTrue(same_shape(flat.root, t.root, fields))
+            self.assertEqual(len(flat._keys), 100)
+
+    def test_arrays(self):
+        t = FlatBST()
+        for key in (1, 0, 2):
+            t.insert(key)
+        arrays = t.arrays()
+        # the tree can still grow while the copies are alive
+        t.insert(3)
+        self.assertEqual(list(arrays['left']), [1, -1, -1])
+        self.assertEqual(list(arrays['right']), [2, -1, -1])
+        self.assertEqual(list(t.arrays()['right']), [2, -1, 3, -1])
+
+    def test_pickle(self):
+        t = FlatRBTree()
+        for key in self.keys:
+            t.insert(key)
+        copy = pickle.loads(pickle.dumps(t))
+        self.assertTrue(same_shape(copy.root, t.root, ('key', 'color')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import unittest
+
+from bstvis.tree.cost import CostCounter
+from bstvis.tree.frozen import (EYTZINGER, LAYOUTS, VEB, FrozenTree,
+                                veb_order)
+from bstvis.tree.naive import NaiveBST
+from bstvis.tree.rb import RBTree
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestFrozenTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_search(self):
+        for n in (0, 1, 2, 3, 7, 8, 100):
+            keys = list(range(0, 2*n, 2))
+            t = NaiveBST.from_sorted(keys, [str(key) for key in keys])
+            for layout in LAYOUTS:
+                f = t.freeze(layout)
+                self.assertEqual(len(f), n)
+                self.assertEqual(f.keys(), keys)
+                for key in range(-1, 2*n + 1):
+                    if key in keys:
+                        self.assertEqual(f.search(key), str(key))
+                    else:
+                        self.assertNotIn(key, f)
+                        self.assertRaises(KeyError, f.search, key)
+
+    def test_same_cost(self):
+        # Both layouts encode the tree built by from_sorted(). The
+        # branch-free Eytzinger search always descends to the bottom.
+        keys = list(range(100))
+        t = NaiveBST.from_sorted(keys)
+        eytzinger = t.freeze(EYTZINGER)
+        veb = t.freeze(VEB)
+        for key in keys:
+            with CostCounter() as expected:
+                t.search(key)
+            with CostCounter() as actual:
+                veb.search(key)
+            self.assertEqual(actual.moves, expected.moves)
+            with CostCounter() as actual:
+                eytzinger.search(key)
+            self.assertIn(actual.moves, (5, 6))
+
+    def test_veb_order(self):
+        self.assertEqual(veb_order(15), [1, 2, 3, 4, 8, 9, 5, 10, 11,
+                                         6, 12, 13, 7, 14, 15])
+        self.assertEqual(sorted(veb_order(20)), list(range(1, 21)))
+
+    def test_batch(self):
+        t = RBTree()
+        for key in random.sample(range(1000), 300):
+            t.insert(key, -key)
+        queries = [random.randrange(1000) for _ in range(500)]
+        for layout in LAYOUTS:
+            f = t.freeze(layout)
+            self.assertEqual(f.contains_many(queries),
+                             [key in f for key in queries])
+            self.assertEqual(f.search_many(queries, None),
+                             t.search_many(queries, None))
+            self.assertRaises(KeyError, f.search_many, queries)
+
+    @unittest.skipIf(np is None, "requires numpy")
+    def test_numpy_batch(self):
+        keys = list(range(0, 200, 2))
+        queries = np.array([random.randrange(-5, 205) for _ in range(500)])
+        for layout in (EYTZINGER, VEB):
+            f = FrozenTree(keys, keys, layout)
+            contained = f.contains_many(queries)
+            self.assertIsInstance(contained, np.ndarray)
+            self.assertEqual(contained.tolist(),
+                             [key in f for key in queries.tolist()])
+            self.assertEqual(f.search_many(queries, None),
+                             f.search_many(queries.tolist(), None))
+
+    def test_layout(self):
+        self.assertRaises(ValueError, FrozenTree, [1, 2], layout='bfs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import random
+import unittest
+
+from bstvis.tree.splay import SplayTree
+from bstvis.util import node_fields
+from bstvis.viewer import SnapshotHistory, SpaceEfficientBinaryTreeLayout
+
+
+def create_snapshot(t, **info):
+    """Like TreeView._create_snapshot() without a window."""
+    pos = SpaceEfficientBinaryTreeLayout(800, 600).layout(t)
+    return {
+        'nodes': {node: (position, node_fields(node), [], None)
+                  for node, position in pos.items()},
+        'root': t.root,
+        'width': 800,
+        'height': 600,
+        'info': info,
+    }
+
+
+class TestSnapshotHistory(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.t = SplayTree()
+        self.snapshots = []
+        self.history = SnapshotHistory()
+        for i in range(300):
+            key = random.randrange(40)
+            if random.random() < 0.7:
+                self.t.insert(key)
+            else:
+                self.t.delete(key)
+            snapshot = create_snapshot(self.t, step=i)
+            self.snapshots.append(snapshot)
+            self.history.append(snapshot)
+
+    def test_getitem(self):
+        self.assertEqual(len(self.history), len(self.snapshots))
+        for i in [0, 299, 1, 150, 149, 151, 40, 298, -1]:
+            self.assertEqual(self.history[i], self.snapshots[i])
+
+    def test_seek(self):
+        i = 0
+        for _ in range(500):
+            j = max(0, min(299, i + random.choice((-1, 1, -5, 20, -100))))
+            old = self.snapshots[i]['nodes']
+            snapshot, changed = self.history.seek(j)
+            self.assertEqual(snapshot['nodes'], self.snapshots[j]['nodes'])
+            self.assertEqual(snapshot['info'], {'step': j})
+            for node in set(old) | set(snapshot['nodes']):
+                if old.get(node) != snapshot['nodes'].get(node):
+                    self.assertEqual(changed[node], old.get(node))
+                else:
+                    self.assertNotIn(node, changed)
+            i = j
+        self.assertRaises(IndexError, self.history.seek, 300)
+
+    def test_keyframes(self):
+        # The keyframes take at most as much memory as the deltas.
+        keyframe_size = sum(len(nodes) for nodes in
+                            self.history._keyframes.values())
+        delta_size = sum(len(delta) for delta in self.history._deltas)
+        self.assertLess(keyframe_size, delta_size + 40)
+        self.assertLess(delta_size, sum(len(s['nodes'])
+                                        for s in self.snapshots))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+from bstvis.tests.test_tango import check_aux_trees
+from bstvis.tree.events import EventCounter
+from bstvis.tree.multisplay import MultiSplayTree
+
+
+class TestMultiSplayTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_search(self):
+        for n in (1, 2, 7, 64, 100):
+            t = MultiSplayTree(range(n), [str(i) for i in range(n)])
+            for _ in range(50):
+                key = random.randrange(n)
+                p = t.search(key)
+                self.assertEqual((p.key, p.data), (key, str(key)))
+                self.assertIs(t.root, p)
+                check_aux_trees(self, t, red_black=False)
+            self.assertEqual([p.key for p in t.inorder()], list(range(n)))
+
+    def test_sequential(self):
+        # After a first pass the preferred paths change only a few times
+        # per access.
+        t = MultiSplayTree.from_sorted(list(range(128)))
+        for key in range(128):
+            t.search(key)
+        counter = EventCounter()
+        t.subscribe(counter)
+        for key in range(128):
+            t.search(key)
+        self.assertEqual(counter['access'], 128)
+        self.assertLess(counter['join'], 3 * 128)
+        check_aux_trees(self, t, red_black=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
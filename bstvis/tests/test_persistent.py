@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from bstvis.tree.persistent import PersistentTree
+from bstvis.tests.test_bintree import check_augmentation
+
+
+def check_avl(test, node):
+    """Assert that node is height-balanced."""
+    if node is None:
+        return
+    left = node.left.height if node.left else -1
+    right = node.right.height if node.right else -1
+    test.assertLessEqual(abs(left - right), 1)
+    test.assertIsNone(node.parent)
+    check_avl(test, node.left)
+    check_avl(test, node.right)
+
+
+def all_nodes(root):
+    stack = [root] if root else []
+    while stack:
+        p = stack.pop()
+        yield p
+        stack.extend(c for c in (p.left, p.right) if c is not None)
+
+
+class TestPersistentTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_versions(self):
+        t = PersistentTree()
+        expected = [{}]
+        for _ in range(1000):
+            key = random.randrange(100)
+            present = dict(expected[-1])
+            if random.random() < 0.6:
+                self.assertEqual(t.insert(key, -key), key not in present)
+                present[key] = -key
+            else:
+                self.assertEqual(t.delete(key), key in present)
+                if key not in present:
+                    continue
+                del present[key]
+            expected.append(present)
+
+        self.assertEqual(len(t.versions), len(expected))
+        for i, present in enumerate(expected):
+            v = t.version(i)
+            check_avl(self, v.root)
+            check_augmentation(self, v.root)
+            self.assertEqual(list(v.items()), sorted(present.items()))
+        self.assertIs(t.version(-1).root, t.root)
+
+    def test_sharing(self):
+        # Each version adds O(log n) nodes.
+        n = 1024
+        t = PersistentTree.from_sorted(list(range(0, 2*n, 2)))
+        for key in range(1, 2*n, 2):
+            t.insert(key)
+        nodes = set()
+        for root in t.versions:
+            nodes.update(id(p) for p in all_nodes(root))
+        self.assertLess(len(nodes), n + n * 3 * 11)
+        self.assertLessEqual(t.height(), 13)
+
+    def test_branch(self):
+        t = PersistentTree.from_sorted(list(range(10)))
+        t.delete(3)
+        old = t.version(0)
+        old.insert(20)
+        self.assertEqual(list(old.range()), list(range(10)) + [20])
+        self.assertEqual(list(t.range()), [0, 1, 2] + list(range(4, 10)))
+        self.assertEqual(list(t.version(0).range()), list(range(10)))
+        self.assertRaises(KeyError, t.search, 3)
+        self.assertEqual(t.select(3), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
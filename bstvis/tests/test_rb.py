@@ -0,0 +1,140 @@
+import random
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from bstvis.tree.rb import (RBTree, RED, BLACK, difference, intersection,
+                            union)
+
+
+def check_rb(test, node, parent=None):
+    """Assert the red-black properties and return the black-height."""
+    if node is None:
+        return 0
+    test.assertIs(node.parent, parent)
+    if node.color == RED:
+        test.assertIsNotNone(parent)
+        for child in (node.left, node.right):
+            test.assertTrue(child is None or child.color == BLACK)
+    if node.left:
+        test.assertLess(node.left.key, node.key)
+    if node.right:
+        test.assertGreater(node.right.key, node.key)
+    bh = check_rb(test, node.left, node)
+    test.assertEqual(bh, check_rb(test, node.right, node))
+    bh += node.color == BLACK
+    test.assertEqual(node.bh, bh)
+    return bh
+
+
+class TestRBTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_insert(self):
+        t = RBTree()
+        keys = list(range(200))
+        random.shuffle(keys)
+        for key in keys:
+            t.insert(key)
+        check_rb(self, t.root)
+        self.assertEqual(t.root.color, BLACK)
+
+    def test_delete(self):
+        t = RBTree()
+        present = set()
+        for i in range(2000):
+            key = random.randrange(100)
+            if random.random() < 0.5:
+                self.assertEqual(t.insert(key), key not in present)
+                present.add(key)
+            else:
+                self.assertEqual(t.delete(key), key in present)
+                present.discard(key)
+            check_rb(self, t.root)
+            if t.root:
+                self.assertEqual(t.root.color, BLACK)
+                self.assertIs(t.root.tree, t)
+
+    def test_from_sorted(self):
+        for n in range(70):
+            t = RBTree.from_sorted(list(range(n)), list(range(0, 2*n, 2)))
+            check_rb(self, t.root)
+            if n:
+                self.assertEqual(t.root.color, BLACK)
+                self.assertIs(t.root.tree, t)
+            for key in range(n):
+                self.assertEqual(t.search(key), 2 * key)
+
+    def test_split_join(self):
+        for n in (0, 1, 2, 10, 100):
+            for key in (-1, 0, n // 3, n // 3 + 0.5, n):
+                t = RBTree()
+                keys = random.sample(range(n), n)
+                for k in keys:
+                    t.insert(k)
+                left, right = t.split(key)
+                self.assertIsNone(t.root)
+                for part in (left, right):
+                    check_rb(self, part.root)
+                    if part.root:
+                        self.assertEqual(part.root.color, BLACK)
+                        self.assertIs(part.root.tree, part)
+                self.assertEqual([p.key for p in left.inorder()],
+                                 [k for k in range(n) if k < key])
+                self.assertEqual([p.key for p in right.inorder()],
+                                 [k for k in range(n) if k >= key])
+
+    def test_join(self):
+        # trees of very different black-heights
+        for n, m in ((0, 0), (0, 5), (5, 0), (1, 200), (200, 1), (50, 60)):
+            left = RBTree.from_sorted(list(range(n)))
+            right = RBTree()
+            for k in random.sample(range(n + 1, n + 1 + m), m):
+                right.insert(k)
+            t = RBTree.join(left, n, right, data='pivot')
+            self.assertIsNone(left.root)
+            self.assertIsNone(right.root)
+            check_rb(self, t.root)
+            self.assertEqual(t.root.color, BLACK)
+            self.assertIs(t.root.tree, t)
+            self.assertEqual([p.key for p in t.inorder()],
+                             list(range(n + 1 + m)))
+            self.assertEqual(t.search(n), 'pivot')
+            self.assertEqual(t.root.size, n + 1 + m)
+
+    def test_set_operations(self):
+        operations = [(union, set.union), (intersection, set.intersection),
+                      (difference, set.difference)]
+
+        def build(keys, data):
+            t = RBTree()
+            for key in keys:
+                t.insert(key, data)
+            return t
+
+        def check(executor=None, grain=65536):
+            a = set(random.sample(range(200), random.randrange(100)))
+            b = set(random.sample(range(200), random.randrange(100)))
+            for operation, expected in operations:
+                t1, t2 = build(a, 1), build(b, 2)
+                t = operation(t1, t2, executor, grain)
+                self.assertIsNone(t1.root)
+                self.assertIsNone(t2.root)
+                check_rb(self, t.root)
+                if t.root:
+                    self.assertIs(t.root.tree, t)
+                    self.assertEqual(t.root.size, len(expected(a, b)))
+                self.assertEqual([(p.key, p.data) for p in t.inorder()],
+                                 [(key, 2 if key in b and
+                                   operation is union else 1)
+                                  for key in sorted(expected(a, b))])
+
+        for _ in range(20):
+            check()
+        with ProcessPoolExecutor(2) as executor:
+            check(executor, grain=16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from bstvis.tree.rb import RBTree
+from bstvis.tree.tango_strict import TangoTree
+from bstvis.algorithm.dsw import dsw
+from bstvis.tree.naive import NaiveBST
+from bstvis.viewer import TreeView, export, render
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+class TestHeadless(unittest.TestCase):
+
+    def test_export(self):
+        t = RBTree()
+        tv = TreeView(t, node_attributes=['bh'], headless=True)
+        for key in range(10):
+            t.insert(key)
+            tv.view(highlight_nodes=[t.root])
+        self.assertEqual(len(tv.snapshots), 11)
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = tv.export(directory, frames_per_snapshot=2)
+            self.assertEqual(len(paths), 22)
+            self.assertEqual(sorted(os.listdir(directory)),
+                             [os.path.basename(path) for path in paths])
+
+            root = ET.parse(paths[-1]).getroot()
+            circles = root.findall(SVG + 'circle')
+            self.assertEqual(len(circles), 10)
+            self.assertEqual({c.get('fill') for c in circles},
+                             {'red', 'black'})
+            # 9 edges and the highlight arrow
+            self.assertEqual(len(root.findall(SVG + 'line')), 10)
+
+            # The first frame of a step is between the two snapshots.
+            self.assertNotEqual(read(paths[-2]), read(paths[-1]))
+
+    def test_tango(self):
+        t = TangoTree(list(range(15)))
+        tv = TreeView(t, headless=True)
+        t.search(3)
+        tv.view()
+        svg = render.SVGRenderer().render(tv.snapshots[-1])
+        root = ET.fromstring(svg)
+        lines = root.findall(SVG + 'line')
+        self.assertEqual(len(lines), 14)
+        self.assertTrue(any(l.get('stroke') == 'blue' for l in lines))
+        self.assertTrue(any(l.get('stroke-dasharray') for l in lines))
+
+    @unittest.skipIf(render.cairosvg is not None, "cairosvg is installed")
+    def test_png_requires_cairosvg(self):
+        self.assertRaises(ImportError, render.write, '<svg/>', 'x.png', 'png')
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        t = NaiveBST()
+        self.tv = TreeView(t, headless=True)
+        for key in range(20):
+            t.insert(key)
+        dsw(t, snapshots='compress')
+
+    def test_parallel(self):
+        with tempfile.TemporaryDirectory() as directory:
+            serial = self.tv.export(os.path.join(directory, 'serial'),
+                                    frames_per_snapshot=3, workers=1)
+            parallel = self.tv.export(os.path.join(directory, 'parallel'),
+                                      frames_per_snapshot=3, workers=2)
+            self.assertEqual(len(serial), 3 * len(self.tv.snapshots))
+            for a, b in zip(serial, parallel):
+                self.assertEqual(read(a), read(b))
+
+    def test_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            trace = os.path.join(directory, 'dsw.trace')
+            count = export.save_trace(self.tv.snapshots, trace, 2)
+            self.assertEqual(count, 2 * len(self.tv.snapshots))
+            self.assertEqual(list(export.load_trace(trace)),
+                             list(export.scenes(self.tv.snapshots, 2)))
+
+            path = os.path.join(directory, 'dsw.svg')
+            export.main([trace, path, '--format', 'animated-svg',
+                         '--workers', '2'])
+            root = ET.parse(path).getroot()
+            groups = root.findall(SVG + 'g')
+            self.assertEqual(len(groups), count)
+            self.assertEqual(groups[-1].find(SVG + 'set').get('fill'),
+                             'freeze')
+
+
+if __name__ == '__main__':
+    unittest.main()
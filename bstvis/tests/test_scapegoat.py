@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from bstvis.tree.cost import CostCounter
+from bstvis.tree.scapegoat import ScapegoatTree
+from bstvis.tests.test_bintree import check_augmentation
+
+
+class TestScapegoatTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def check_height(self, t):
+        n = len(t)
+        if n:
+            self.assertLessEqual(t.root.height, t.max_height(n) + 1)
+
+    def test_sorted_insert(self):
+        t = ScapegoatTree()
+        for key in range(500):
+            self.assertTrue(t.insert(key, str(key)))
+            self.check_height(t)
+        check_augmentation(self, t.root)
+        self.assertFalse(t.insert(3, 'x'))
+        self.assertEqual(t.search(3), 'x')
+        self.assertEqual([p.key for p in t.inorder()], list(range(500)))
+
+    def test_random(self):
+        for alpha in (0.55, 0.7, 0.9):
+            t = ScapegoatTree(alpha)
+            present = set()
+            for _ in range(2000):
+                key = random.randrange(300)
+                if random.random() < 0.6:
+                    self.assertEqual(t.insert(key), key not in present)
+                    present.add(key)
+                else:
+                    self.assertEqual(t.delete(key), key in present)
+                    present.discard(key)
+                self.check_height(t)
+            check_augmentation(self, t.root)
+            self.assertEqual([p.key for p in t.inorder()], sorted(present))
+
+    def test_amortized_cost(self):
+        # Rebuilds are local, so sorted inserts cost O(log n) amortized and
+        # not O(n) per insert.
+        t = ScapegoatTree()
+        n = 4096
+        with CostCounter() as cost:
+            for key in range(n):
+                t.insert(key)
+        self.assertLess(cost.rotations, 2 * n * 12)
+        self.assertLess(cost.moves, 10 * n * 12)
+
+    def test_alpha(self):
+        self.assertRaises(ValueError, ScapegoatTree, 0.5)
+        self.assertRaises(ValueError, ScapegoatTree, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+from bstvis.tree.cost import CostCounter
+from bstvis.tree.splay import SplayTree
+
+
+def check_tree(test, t):
+    """Assert parent pointers, size and order of all nodes of t."""
+    keys = []
+    for p in t.inorder():
+        keys.append(p.key)
+        for child in (p.left, p.right):
+            if child:
+                test.assertIs(child.parent, p)
+        test.assertEqual(p.size, 1 + (p.left.size if p.left else 0) +
+                         (p.right.size if p.right else 0))
+    test.assertEqual(keys, sorted(keys))
+    if t.root:
+        test.assertIsNone(t.root.parent)
+        test.assertIs(t.root.tree, t)
+    return keys
+
+
+class TestSplayTree(unittest.TestCase):
+
+    top_down = False
+
+    def setUp(self):
+        random.seed(0)
+        self.keys = list(range(100))
+        random.shuffle(self.keys)
+        self.t = SplayTree(top_down=self.top_down)
+        for key in self.keys:
+            self.t.insert(key, str(key))
+
+    def test_search(self):
+        for key in self.keys:
+            self.assertEqual(self.t.search(key), str(key))
+            self.assertEqual(self.t.root.key, key)
+        self.assertRaises(KeyError, self.t.search, 100)
+        check_tree(self, self.t)
+
+    def test_delete(self):
+        self.assertTrue(self.t.delete(50))
+        self.assertFalse(self.t.delete(50))
+        self.assertRaises(KeyError, self.t.search, 50)
+        self.assertEqual(len(self.t), 99)
+        self.assertIsNone(self.t.root.parent)
+        self.assertIs(self.t.root.tree, self.t)
+        for key in self.keys[:60]:
+            self.t.delete(key)
+        self.assertEqual(check_tree(self, self.t),
+                         sorted(set(self.keys[60:]) - {50}))
+
+    def test_split_join(self):
+        left, right = self.t.split(42.5)
+        self.assertIsNone(self.t.root)
+        self.assertEqual(check_tree(self, left), list(range(43)))
+        self.assertEqual(check_tree(self, right), list(range(43, 100)))
+
+        t = SplayTree.join(left, right)
+        self.assertIsNone(left.root)
+        self.assertIsNone(right.root)
+        self.assertEqual(check_tree(self, t), list(range(100)))
+        self.assertEqual(t.top_down, self.top_down)
+
+        left, right = t.split(0)
+        self.assertIsNone(left.root)
+        self.assertEqual(len(right), 100)
+        left, right = right.split(100)
+        self.assertIsNone(right.root)
+        self.assertEqual(check_tree(self, SplayTree.join(left, right)),
+                         list(range(100)))
+
+    def test_join_cost(self):
+        left = SplayTree.from_sorted(list(range(15)))
+        left.top_down = self.top_down
+        right = SplayTree.from_sorted(list(range(15, 20)))
+        with CostCounter() as counter:
+            t = SplayTree.join(left, right)
+        # the maximum of the perfect tree is 3 moves below the root and
+        # is found without comparisons
+        self.assertEqual(counter.moves, 3)
+        self.assertEqual(counter.comparisons, 0)
+        self.assertEqual(check_tree(self, t), list(range(20)))
+
+
+class TestTopDownSplayTree(TestSplayTree):
+
+    top_down = True
+
+
+if __name__ == '__main__':
+    unittest.main()
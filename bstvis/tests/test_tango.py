@@ -0,0 +1,89 @@
+import contextlib
+import io
+import random
+import unittest
+
+from bstvis.tree.events import EventCounter
+from bstvis.tree.tango_strict import TangoTree, is_root_or_None
+from bstvis.tree.rb import BLACK
+
+
+def check_aux_trees(test, t, red_black=True):
+    """
+    Assert that every auxiliary tree is a path of P, i.e. its depths are
+    consecutive, and that min_depth and max_depth are correct.
+
+    Args:
+        red_black (bool, optional): Also assert that the auxiliary trees
+            have BLACK roots, default True.
+    """
+    for root in t.preorder():
+        if not root.is_root:
+            continue
+        if red_black:
+            test.assertEqual(root.color, BLACK)
+        depths = []
+        stack = [root]
+        while stack:
+            p = stack.pop()
+            depths.append(p.depth)
+            children = [c for c in (p.left, p.right) if not is_root_or_None(c)]
+            test.assertEqual(
+                p.min_depth, min([p.depth] + [c.min_depth for c in children]))
+            test.assertEqual(
+                p.max_depth, max([p.depth] + [c.max_depth for c in children]))
+            stack.extend(children)
+        depths.sort()
+        test.assertEqual(depths,
+                         list(range(depths[0], depths[0] + len(depths))))
+
+
+class TestTangoTree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+
+    def test_search(self):
+        for n in (1, 2, 7, 64, 100):
+            t = TangoTree(range(n), [str(i) for i in range(n)])
+            for _ in range(50):
+                key = random.randrange(n)
+                p = t.search(key)
+                self.assertEqual((p.key, p.data), (key, str(key)))
+                check_aux_trees(self, t)
+            self.assertEqual([p.key for p in t.inorder()], list(range(n)))
+
+    def test_no_keys(self):
+        for keys in ([], iter([]), (key for key in ())):
+            self.assertRaises(AttributeError, TangoTree, keys)
+            self.assertRaises(AttributeError, TangoTree, keys, [])
+
+    def test_from_sorted_calls_init(self):
+        class CountingTango(TangoTree):
+            def __init__(self, keys, data=None):
+                super().__init__(keys, data)
+                self.accesses = 0
+
+        t = CountingTango.from_sorted(list(range(8)))
+        self.assertEqual(t.accesses, 0)
+        self.assertEqual([p.key for p in t.inorder()], list(range(8)))
+
+    def test_events(self):
+        t = TangoTree(range(32))
+        counter = EventCounter()
+        t.subscribe(counter)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            for key in (0, 31, 5, 20):
+                t.search(key)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(counter['access'], 4)
+        self.assertGreater(counter['cut'], 0)
+        self.assertGreater(counter['join'], 0)
+
+        t.unsubscribe(counter)
+        t.search(7)
+        self.assertEqual(counter['access'], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+
+from bstvis.algorithm.wilber import (funnel_bound, interleave_bound,
+                                     reference_tree)
+from bstvis.bench import workloads
+from bstvis.tree.flat import NIL
+from bstvis.tree.tango_strict import TangoTree
+
+
+def funnel_bound_naive(accesses):
+    """Count the alternations of each funnel by its definition."""
+    bound = 0
+    last = {}
+    for t, x in enumerate(accesses):
+        funnel = []
+        for y, time in last.items():
+            if y == x:
+                continue
+            lo, hi = min(x, y), max(x, y)
+            if not any(lo <= z <= hi and z != y and time < s
+                       for z, s in last.items()):
+                funnel.append((time, y < x))
+        funnel.sort()
+        bound += sum(a[1] != b[1] for a, b in zip(funnel, funnel[1:]))
+        last[x] = t
+    return bound
+
+
+class TestWilber(unittest.TestCase):
+
+    def test_reference_tree(self):
+        for n in (1, 2, 7, 10, 64, 100):
+            root, left, right = reference_tree(n)
+            t = TangoTree.from_sorted(list(range(n)))
+            stack = [(t.root, root)]
+            while stack:
+                p, i = stack.pop()
+                if p is None:
+                    self.assertEqual(i, NIL)
+                    continue
+                self.assertEqual(p.key, i)
+                stack.append((p.left, left[i]))
+                stack.append((p.right, right[i]))
+
+    def test_interleave_bound(self):
+        self.assertEqual(interleave_bound([0, 1, 2], [0, 2, 0, 2]), 3)
+        self.assertEqual(interleave_bound([0, 1, 2], [1, 1, 1]), 0)
+        self.assertEqual(interleave_bound([], []), 0)
+
+    def test_funnel_bound(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            n = rng.randint(1, 12)
+            accesses = [rng.randrange(n) for _ in range(rng.randint(0, 40))]
+            self.assertEqual(funnel_bound(list(range(n)), accesses),
+                             funnel_bound_naive(accesses), accesses)
+
+    def test_funnel_bound_sequential(self):
+        # The funnels have up to n keys, but after the first pass only the
+        # previous key is left of the access. Move-to-root needs O(n)
+        # rotations per access here.
+        n = 20000
+        accesses = workloads.sequential(n, 3 * n)
+        self.assertEqual(funnel_bound(list(range(n)), accesses), 2 * (n - 2))
+        self.assertEqual(funnel_bound([], []), 0)
@@ -1,5 +1,17 @@
+from collections import deque
+
 from bstvis.viewer import Viewable
 
+from . import cost
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Marks a missing default argument.
+_MISSING = object()
+
 
 class BinaryTree(Viewable):
 
@@ -12,17 +24,449 @@ class BinaryTree(Viewable):
     def __init__(self):
         super().__init__()
         self.root = None
+        # The listeners for the events of the tree, see subscribe().
+        self._listeners = ()
+
+    def subscribe(self, listener):
+        """
+        Call listener(tree, event, payload) for every event of the tree.
+
+        Trees emit events for the steps of their operations, e.g. TangoTree
+        emits 'marked', 'cut', 'join', 'split', 'concatenate', 'mark' and
+        'access'. The payload is a dict, usually with the node where the
+        step ended. Without listeners there is no overhead (see
+        bstvis.tree.events for listeners).
+
+        Args:
+            listener (callable): The function to call.
+        """
+        self._listeners += (listener,)
+
+    def unsubscribe(self, listener):
+        """Stop calling listener for events."""
+        self._listeners = tuple(l for l in self._listeners if l != listener)
+
+    def _emit(self, event, **payload):
+        """
+        Pass an event to all listeners.
+
+        Call sites should check self._listeners first, so no payload is
+        built when nobody listens.
+        """
+        for listener in self._listeners:
+            listener(self, event, payload)
 
     def height(self):
         """
-        Determine the height of the tree.
+        Determine the height of the tree in O(1).
+        """
+        return self.root.height if self.root else -1
+
+    def __len__(self):
+        """
+        Returns the number of nodes in O(1).
+        """
+        return self.root.size if self.root else 0
+
+    def select(self, k):
+        """
+        Returns the k-th smallest key (starting with 0) in O(height).
+        """
+        if not 0 <= k < len(self):
+            raise IndexError("Index {} out of range".format(k))
+
+        p = self.root
+        while True:
+            left_size = p.left.size if p.left else 0
+            if k < left_size:
+                p = p.left
+            elif k == left_size:
+                return p.key
+            else:
+                k -= left_size + 1
+                p = p.right
+
+    def rank(self, key):
+        """
+        Returns the number of keys smaller than key in O(height).
+
+        The key does not need to be in the tree.
+        """
+        r = 0
+        p = self.root
+        while p is not None:
+            if p.key < key:
+                r += (p.left.size if p.left else 0) + 1
+                p = p.right
+            elif p.key > key:
+                p = p.left
+            else:
+                r += p.left.size if p.left else 0
+                break
+        return r
+
+    def search_many(self, keys, default=_MISSING):
+        """
+        Search a batch of keys.
+
+        The batch is sorted and resolved in one traversal, so search paths
+        with a common prefix are walked only once. Trees which restructure
+        on every access (SplayTree, TangoTree) access the keys one after
+        another in sorted order instead.
+
+        Args:
+            keys (iterable or numpy.ndarray): The keys to search.
+            default (optional): The result for keys which are not in the
+                tree. If it is not given a KeyError is raised.
+
+        Returns:
+            list: The data of each key in the order of keys.
+        """
+        order, sorted_keys = _sort_batch(keys)
+        nodes = self._search_sorted(sorted_keys)
+
+        result = [None] * len(order)
+        for i, key, p in zip(order, sorted_keys, nodes):
+            if p is not None:
+                result[i] = p.data
+            elif default is _MISSING:
+                raise KeyError("Key {} not found".format(key))
+            else:
+                result[i] = default
+        return result
+
+    def contains_many(self, keys):
+        """
+        Test a batch of keys for membership (see search_many()).
+
+        Returns:
+            A list of bools in the order of keys or a numpy bool array if
+            keys is a numpy array.
+        """
+        order, sorted_keys = _sort_batch(keys)
+        nodes = self._search_sorted(sorted_keys)
+
+        result = [False] * len(order)
+        for i, p in zip(order, nodes):
+            result[i] = p is not None
+        if np is not None and isinstance(keys, np.ndarray):
+            return np.array(result, dtype=bool)
+        return result
+
+    def _search_sorted(self, keys):
+        """
+        Find the nodes for a sorted list of keys.
+
+        The next key of the batch is searched starting from where the
+        previous search diverges (finger search), so each node on the
+        union of the search paths is visited about once.
+
+        Returns:
+            list: The node with keys[i] or None for each i.
+        """
+        nodes = [None] * len(keys)
+        p = self.root
+        if p is None:
+            return nodes
+
+        # The ancestors of p where the search went left. Their keys increase
+        # from bottom to top, so the deepest one is on top of the stack.
+        # Searching a greater key pops those which are not greater than the
+        # key and continues at the last popped one, or at p.
+        bounds = []
+        for i, key in enumerate(keys):
+            while bounds and bounds[-1].key <= key:
+                p = bounds.pop()
+            while True:
+                if key < p.key:
+                    if p.left is None:
+                        break
+                    bounds.append(p)
+                    p = p.left
+                elif p.key < key:
+                    if p.right is None:
+                        break
+                    p = p.right
+                else:
+                    nodes[i] = p
+                    break
+        return nodes
+
+    def freeze(self, layout='eytzinger'):
+        """
+        Returns a read-only copy of the tree for fast searches.
+
+        The keys are arranged as a perfect tree in the Eytzinger (BFS) or
+        van Emde Boas layout (see bstvis.tree.frozen). The copy does not
+        change with the tree.
+
+        Args:
+            layout (str, optional): 'eytzinger' or 'veb', default
+                'eytzinger'.
+
+        Returns:
+            FrozenTree: The frozen tree.
+        """
+        from .frozen import FrozenTree
+        nodes = list(self.inorder())
+        return FrozenTree([p.key for p in nodes], [p.data for p in nodes],
+                          layout)
+
+    def range(self, lo=None, hi=None):
+        """
+        Iterate over the keys k with lo <= k < hi in ascending order.
+
+        Costs O(height + k) for k keys in the range.
+
+        Args:
+            lo (optional): The lower bound, default unbounded.
+            hi (optional): The upper bound (excluded), default unbounded.
+        """
+        return (p.key for p in range_nodes(self.root, lo, hi))
+
+    def items(self, lo=None, hi=None):
         """
-        def h(node):
-            if node:
-                return max(h(node.left), h(node.right)) + 1
+        Iterate over (key, data) for the keys k with lo <= k < hi in
+        ascending order (see range()).
+        """
+        return ((p.key, p.data) for p in range_nodes(self.root, lo, hi))
+
+    def cursor(self, key=None):
+        """
+        Returns a Cursor at the smallest key greater or equal than key.
+
+        Args:
+            key (optional): The key to start at, default the minimum.
+
+        Returns:
+            Cursor: The cursor, which is not valid if there is no such key.
+        """
+        p = self.root
+        start = None
+        while p is not None:
+            if key is not None and p.key < key:
+                p = p.right
             else:
-                return -1
-        return h(self.root)
+                start = p
+                p = p.left
+        return Cursor(start)
+
+    # The traversals are generators yielding the nodes lazily. They use an
+    # explicit stack, so they also work for degenerated trees.
+    # Do not modify the tree while iterating over it.
+    def inorder(self, node=None):
+        """
+        Iterate over the nodes in symmetric order.
+
+        Args:
+            node (Node, optional): the root of the subtree to traverse,
+                default the root of the tree.
+        """
+        return inorder(node if node is not None else self.root)
+
+    def preorder(self, node=None):
+        """
+        Iterate over the nodes in preorder (node, left, right).
+        """
+        return preorder(node if node is not None else self.root)
+
+    def postorder(self, node=None):
+        """
+        Iterate over the nodes in postorder (left, right, node).
+        """
+        return postorder(node if node is not None else self.root)
+
+    def level_order(self, node=None):
+        """
+        Iterate over the nodes level by level from left to right.
+        """
+        return level_order(node if node is not None else self.root)
+
+
+def _sort_batch(keys):
+    """
+    Sort a batch of keys.
+
+    Returns:
+        tuple: (order, sorted_keys) - lists with sorted_keys[j] being
+            keys[order[j]].
+    """
+    if np is not None and isinstance(keys, np.ndarray):
+        order = np.argsort(keys, kind='stable')
+        return order.tolist(), keys[order].tolist()
+    keys = list(keys)
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    return order, [keys[i] for i in order]
+
+
+def inorder(node):
+    """Generate the nodes of the subtree rooted at node in symmetric order."""
+    stack = []
+    while stack or node:
+        if node:
+            stack.append(node)
+            node = node.left
+        else:
+            node = stack.pop()
+            yield node
+            node = node.right
+
+
+def preorder(node):
+    """Generate the nodes of the subtree rooted at node in preorder."""
+    stack = [node] if node else []
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.right:
+            stack.append(node.right)
+        if node.left:
+            stack.append(node.left)
+
+
+def postorder(node):
+    """Generate the nodes of the subtree rooted at node in postorder."""
+    stack = []
+    last = None     # the last yielded node
+    while stack or node:
+        if node:
+            stack.append(node)
+            node = node.left
+        else:
+            top = stack[-1]
+            if top.right and top.right != last:
+                # visit the right subtree first
+                node = top.right
+            else:
+                last = stack.pop()
+                yield last
+
+
+def level_order(node):
+    """Generate the nodes of the subtree rooted at node level by level."""
+    queue = deque([node] if node else [])
+    while queue:
+        node = queue.popleft()
+        yield node
+        if node.left:
+            queue.append(node.left)
+        if node.right:
+            queue.append(node.right)
+
+
+def range_nodes(node, lo=None, hi=None):
+    """
+    Generate the nodes of the subtree rooted at node with lo <= key < hi in
+    symmetric order. None means unbounded.
+    """
+    stack = []
+    while stack or node:
+        if node:
+            if lo is not None and node.key < lo:
+                # node and its left subtree are out of range
+                node = node.right
+            else:
+                stack.append(node)
+                node = node.left
+        else:
+            node = stack.pop()
+            if hi is not None and not node.key < hi:
+                return
+            yield node
+            node = node.right
+
+
+def successor(p):
+    """
+    Returns the node following p in symmetric order or None.
+
+    Uses parent pointers only and costs O(1) amortized over a scan.
+    (Like TangoTree._find_successor but for the whole tree.)
+    """
+    # Case 1: right subtree is not empty
+    #   the minimum node of the right subtree is the successor
+    if p.right is not None:
+        p = p.right
+        while p.left is not None:
+            p = p.left
+        return p
+
+    # Case 2: right subtree is empty
+    #   go up until we come from a left child, this parent is the successor
+    #   or there is none if we reach the root
+    while p.parent is not None and p == p.parent.right:
+        p = p.parent
+    return p.parent
+
+
+def predecessor(p):
+    """
+    Returns the node preceding p in symmetric order or None.
+
+    This is symmetric with successor swapping left and right.
+    """
+    if p.left is not None:
+        p = p.left
+        while p.right is not None:
+            p = p.right
+        return p
+
+    while p.parent is not None and p == p.parent.left:
+        p = p.parent
+    return p.parent
+
+
+class Cursor(object):
+
+    """
+    A position in a tree which can move in both directions.
+
+    Each step follows parent and child pointers (see successor()), so a scan
+    over k keys costs O(k) and does not allocate. The cursor stays valid
+    while the tree is rotated, but not if its node is deleted.
+
+    Args:
+        node (Node): The node the cursor points at or None.
+    """
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def __bool__(self):
+        """A cursor is valid if it points at a node."""
+        return self.node is not None
+
+    @property
+    def key(self):
+        return self.node.key
+
+    @property
+    def data(self):
+        return self.node.data
+
+    def successor(self):
+        """
+        Move to the next key.
+
+        Returns:
+            bool: True if there is a next key, otherwise the cursor becomes
+                invalid.
+        """
+        self.node = successor(self.node)
+        return self.node is not None
+
+    def predecessor(self):
+        """
+        Move to the previous key.
+
+        Returns:
+            bool: True if there is a previous key, otherwise the cursor
+                becomes invalid.
+        """
+        self.node = predecessor(self.node)
+        return self.node is not None
 
 
 class Node(object):
@@ -30,8 +474,21 @@ class Node(object):
     """
     Representation of a node in a Binary Search Tree,
     i.e. has key, left/right child and parent
+    and additionally the size and height of its subtree.
+
+    The size and height have to be maintained during rotations and updated
+    on the path to the root whenever a node is inserted or deleted
+    (see _update_path()).
+
+    Nodes use __slots__ to keep the memory footprint small. Subclasses have to
+    declare their additional fields in __slots__ as well. If you need to store
+    arbitrary attributes on a node add '__dict__' to the __slots__ of your
+    subclass (see also bstvis.util.node_fields).
     """
 
+    __slots__ = ('key', 'data', 'parent', 'left', 'right', 'tree',
+                 'size', 'height')
+
     def __init__(self, key, data=None,
                  parent=None, left=None, right=None, tree=None):
         """
@@ -45,6 +502,43 @@ class Node(object):
 
         self.tree = tree
 
+        self._update_augmentation()
+
+    def _update_augmentation(self):
+        """
+        Infer size and height from children.
+        """
+        left = self.left
+        right = self.right
+        if left is None:
+            if right is None:
+                self.size = 1
+                self.height = 0
+            else:
+                self.size = right.size + 1
+                self.height = right.height + 1
+        elif right is None:
+            self.size = left.size + 1
+            self.height = left.height + 1
+        else:
+            self.size = left.size + right.size + 1
+            self.height = max(left.height, right.height) + 1
+
+        if cost.active is not None:
+            cost.active.writes += 1
+
+    def _update_path(self):
+        """
+        Update size and height of this node and all its ancestors.
+
+        Call this on the deepest node whose subtree changed after inserting
+        or deleting a node.
+        """
+        p = self
+        while p is not None:
+            p._update_augmentation()
+            p = p.parent
+
     @property
     def grand_parent(self):
         if self.parent:
@@ -85,16 +579,18 @@ class Node(object):
             self.left = parent
         parent.parent = self
 
+        if cost.active is not None:
+            cost.active.rotations += 1
+
+        # only the subtrees of parent and self changed
+        parent._update_augmentation()
+        self._update_augmentation()
+
     def preorder(self):
         """
         returns preorder traversal as list of keys
         """
-        po = [self.key]
-        if self.left:
-            po.extend(self.left.preorder())
-        if self.right:
-            po.extend(self.right.preorder())
-        return po
+        return [node.key for node in preorder(self)]
 
     def __repr__(self):
         """
@@ -113,26 +609,38 @@ class Node(object):
     def _repr_helper(self, depth, direction_sequence):
         makeFullTree = False        # render NIL childs
 
-        prefix = "".join(direction_sequence[:-1]) + (depth > 0) * "|- "
-        if self.data is None:
-            self_repr = prefix + "({key})".format(key=self.key)
-        else:
-            self_repr = prefix + "({key}, {data})".format(
-                key=self.key, data=self.data)
-
-        if self.right:
-            self_repr += "\n" + self.right._repr_helper(
-                    depth + 1,
-                    direction_sequence +
-                        (("|\t",) if self.left or makeFullTree else ("\t",)))
-        elif makeFullTree:
-            self_repr += "\n" + "".join(direction_sequence) + \
-                    (depth > 0) * "|- " + "NIL"
-        if self.left:
-            self_repr += "\n" + self.left._repr_helper(
-                    depth + 1, direction_sequence + ("\t",))
-        elif makeFullTree:
-            self_repr += "\n" + "".join(direction_sequence) + \
-                    (depth > 0) * "|- " + "NIL"
-
-        return self_repr
+        lines = []
+        # The stack contains (node, depth, direction_sequence) for nodes and
+        # already rendered lines for NIL childs. Right childs are rendered
+        # before left childs, so they are pushed last.
+        stack = [(self, depth, direction_sequence)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            node, depth, direction_sequence = item
+
+            prefix = "".join(direction_sequence[:-1]) + (depth > 0) * "|- "
+            if node.data is None:
+                lines.append(prefix + "({key})".format(key=node.key))
+            else:
+                lines.append(prefix + "({key}, {data})".format(
+                    key=node.key, data=node.data))
+
+            nil = "".join(direction_sequence) + (depth > 0) * "|- " + "NIL"
+            if node.left:
+                stack.append((node.left,
+                              depth + 1, direction_sequence + ("\t",)))
+            elif makeFullTree:
+                stack.append(nil)
+            if node.right:
+                stack.append((node.right,
+                              depth + 1,
+                              direction_sequence +
+                                (("|\t",) if node.left or makeFullTree
+                                 else ("\t",))))
+            elif makeFullTree:
+                stack.append(nil)
+
+        return "\n".join(lines)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Operation costs in the BST model.
+
+The model (see tango_strict) has a pointer into the tree which can move to
+the left child, the right child or the parent and can rotate the node it
+points at. The trees report these unit cost operations to the active
+CostCounter:
+
+    moves        the pointer moved along an edge
+    rotations    a node was rotated with its parent
+    comparisons  a key was compared with the key of a node
+    writes       the augmented fields (size, height) of a node were rewritten
+
+    with CostCounter() as cost:
+        t.search(4)
+    print(cost.moves, cost.rotations, cost.comparisons, cost.writes)
+
+If no counter is active, counting costs one check per operation (search
+loops count in local variables and report once at the end).
+"""
+
+# The counter the trees report to or None if counting is disabled.
+active = None
+
+
+class CostCounter(object):
+
+    """
+    Counts the operations of the trees while it is active.
+
+    Counters can be nested. The inner counter counts the operations of its
+    block which are added to the outer counter when it is left.
+    """
+
+    FIELDS = ('moves', 'rotations', 'comparisons', 'writes')
+
+    __slots__ = FIELDS + ('_previous',)
+
+    def __init__(self):
+        self._previous = None
+        self.reset()
+
+    def reset(self):
+        """Set all counts to 0."""
+        self.moves = 0
+        self.rotations = 0
+        self.comparisons = 0
+        self.writes = 0
+
+    def add(self, moves=0, rotations=0, comparisons=0, writes=0):
+        self.moves += moves
+        self.rotations += rotations
+        self.comparisons += comparisons
+        self.writes += writes
+
+    def counts(self):
+        """
+        Returns:
+            dict: operation -> count.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __enter__(self):
+        global active
+        self._previous = active
+        active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global active
+        active = self._previous
+        if active is not None:
+            active.add(**self.counts())
+        self._previous = None
+
+    def __repr__(self):
+        return 'CostCounter({})'.format(', '.join(
+            '{}={}'.format(field, getattr(self, field))
+            for field in self.FIELDS))
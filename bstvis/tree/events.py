@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Listeners for the events of a tree (see BinaryTree.subscribe()).
+
+A listener is any callable listener(tree, event, payload), e.g.
+
+    t = TangoTree(range(16))
+    t.subscribe(EventLogger())          # log every step
+    counter = EventCounter()
+    t.subscribe(counter)                # count the steps
+    t.subscribe(TreeView(t).on_event)   # view the tree after every step
+"""
+
+import logging
+from collections import Counter
+
+
+class EventLogger(object):
+
+    """
+    Log events with the logging module.
+
+    Args:
+        logger (logging.Logger, optional): The logger, default the logger
+            'bstvis.tree'.
+        level (int, optional): The log level, default logging.DEBUG.
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger('bstvis.tree')
+        self.level = level
+
+    def __call__(self, tree, event, payload):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        node = payload.get('node')
+        details = ''.join(' {}={}'.format(name, value)
+                          for name, value in sorted(payload.items())
+                          if name != 'node')
+        self.logger.log(self.level, '%s at %s%s', event,
+                        node.key if node is not None else None, details)
+
+
+class EventCounter(Counter):
+
+    """
+    Count the events by name, e.g. counter['cut'].
+    """
+
+    def __call__(self, tree, event, payload):
+        self[event] += 1
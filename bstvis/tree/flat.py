@@ -0,0 +1,932 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Flat (struct-of-arrays) implementations of NaiveBST, RBTree and SplayTree.
+
+Instead of one Python object per node, all fields are stored in parallel
+arrays indexed by an integer node id:
+
+    keys[i], data[i]            key and data of node i (lists)
+    left[i], right[i], parent[i] ids of the neighbours or NIL (array('q'))
+    size[i], height[i]          size and height of the subtree of node i
+    color[i], bh[i]             only for FlatRBTree
+
+This avoids one allocation per node, keeps the pointer fields in contiguous
+memory and makes the whole tree picklable in one shot. The ids of deleted
+nodes are reused by later inserts. If NumPy is available
+the pointer arrays can be copied into numpy arrays with one memcpy each (see
+FlatBST.arrays()) which allows vectorized whole-tree passes.
+
+To stay compatible with the rest of bstvis (layouts, TreeView, Node.__repr__)
+tree.root returns a FlatNode, a small handle which resolves its fields from
+the arrays of the tree.
+"""
+
+from array import array
+
+from . import cost
+from .bintree import BinaryTree, Node
+from .naive import perfect_split
+from .rb import RED, BLACK
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Id of the empty node.
+NIL = -1
+
+# Colors are stored as one byte per node.
+_RED = 0
+_BLACK = 1
+
+
+class FlatNode(object):
+
+    """
+    A handle to node i of a flat tree.
+
+    It provides the same fields as Node, so algorithms reading a tree
+    (layouts, TreeView, traversals) work on flat trees as well. Two handles
+    are equal if they refer to the same node of the same tree.
+    """
+
+    __slots__ = ('_tree', 'id')
+
+    # Field names reported by bstvis.util.node_fields.
+    _fields = ('key', 'data', 'parent', 'left', 'right', 'size', 'height')
+
+    def __init__(self, tree, i):
+        self._tree = tree
+        self.id = i
+
+    @property
+    def key(self):
+        return self._tree._keys[self.id]
+
+    @property
+    def data(self):
+        return self._tree._data[self.id]
+
+    @data.setter
+    def data(self, data):
+        self._tree._data[self.id] = data
+
+    @property
+    def left(self):
+        return self._tree._node(self._tree._left[self.id])
+
+    @property
+    def right(self):
+        return self._tree._node(self._tree._right[self.id])
+
+    @property
+    def parent(self):
+        return self._tree._node(self._tree._parent[self.id])
+
+    @property
+    def size(self):
+        return self._tree._size[self.id]
+
+    @property
+    def height(self):
+        return self._tree._height[self.id]
+
+    @property
+    def grand_parent(self):
+        parent = self.parent
+        if parent:
+            return parent.parent
+        else:
+            return None
+
+    def rotate(self):
+        """
+        Rotate node with parent if present.
+        """
+        self._tree._rotate(self.id)
+
+    def __eq__(self, other):
+        return (isinstance(other, FlatNode) and
+                other._tree is self._tree and other.id == self.id)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self._tree), self.id))
+
+    preorder = Node.preorder
+    __repr__ = Node.__repr__
+    _repr_helper = Node._repr_helper
+
+
+class FlatRBNode(FlatNode):
+
+    """
+    A handle to a node of a FlatRBTree, additionally providing color and bh.
+    """
+
+    __slots__ = ()
+
+    _fields = FlatNode._fields + ('color', 'bh')
+
+    @property
+    def color(self):
+        return BLACK if self._tree._color[self.id] == _BLACK else RED
+
+    @property
+    def bh(self):
+        return self._tree._bh[self.id]
+
+
+class FlatBST(BinaryTree):
+
+    """
+    An unbalanced Binary Search Tree stored in parallel arrays.
+
+    Behaves like NaiveBST.
+    """
+
+    node_handle = FlatNode
+
+    def __init__(self):
+        self._keys = []
+        self._data = []
+        self._left = array('q')
+        self._right = array('q')
+        self._parent = array('q')
+        self._size = array('q')
+        self._height = array('q')
+        # The ids of deleted nodes, reused by _new_node().
+        self._free = []
+        self._root = NIL
+        super().__init__()
+
+    @classmethod
+    def from_sorted(cls, keys, data=None):
+        """
+        Build a perfect tree from sorted keys in O(n).
+
+        The id of each node is the index of its key in keys.
+
+        Args:
+            keys (list): A sorted list of distinct keys.
+            data (list, optional): The data for each key.
+
+        Returns:
+            A new tree containing the keys.
+        """
+        t = cls()
+        n = len(keys)
+        for i in range(n):
+            t._new_node(keys[i], data[i] if data is not None else None, NIL)
+
+        height = n.bit_length() - 1
+        left = t._left
+        right = t._right
+        parent = t._parent
+        size = t._size
+        heights = t._height
+
+        def build(lo, hi, depth, p):
+            """Link the subtree of keys[lo:hi] and return its root."""
+            if lo == hi:
+                return NIL
+            mid = lo + perfect_split(hi - lo)
+            parent[mid] = p
+            left[mid] = build(lo, mid, depth + 1, mid)
+            right[mid] = build(mid + 1, hi, depth + 1, mid)
+            size[mid] = hi - lo
+            # the tree is perfect, so all leaves are on the last two levels
+            heights[mid] = (hi - lo).bit_length() - 1
+            t._perfect_node(mid, depth, height)
+            return mid
+
+        t._root = build(0, n, 0, NIL)
+        return t
+
+    def _perfect_node(self, i, depth, height):
+        """Set augmented fields of node i for from_sorted()."""
+        pass
+
+    @property
+    def root(self):
+        return self._node(self._root)
+
+    @root.setter
+    def root(self, node):
+        self._root = NIL if node is None else node.id
+
+    def _node(self, i):
+        """Returns a handle for node i or None for NIL."""
+        if i == NIL:
+            return None
+        return self.node_handle(self, i)
+
+    def __len__(self):
+        return len(self._keys) - len(self._free)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The viewer is bound to a window and can not be pickled, neither
+        # can listeners in general.
+        state['_viewer'] = None
+        state['_listeners'] = ()
+        return state
+
+    def arrays(self):
+        """
+        Returns a dict with copies of the pointer arrays (left, right,
+        parent).
+
+        If NumPy is available the copies are numpy arrays. They do not change
+        with the tree. The entries of deleted nodes are undefined.
+        """
+        arrays = {'left': self._left,
+                  'right': self._right,
+                  'parent': self._parent}
+        if np is not None:
+            return {name: np.array(a, dtype=np.int64)
+                    for name, a in arrays.items()}
+        return {name: array('q', a) for name, a in arrays.items()}
+
+    def _new_node(self, key, data, parent):
+        """Append a new node or reuse a deleted one and return its id."""
+        if self._free:
+            i = self._free.pop()
+            self._keys[i] = key
+            self._data[i] = data
+            self._left[i] = NIL
+            self._right[i] = NIL
+            self._parent[i] = parent
+            self._size[i] = 1
+            self._height[i] = 0
+            return i
+        i = len(self._keys)
+        self._keys.append(key)
+        self._data.append(data)
+        self._left.append(NIL)
+        self._right.append(NIL)
+        self._parent.append(parent)
+        self._size.append(1)
+        self._height.append(0)
+        return i
+
+    def _update_augmentation(self, i):
+        """
+        Infer size and height of node i from its children
+        (see Node._update_augmentation()).
+        """
+        l = self._left[i]
+        r = self._right[i]
+        size = self._size
+        height = self._height
+        if l == NIL:
+            if r == NIL:
+                size[i] = 1
+                height[i] = 0
+            else:
+                size[i] = size[r] + 1
+                height[i] = height[r] + 1
+        elif r == NIL:
+            size[i] = size[l] + 1
+            height[i] = height[l] + 1
+        else:
+            size[i] = size[l] + size[r] + 1
+            height[i] = max(height[l], height[r]) + 1
+
+        if cost.active is not None:
+            cost.active.writes += 1
+
+    def _update_path(self, i):
+        """Update size and height of node i and all its ancestors."""
+        parent = self._parent
+        while i != NIL:
+            self._update_augmentation(i)
+            i = parent[i]
+
+    def _find(self, key):
+        """Returns the id of the node with key or NIL."""
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        p = self._root
+        steps = 0
+        while p != NIL:
+            steps += 1
+            k = keys[p]
+            if k == key:
+                break
+            elif k < key:
+                p = right[p]
+            else:
+                p = left[p]
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+        return p
+
+    def search(self, key):
+        p = self._find(key)
+        if p == NIL:
+            raise KeyError("Key {} not found".format(key))
+        return self._data[p]
+
+    def _search_sorted(self, keys):
+        """
+        Find the nodes for a sorted list of keys (see
+        BinaryTree._search_sorted()).
+        """
+        ids = [NIL] * len(keys)
+        p = self._root
+        if p != NIL:
+            tree_keys = self._keys
+            left = self._left
+            right = self._right
+
+            bounds = []
+            for i, key in enumerate(keys):
+                while bounds and tree_keys[bounds[-1]] <= key:
+                    p = bounds.pop()
+                while True:
+                    k = tree_keys[p]
+                    if key < k:
+                        if left[p] == NIL:
+                            break
+                        bounds.append(p)
+                        p = left[p]
+                    elif k < key:
+                        if right[p] == NIL:
+                            break
+                        p = right[p]
+                    else:
+                        ids[i] = p
+                        break
+        return [self._node(i) for i in ids]
+
+    def _insert(self, key, data):
+        """
+        Insert a leaf or update the data for key.
+
+        The size and height of the ancestors of a new leaf are not updated.
+
+        Returns:
+            (id, True) if the key is new, otherwise (id, False).
+        """
+        if self._root == NIL:
+            self._root = self._new_node(key, data, NIL)
+            return self._root, True
+
+        keys = self._keys
+        left = self._left
+        right = self._right
+
+        p = self._root
+        moves = 0
+        while True:
+            k = keys[p]
+            if key == k:
+                self._data[p] = data
+                i, is_new = p, False
+                break
+            elif key < k:
+                if left[p] == NIL:
+                    i = left[p] = self._new_node(key, data, p)
+                    is_new = True
+                    break
+                p = left[p]
+            else:
+                if right[p] == NIL:
+                    i = right[p] = self._new_node(key, data, p)
+                    is_new = True
+                    break
+                p = right[p]
+            moves += 1
+        if cost.active is not None:
+            cost.active.add(moves=moves, comparisons=moves + 1)
+        return i, is_new
+
+    def insert(self, key, data=None):
+        """
+        Insert or update data for given key.
+
+        Returns True for insert (key is new) and
+        False for update (key already present).
+        """
+        p, is_new = self._insert(key, data)
+        if is_new:
+            self._update_path(p)
+        return is_new
+
+    def delete(self, key):
+        """
+        Delete the node with the given key.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        z = self._find(key)
+        if z == NIL:
+            return False
+        x, x_parent, y = self._delete(z)
+        self._free_node(z)
+        self._update_path(x_parent)
+        return True
+
+    def _delete(self, z):
+        """
+        Unlink node z like NaiveBST.delete().
+
+        Returns:
+            tuple: (x, x_parent, y) - the node x (maybe NIL) moved into the
+                place of y with its parent, where y is z if z has at most
+                one child and the successor of z otherwise.
+        """
+        parent = self._parent
+        left = self._left
+        right = self._right
+
+        # Case 1/2: z has at most one child, replace z by it.
+        if left[z] == NIL:
+            y = z
+            x = right[z]
+            x_parent = parent[z]
+            self._transplant(z, x)
+        elif right[z] == NIL:
+            y = z
+            x = left[z]
+            x_parent = parent[z]
+            self._transplant(z, x)
+        # Case 3: z has two children, replace z by its successor y.
+        else:
+            y = right[z]
+            steps = 1
+            while left[y] != NIL:
+                y = left[y]
+                steps += 1
+            if cost.active is not None:
+                cost.active.moves += steps
+            x = right[y]
+
+            if parent[y] == z:
+                x_parent = y
+            else:
+                # y has no left child, so replace it by its right child
+                x_parent = parent[y]
+                self._transplant(y, x)
+                right[y] = right[z]
+                parent[right[y]] = y
+            self._transplant(z, y)
+            left[y] = left[z]
+            parent[left[y]] = y
+        return x, x_parent, y
+
+    def _transplant(self, u, v):
+        """
+        Replace the subtree rooted at u by the subtree rooted at v.
+
+        The children of v are not changed.
+        """
+        parent = self._parent
+        p = parent[u]
+        if p == NIL:
+            self._root = v
+        elif self._left[p] == u:
+            self._left[p] = v
+        else:
+            self._right[p] = v
+        if v != NIL:
+            parent[v] = p
+
+    def _free_node(self, i):
+        """Release the unlinked node i for reuse."""
+        self._keys[i] = None
+        self._data[i] = None
+        self._left[i] = self._right[i] = self._parent[i] = NIL
+        self._free.append(i)
+
+    def _rotate(self, x):
+        """
+        Rotate node x with its parent if present (see Node.rotate).
+        """
+        parent = self._parent
+        left = self._left
+        right = self._right
+
+        p = parent[x]
+        if p == NIL:
+            return
+
+        g = parent[p]
+        if g != NIL:
+            if left[g] == p:
+                left[g] = x
+            else:
+                right[g] = x
+        else:
+            self._root = x
+        parent[x] = g
+
+        if left[p] == x:
+            b = left[p] = right[x]
+            right[x] = p
+        else:
+            b = right[p] = left[x]
+            left[x] = p
+        if b != NIL:
+            parent[b] = p
+        parent[p] = x
+
+        if cost.active is not None:
+            cost.active.rotations += 1
+
+        # only the subtrees of p and x changed
+        self._update_augmentation(p)
+        self._update_augmentation(x)
+
+    def height(self):
+        """
+        Determine the height of the tree in O(1).
+        """
+        return self._height[self._root] if self._root != NIL else -1
+
+    def __repr__(self):
+        return self.root.__repr__()
+
+
+class FlatRBTree(FlatBST):
+
+    """
+    A Red-Black-Tree stored in parallel arrays.
+
+    Behaves like RBTree including the black-height bh.
+    """
+
+    node_handle = FlatRBNode
+
+    def __init__(self):
+        self._color = bytearray()
+        self._bh = array('q')
+        super().__init__()
+
+    def _perfect_node(self, i, depth, height):
+        """Color node i like RBTree._perfect_node()."""
+        if depth == 0 and height == 0:
+            self._color[i] = _BLACK
+            self._bh[i] = 1
+        elif depth < height:
+            self._color[i] = _BLACK
+            self._bh[i] = height - depth
+        else:
+            self._color[i] = _RED
+            self._bh[i] = 0
+
+    def _new_node(self, key, data, parent):
+        i = super()._new_node(key, data, parent)
+        if i == len(self._color):
+            self._color.append(_RED)
+            self._bh.append(0)
+        else:
+            self._color[i] = _RED
+            self._bh[i] = 0
+        return i
+
+    def insert(self, key, data=None):
+        """
+        Insert or update data for given key.
+
+        Returns True for insert (key is new) and
+        False for update (key already present).
+        """
+        p, is_new = self._insert(key, data)
+        if is_new:
+            self._insert_fixup(p)
+            # the rotations keep size and height of the rotated nodes, only
+            # the ancestors of p have to be updated
+            self._update_path(p)
+        return is_new
+
+    def delete(self, key):
+        """
+        Delete the node with the given key.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        z = self._find(key)
+        if z == NIL:
+            return False
+
+        color = self._color
+        x, x_parent, y = self._delete(z)
+        # y takes the place and color of z, so the color of y is missing
+        y_color = color[y]
+        if y != z:
+            color[y] = color[z]
+            self._bh[y] = self._bh[z]
+        self._free_node(z)
+
+        if y_color == _BLACK:
+            self._delete_fixup(x, x_parent)
+        # the rotations keep size and height of the rotated nodes and
+        # x_parent is still the parent of x
+        self._update_path(x_parent)
+        return True
+
+    def _insert_fixup(self, p):
+        """fix rb-properties (see RBTree._insert_fixup)"""
+        color = self._color
+        bh = self._bh
+        parent = self._parent
+        left = self._left
+        right = self._right
+
+        while parent[p] != NIL and color[parent[p]] == _RED:
+            q = parent[p]
+            g = parent[q]
+            if q == left[g]:
+                y = right[g]
+                if y != NIL and color[y] == _RED:
+                    color[q] = _BLACK
+                    bh[q] += 1
+                    color[y] = _BLACK
+                    bh[y] += 1
+                    color[g] = _RED
+                    p = g
+                else:
+                    if p == right[q]:
+                        self._rotate(p)
+                        p = q
+                        q = parent[p]
+                    color[q] = _BLACK
+                    bh[q] += 1
+                    color[g] = _RED
+                    bh[g] -= 1
+                    self._rotate(q)
+            else:
+                y = left[g]
+                if y != NIL and color[y] == _RED:
+                    color[q] = _BLACK
+                    bh[q] += 1
+                    color[y] = _BLACK
+                    bh[y] += 1
+                    color[g] = _RED
+                    p = g
+                else:
+                    if p == left[q]:
+                        self._rotate(p)
+                        p = q
+                        q = parent[p]
+                    color[q] = _BLACK
+                    bh[q] += 1
+                    color[g] = _RED
+                    bh[g] -= 1
+                    self._rotate(q)
+
+        if parent[p] == NIL and color[p] == _RED:
+            color[p] = _BLACK
+            bh[p] += 1
+
+    def _delete_fixup(self, x, p):
+        """
+        fix rb-properties after a BLACK node was removed
+        (see RBTree._delete_fixup)
+
+        x (maybe NIL) with parent p is "doubly black".
+        """
+        color = self._color
+        bh = self._bh
+        parent = self._parent
+        left = self._left
+        right = self._right
+
+        while x != self._root and (x == NIL or color[x] == _BLACK):
+            if x == left[p]:
+                w = right[p]
+                if color[w] == _RED:
+                    color[w] = _BLACK
+                    bh[w] += 1
+                    color[p] = _RED
+                    bh[p] -= 1
+                    self._rotate(w)
+                    w = right[p]
+                if ((left[w] == NIL or color[left[w]] == _BLACK) and
+                        (right[w] == NIL or color[right[w]] == _BLACK)):
+                    # recolor w and move the missing BLACK up
+                    color[w] = _RED
+                    bh[w] -= 1
+                    x = p
+                    if cost.active is not None:
+                        cost.active.moves += 1
+                    bh[x] -= 1
+                    p = parent[x]
+                else:
+                    if right[w] == NIL or color[right[w]] == _BLACK:
+                        c = left[w]
+                        color[c] = _BLACK
+                        bh[c] += 1
+                        color[w] = _RED
+                        bh[w] -= 1
+                        self._rotate(c)
+                        w = right[p]
+                    color[w] = color[p]
+                    color[p] = _BLACK
+                    c = right[w]
+                    color[c] = _BLACK
+                    bh[c] += 1
+                    self._rotate(w)
+                    bh[p] = (bh[right[p]] if right[p] != NIL else 0) + 1
+                    bh[w] = bh[p] + (color[w] == _BLACK)
+                    x = self._root
+            else:
+                # analog left <-> right
+                w = left[p]
+                if color[w] == _RED:
+                    color[w] = _BLACK
+                    bh[w] += 1
+                    color[p] = _RED
+                    bh[p] -= 1
+                    self._rotate(w)
+                    w = left[p]
+                if ((left[w] == NIL or color[left[w]] == _BLACK) and
+                        (right[w] == NIL or color[right[w]] == _BLACK)):
+                    color[w] = _RED
+                    bh[w] -= 1
+                    x = p
+                    if cost.active is not None:
+                        cost.active.moves += 1
+                    bh[x] -= 1
+                    p = parent[x]
+                else:
+                    if left[w] == NIL or color[left[w]] == _BLACK:
+                        c = right[w]
+                        color[c] = _BLACK
+                        bh[c] += 1
+                        color[w] = _RED
+                        bh[w] -= 1
+                        self._rotate(c)
+                        w = left[p]
+                    color[w] = color[p]
+                    color[p] = _BLACK
+                    c = left[w]
+                    color[c] = _BLACK
+                    bh[c] += 1
+                    self._rotate(w)
+                    bh[p] = (bh[left[p]] if left[p] != NIL else 0) + 1
+                    bh[w] = bh[p] + (color[w] == _BLACK)
+                    x = self._root
+
+        if x != NIL and color[x] == _RED:
+            color[x] = _BLACK
+            bh[x] += 1
+
+
+class FlatSplayTree(FlatBST):
+
+    """
+    A Splay Tree stored in parallel arrays.
+
+    Behaves like SplayTree.
+    """
+
+    def search(self, key):
+        p = self._find(key)
+        if p == NIL:
+            raise KeyError("Key {} not found".format(key))
+        self._splay(p)
+        return self._data[p]
+
+    def insert(self, key, data=None):
+        """
+        Insert or update data for given key.
+
+        Returns True for insert (key is new) and
+        False for update (key already present).
+        """
+        p, is_new = self._insert(key, data)
+        self._splay(p)
+        if is_new:
+            # Splaying recomputes size and height of every ancestor of p
+            # bottom up, so only the new root p is left.
+            self._update_augmentation(p)
+        return is_new
+
+    def delete(self, key):
+        """
+        Delete the node with the given key (see SplayTree.delete()).
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        keys = self._keys
+        left = self._left
+        right = self._right
+        parent = self._parent
+
+        p = self._root
+        last = NIL
+        steps = 0
+        while p != NIL:
+            steps += 1
+            k = keys[p]
+            if k == key:
+                break
+            last = p
+            if k < key:
+                p = right[p]
+            else:
+                p = left[p]
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+
+        if p == NIL:
+            # splay the last node on the search path as for an access
+            if last != NIL:
+                self._splay(last)
+            return False
+
+        self._splay(p)
+
+        # now p is the root
+        r = right[p]
+        if left[p] == NIL:
+            new_root = r
+        else:
+            m = left[p]
+            moves = 1
+            while right[m] != NIL:
+                m = right[m]
+                moves += 1
+            if cost.active is not None:
+                cost.active.moves += moves
+            self._splay(m, p)
+            # m is the left child of p and has no right child
+            right[m] = r
+            if r != NIL:
+                parent[r] = m
+            new_root = m
+
+        self._root = new_root
+        if new_root != NIL:
+            parent[new_root] = NIL
+            self._update_augmentation(new_root)
+        self._free_node(p)
+        return True
+
+    def _search_sorted(self, keys):
+        """Splay the keys one after another (see SplayTree)."""
+        ids = []
+        for key in keys:
+            p = self._find(key)
+            if p != NIL:
+                self._splay(p)
+            ids.append(p)
+        return [self._node(i) for i in ids]
+
+    def _splay(self, p, top=NIL):
+        """
+        Splay p until its parent is top, i.e. by default until p is the root.
+        """
+        parent = self._parent
+        left = self._left
+
+        while parent[p] != top:
+            q = parent[p]
+            g = parent[q]
+            if g == top:
+                # zig
+                self._rotate(p)
+            elif (p == left[q]) == (q == left[g]):
+                # zig zig
+                self._rotate(q)
+                self._rotate(p)
+            else:
+                # zig zag
+                self._rotate(p)
+                self._rotate(p)
+
+
+def main():
+    import random
+    from bstvis.viewer import TreeView
+    random.seed(0)  # do always the same for testing
+
+    tree = FlatRBTree()
+    tv = TreeView(tree, node_attributes=['bh'])
+    n = 16
+    universe = list(range(n))
+    random.shuffle(universe)
+
+    for key in universe:
+        tree.insert(key)
+        tv.view()
+
+
+if __name__ == '__main__':
+    main()
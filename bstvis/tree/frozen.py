@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Static search trees in cache-friendly array layouts.
+
+A FrozenTree is a read-only copy of the keys of a tree (see
+BinaryTree.freeze()). The keys are arranged as the perfect tree which
+perfect_inserter() and from_sorted() build, i.e. all levels are full except
+for the last one which is filled from the left. Two layouts of this tree are
+supported:
+
+    EYTZINGER   The nodes in level order (BFS), the root at index 1 and the
+                children of node k at 2k and 2k + 1. No pointers are stored.
+                The top levels, which every search visits, are at the front.
+    VEB         The van Emde Boas layout: the tree is cut at half its height
+                and the top tree and then every bottom tree are laid out
+                recursively. Every subtree of height about 2^i is contiguous,
+                so a search touches O(log_B n) blocks for any block size B.
+                The child positions are stored in arrays.
+
+Searching the Eytzinger layout is branch-free: the search descends
+k = 2k + (keys[k] < key) to the bottom and the result is recovered from the
+bits of k. If NumPy is available, search_many() and contains_many() of numpy
+arrays descend all keys of the batch level by level.
+"""
+
+from array import array
+
+from . import cost
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+EYTZINGER = 'eytzinger'
+VEB = 'veb'
+
+LAYOUTS = (EYTZINGER, VEB)
+
+# Marks a missing child in the VEB layout.
+NIL = -1
+
+# Marks a missing default argument.
+_MISSING = object()
+
+
+def eytzinger_order(n):
+    """
+    Returns the in-order rank of every node of the perfect tree with n nodes.
+
+    Returns:
+        list: rank[k] for the node with BFS index k, 1 <= k <= n. rank[0]
+            is unused.
+    """
+    rank = [0] * (n + 1)
+    r = 0
+    stack = []
+    k = 1
+    while stack or k <= n:
+        if k <= n:
+            stack.append(k)
+            k *= 2
+        else:
+            k = stack.pop()
+            rank[k] = r
+            r += 1
+            k = 2*k + 1
+    return rank
+
+
+def veb_order(n):
+    """
+    Returns the BFS indices of the perfect tree with n nodes in van Emde
+    Boas order.
+    """
+    order = []
+
+    def layout(root, levels):
+        """Lay out the subtree of root with the given number of levels."""
+        if root > n:
+            return
+        if levels == 1:
+            order.append(root)
+            return
+        top = levels // 2
+        layout(root, top)
+        # The roots of the bottom trees are the descendants of root top
+        # levels below it, from left to right.
+        first = root << top
+        for bottom in range(first, first + (1 << top)):
+            layout(bottom, levels - top)
+
+    layout(1, n.bit_length())
+    return order
+
+
+class FrozenTree(object):
+
+    """
+    A read-only search tree in the EYTZINGER or VEB layout.
+
+    Args:
+        keys (list): A sorted list of distinct keys.
+        data (list, optional): The data for each key.
+        layout (str, optional): EYTZINGER or VEB, default EYTZINGER.
+    """
+
+    def __init__(self, keys, data=None, layout=EYTZINGER):
+        if layout not in LAYOUTS:
+            raise ValueError("Unknown layout {}".format(layout))
+        self.layout = layout
+        n = len(keys)
+        self._n = n
+        # The number of levels of the tree.
+        self._levels = n.bit_length()
+
+        rank = eytzinger_order(n)
+        if layout == EYTZINGER:
+            # Index 0 is unused, so the children of k are 2k and 2k + 1.
+            self._keys = [None] + [keys[rank[k]] for k in range(1, n + 1)]
+            self._data = [None] + [data[rank[k]] if data is not None else None
+                                   for k in range(1, n + 1)]
+        else:
+            order = veb_order(n)
+            position = [NIL] * (2*n + 2)
+            for i, k in enumerate(order):
+                position[k] = i
+            self._keys = [keys[rank[k]] for k in order]
+            self._data = [data[rank[k]] if data is not None else None
+                          for k in order]
+            self._left = array('q', (position[2*k] for k in order))
+            self._right = array('q', (position[2*k + 1] for k in order))
+        # Created on the first vectorized search.
+        self._arrays = None
+
+    def __len__(self):
+        return self._n
+
+    def _find(self, key):
+        """Returns the index of key in self._keys or NIL."""
+        keys = self._keys
+        if self.layout == EYTZINGER:
+            n = self._n
+            k = 1
+            while k <= n:
+                k = 2*k + (keys[k] < key)
+            steps = (k.bit_length() - 1)
+            # The last step to the left is above the trailing ones of k.
+            k >>= (~k & (k + 1)).bit_length()
+            if cost.active is not None:
+                cost.active.add(moves=steps - 1 if steps else 0,
+                                comparisons=steps + (k != 0))
+            return k if k and keys[k] == key else NIL
+
+        left = self._left
+        right = self._right
+        p = 0 if self._n else NIL
+        steps = 0
+        while p != NIL:
+            steps += 1
+            k = keys[p]
+            if k == key:
+                break
+            elif k < key:
+                p = right[p]
+            else:
+                p = left[p]
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+        return p
+
+    def search(self, key):
+        """Returns the data of key or raises KeyError."""
+        i = self._find(key)
+        if i == NIL:
+            raise KeyError("Key {} not found".format(key))
+        return self._data[i]
+
+    def __contains__(self, key):
+        return self._find(key) != NIL
+
+    def keys(self):
+        """Returns the keys in ascending order."""
+        n = self._n
+        rank = eytzinger_order(n)
+        if self.layout == EYTZINGER:
+            positions = zip(range(1, n + 1), range(1, n + 1))
+        else:
+            positions = enumerate(veb_order(n))
+        result = [None] * n
+        for i, k in positions:
+            result[rank[k]] = self._keys[i]
+        return result
+
+    def search_many(self, keys, default=_MISSING):
+        """
+        Search a batch of keys.
+
+        A numpy array of keys is searched vectorized if NumPy is available.
+
+        Args:
+            keys (iterable or numpy.ndarray): The keys to search.
+            default (optional): The result for keys which are not in the
+                tree. If it is not given a KeyError is raised.
+
+        Returns:
+            list: The data of each key in the order of keys.
+        """
+        if np is None or not isinstance(keys, np.ndarray):
+            keys = list(keys)
+        indices = self._find_many(keys)
+        result = []
+        for key, i in zip(keys, indices):
+            if i != NIL:
+                result.append(self._data[i])
+            elif default is _MISSING:
+                raise KeyError("Key {} not found".format(key))
+            else:
+                result.append(default)
+        return result
+
+    def contains_many(self, keys):
+        """
+        Test a batch of keys for membership (see search_many()).
+
+        Returns:
+            A list of bools in the order of keys or a numpy bool array if
+            keys is a numpy array.
+        """
+        indices = self._find_many(keys)
+        if np is not None and isinstance(keys, np.ndarray):
+            return indices != NIL
+        return [i != NIL for i in indices]
+
+    def _find_many(self, keys):
+        """Returns the index of each key or NIL."""
+        if np is not None and isinstance(keys, np.ndarray):
+            if self.layout == EYTZINGER:
+                return self._find_many_eytzinger(keys)
+            return self._find_many_veb(keys)
+        return [self._find(key) for key in keys]
+
+    def _numpy_arrays(self):
+        """The keys and child positions as numpy arrays."""
+        if self._arrays is None:
+            if self.layout == EYTZINGER:
+                # Index 0 is never compared, any key will do.
+                keys = self._keys[1:2] + self._keys[1:]
+                self._arrays = (np.array(keys),)
+            else:
+                self._arrays = (np.array(self._keys),
+                                np.frombuffer(self._left, dtype=np.int64),
+                                np.frombuffer(self._right, dtype=np.int64))
+        return self._arrays
+
+    def _find_many_eytzinger(self, keys):
+        """Vectorized branch-free search in the EYTZINGER layout."""
+        indices = np.full(len(keys), NIL, dtype=np.int64)
+        if not self._n:
+            return indices
+        tree_keys, = self._numpy_arrays()
+
+        n = self._n
+        k = np.ones(len(keys), dtype=np.int64)
+        # The last node where the search went left, i.e. the smallest key
+        # which is not less than the searched key.
+        candidate = np.zeros(len(keys), dtype=np.int64)
+        for _ in range(self._levels):
+            active = k <= n
+            node_keys = tree_keys[np.where(active, k, 1)]
+            go_right = node_keys < keys
+            candidate = np.where(active & ~go_right, k, candidate)
+            k = np.where(active, 2*k + go_right, k)
+
+        found = (candidate != 0) & (tree_keys[candidate] == keys)
+        indices[found] = candidate[found]
+        return indices
+
+    def _find_many_veb(self, keys):
+        """Vectorized search in the VEB layout."""
+        indices = np.full(len(keys), NIL, dtype=np.int64)
+        if not self._n:
+            return indices
+        tree_keys, left, right = self._numpy_arrays()
+
+        p = np.zeros(len(keys), dtype=np.int64)
+        for _ in range(self._levels):
+            active = p != NIL
+            q = np.where(active, p, 0)
+            node_keys = tree_keys[q]
+            found = active & (node_keys == keys)
+            indices[found] = q[found]
+            p = np.where(found | ~active, NIL,
+                         np.where(node_keys < keys, right[q], left[q]))
+        return indices
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Multi-Splay Trees as described in
+"O(log log n)-Competitive Dynamic Binary Search Trees" by CHENGWEN CHRIS
+WANG, JONATHAN DERRYBERRY AND DANIEL DOMINIC SLEATOR.
+
+Like a Tango Tree a Multi-Splay Tree is a tree of auxiliary trees, one for
+each preferred path of the perfect reference tree P. The auxiliary trees are
+splay trees instead of red-black trees. A splay tree needs no balance, so
+changing the preferred child of a node y of P (a switch) is cheap:
+
+    1 splay y to the root of its auxiliary tree.
+    2 cut: the old preferred path below y is a key interval next to y. Splay
+      the nearest node on that side of y which is above y in P (if any) to a
+      child of y. Its subtree towards y is the interval: mark it as root.
+    3 join: the new preferred path hangs in the gap on the other side of y.
+      Unmark its root.
+
+Only the min_depth and max_depth of the nodes above the marked or unmarked
+root change. A search is O(log log n)-competitive and takes amortized
+O(log n).
+"""
+
+from . import cost
+from .tango_strict import TangoTree, is_root_or_None
+
+
+class MultiSplayTree(TangoTree):
+
+    """
+    Multi-Splay Trees are a class of O(log log n)-competetive binary search
+    trees. They only support searches.
+
+    The nodes are TangoNodes. Their colors are not used.
+
+    Args:
+        keys (iterable): The static universe of keys.
+        data (iterable, optional): The data for each key.
+    """
+
+    def search(self, key):
+        """
+        Search for key in the tree.
+
+        The search is only defined for accesses, i.e. keys that are actually
+        in the tree.
+
+        Returns:
+            The reference p of a node with p.key == key. It is the root of
+            the tree afterwards.
+        """
+        # Start at the root.
+        p = self.root
+
+        # We do a normal BST walk.
+        while True:
+            if p.key < key:
+                p = p.right
+            elif p.key > key:
+                p = p.left
+            else:
+                if cost.active is not None:
+                    cost.active.comparisons += 1
+                break
+            if cost.active is not None:
+                cost.active.add(moves=1, comparisons=1)
+
+            # If we enter another auxiliary tree, its path becomes the
+            # preferred child of its parent y in P. p stays the root of the
+            # subtree containing key, so we go on from p.
+            if p.is_root:
+                if self._listeners:
+                    self._emit('marked', node=p, key=key)
+                y = self._reference_parent(p)
+                self._switch(y, p.key < y.key)
+
+        # The preferred child of the accessed node is left.
+        self._splay(p)
+        self._switch(p, True)
+
+        if self._listeners:
+            self._emit('access', node=p, key=key)
+        return p
+
+    def _reference_parent(self, p):
+        """
+        Returns the parent y in P of the top of the path with root p.
+
+        The keys of the path form a gap between two neighbouring nodes of the
+        auxiliary tree above. One of them is y, the one with depth
+        p.min_depth - 1.
+        """
+        d = p.min_depth - 1
+        q = p.parent
+        if q.depth == d:
+            return q
+
+        # y is the other neighbour, so go up until we come from the other
+        # side.
+        if p == q.left:
+            while q == q.parent.left:
+                q = q.parent
+        else:
+            while q == q.parent.right:
+                q = q.parent
+        return q.parent
+
+    def _splay(self, p, top=None):
+        """
+        Splay p in its auxiliary tree until it is the root or its parent is
+        top.
+        """
+        while not p.is_root and p.parent is not top:
+            parent = p.parent
+            if parent.is_root or parent.parent is top:
+                # zig
+                p.rotate()
+            elif (p == parent.left) == (parent == parent.parent.left):
+                # zig zig
+                parent.rotate()
+                p.rotate()
+            else:
+                # zig zag
+                p.rotate()
+                p.rotate()
+
+    def _switch(self, y, left):
+        """
+        Make the left (or right) child of y in P its preferred child.
+
+        Afterwards y is the root of its auxiliary tree.
+        """
+        self._splay(y)
+        d = y.depth
+
+        # The side of the current preferred path, if any.
+        if not is_root_or_None(y.left) and y.left.max_depth > d:
+            current = True
+        elif not is_root_or_None(y.right) and y.right.max_depth > d:
+            current = False
+        else:
+            current = None
+
+        if current == left:
+            return y
+
+        if current is not None:
+            self._cut_path(y, current)
+
+        # The new preferred path hangs in the gap next to y.
+        p = y.left if left else y.right
+        if p is not None and not p.is_root:
+            if left:
+                while not is_root_or_None(p.right):
+                    p = p.right
+                p = p.right
+            else:
+                while not is_root_or_None(p.left):
+                    p = p.left
+                p = p.left
+        if p is not None:
+            self._join(p)
+
+        return y
+
+    def _cut_path(self, y, left):
+        """
+        Cut the preferred path below y off the auxiliary tree rooted at y.
+
+        The path consists of the nodes deeper than y on the given side. They
+        are the keys between y and the nearest node q on that side with a
+        smaller depth than y.
+        """
+        d = y.depth
+        p = y.left if left else y.right
+
+        # Find q, i.e. the node nearest to y with depth < d.
+        q = None
+        moves = 0
+        if p.min_depth < d:
+            while True:
+                inner = p.right if left else p.left
+                if not is_root_or_None(inner) and inner.min_depth < d:
+                    p = inner
+                elif p.depth < d:
+                    q = p
+                    break
+                else:
+                    p = p.left if left else p.right
+                moves += 1
+        if cost.active is not None:
+            cost.active.moves += moves
+
+        if q is not None:
+            self._splay(q, y)
+            p = q.right if left else q.left
+        else:
+            p = y.left if left else y.right
+
+        p.is_root = True
+        if q is not None:
+            q._update_depths()
+        y._update_depths()
+
+        if self._listeners:
+            self._emit('cut', node=p, depth=d)
+
+    def _join(self, p):
+        """
+        Join the auxiliary tree rooted at p with the auxiliary tree above.
+        """
+        p.is_root = False
+        q = p.parent
+        moves = 0
+        while True:
+            q._update_depths()
+            if q.is_root:
+                break
+            q = q.parent
+            moves += 1
+        if cost.active is not None:
+            cost.active.moves += moves
+
+        if self._listeners:
+            self._emit('join', node=p)
+
+
+def main():
+    import logging
+    from bstvis.viewer import TreeView
+    from bstvis.tree.events import EventLogger
+    from bstvis.tree.tango_strict import node_shape
+
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
+
+    t = MultiSplayTree(range(12))
+    tv = TreeView(t, node_attributes=['d', 'min_d', 'max_d'], width=800,
+                  node_shape=node_shape)
+    t.subscribe(EventLogger())
+    tv.view()
+
+    for key in (0, 2, 4, 6, 8, 11):
+        t.search(key)
+        tv.view(highlight_nodes=[t.root])
+
+
+if __name__ == '__main__':
+    main()
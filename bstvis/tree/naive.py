@@ -1,3 +1,4 @@
+from . import cost
 from .bintree import BinaryTree, Node
 
 
@@ -13,16 +14,45 @@ class NaiveBST(BinaryTree):
         super().__init__()
         self.root = None
 
+    @classmethod
+    def from_sorted(cls, keys, data=None):
+        """
+        Build a perfect tree from sorted keys in O(n).
+
+        Args:
+            keys (list): A sorted list of distinct keys.
+            data (list, optional): The data for each key.
+
+        Returns:
+            A new tree containing the keys.
+        """
+        t = cls()
+        t.root = build_perfect(keys, data, t._perfect_node)
+        if t.root:
+            t.root.tree = t
+        return t
+
+    def _perfect_node(self, key, data, depth, height):
+        """Create a node for from_sorted()."""
+        return Node(key, data)
+
     def _search(self, key):
         p = self.root
+        steps = 0
         while p is not None:
+            steps += 1
             if p.key == key:
-                return p.data
+                break
             elif p.key < key:
                 p = p.right
             else:
                 p = p.left
-        raise KeyError("Key {} not found".format(key))
+
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+        if p is None:
+            raise KeyError("Key {} not found".format(key))
         return p
 
     def search(self, key):
@@ -57,21 +87,22 @@ class NaiveBST(BinaryTree):
                 # you can also write p.info etc. but p.key is fixed and
                 # the pointers can only be modified with rotations
                 # you must execute one of the above operations or return
+                # Returns the next pointer and whether the access is done.
                 if p is None:
                     raise KeyError("Key {} not found".format(searchTarget))
                 elif p.key == searchTarget:
-                    return p
+                    return p, True
                 elif p.key < searchTarget:
-                    p = moveRight(p)
-                    return alg(p)
+                    return moveRight(p), False
                 elif p.key > searchTarget:
-                    p = moveLeft(p)
-                    return alg(p)
+                    return moveLeft(p), False
             return alg
 
         alg = accessAlgorithm(key)
         p = self.root   # pointer is always initialized to root node
-        p = alg(p)      # run algorithm
+        done = False
+        while not done:
+            p, done = alg(p)    # run algorithm step by step
 
         return p.data
 
@@ -82,19 +113,29 @@ class NaiveBST(BinaryTree):
         Returns True for insert (key is new) and
         False for update (key already present).
         """
+        return self._insert(key, data)[1]
+
+    def _insert(self, key, data=None):
+        """
+        Insert or update data for given key.
+
+        Returns:
+            tuple: (p, inserted) - the node with key and whether it is new.
+        """
         # TODO quick and dirty implementation
         if self.root is None:
             self.root = Node(key, data, tree=self)
-            return True
+            return self.root, True
 
         p = self.root
         parent = None
         isLeftChild = False
+        steps = 0
 
         while p is not None:
+            steps += 1
             if key == p.key:
-                p.data = data
-                return False
+                break
             elif key < p.key:
                 parent = p
                 p = p.left
@@ -104,48 +145,165 @@ class NaiveBST(BinaryTree):
                 p = p.right
                 isLeftChild = False
 
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1, comparisons=steps)
+        if p is not None:
+            p.data = data
+            return p, False
+
         p = Node(key, data, parent)
         if isLeftChild:
             parent.left = p
         else:
             parent.right = p
-        return True
+        parent._update_path()
+        return p, True
 
     def delete(self, key):
-        pass
+        """
+        Delete the node with the given key.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        try:
+            z = self._search(key)
+        except KeyError:
+            return False
+
+        # Case 1/2: z has at most one child, replace z by it.
+        if z.left is None:
+            x_parent = z.parent
+            self._transplant(z, z.right)
+        elif z.right is None:
+            x_parent = z.parent
+            self._transplant(z, z.left)
+        # Case 3: z has two children, replace z by its successor y.
+        else:
+            y = z.right
+            steps = 1
+            while y.left:
+                y = y.left
+                steps += 1
+            if cost.active is not None:
+                cost.active.moves += steps
+
+            if y.parent == z:
+                x_parent = y
+            else:
+                # y has no left child, so replace it by its right child
+                x_parent = y.parent
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+
+        z.parent = z.left = z.right = None
+        if x_parent:
+            x_parent._update_path()
+        return True
+
+    def _transplant(self, u, v):
+        """
+        Replace the subtree rooted at u by the subtree rooted at v.
+
+        The children of v are not changed.
+        """
+        if u.parent is None:
+            self.root = v
+            if v:
+                v.tree = self
+            u.tree = None
+        elif u == u.parent.left:
+            u.parent.left = v
+        else:
+            u.parent.right = v
+        if v:
+            v.parent = u.parent
 
     def __repr__(self):
         return self.root.__repr__()
 
-    def preorder(self):
-        return self.root.preorder()
+
+def perfect_split(n):
+    """
+    Returns the index of the root if n sorted keys are arranged as a perfect
+    tree, i.e. the number of keys in its left subtree.
+    """
+    # x = 1
+    # while x <= n//2:
+    #     x *= 2
+    x = 1 << (n.bit_length() - 1)
+    if x//2 - 1 <= (n-x):
+        return x - 1
+    else:
+        return n - x//2
+
+
+def build_perfect(keys, data, make_node):
+    """
+    Build a perfect tree from sorted keys in O(n).
+
+    All levels are full except for the last one which is filled from the
+    left, i.e. the tree has the same shape as a tree built by
+    perfect_inserter(). The recursion depth is only O(log n).
+
+    Args:
+        keys (list): A sorted list of distinct keys.
+        data (list): The data for each key or None.
+        make_node (function): (key, data, depth, height) -> Node
+            creating a node at the given depth where height is the height
+            of the whole tree.
+
+    Returns:
+        The root of the tree or None if there are no keys. The tree pointer
+        of the root is not set.
+    """
+    height = len(keys).bit_length() - 1
+
+    def build(lo, hi, depth):
+        """Build the subtree of keys[lo:hi]."""
+        if lo == hi:
+            return None
+
+        mid = lo + perfect_split(hi - lo)
+        node = make_node(keys[mid], data[mid] if data is not None else None,
+                         depth, height)
+
+        node.left = build(lo, mid, depth + 1)
+        if node.left:
+            node.left.parent = node
+        node.right = build(mid + 1, hi, depth + 1)
+        if node.right:
+            node.right.parent = node
+        node._update_augmentation()
+        return node
+
+    return build(0, len(keys), 0)
 
 
 def perfect_inserter(t, keys):
     """Insert keys into tree t such that t is perfect.
+
+    Uses t.insert() for every key, so the tree can keep its invariants.
+    If you only want to build a tree from sorted keys use the faster
+    from_sorted() of the tree class.
+
     Args:
         t (BinaryTree): An empty tree.
         keys (list): A sorted list of keys.
     """
-    def f(n):
-        """find the point so partition n keys for a perfect tree"""
-        # x = 1
-        # while x <= n//2:
-        #     x *= 2
-        x = 1 << (n.bit_length() - 1)
-        if x//2 - 1 <= (n-x):
-            return x - 1
-        else:
-            return n - x//2
+    def insert(lo, hi):
+        """Insert keys[lo:hi]."""
+        if lo < hi:
+            x = lo + perfect_split(hi - lo)
+            t.insert(keys[x])
+            insert(lo, x)
+            insert(x + 1, hi)
 
-    n = len(keys)
-    if n == 0:
-        return
-    else:
-        x = f(n)
-        t.insert(keys[x])
-        perfect_inserter(t, keys[:x])
-        perfect_inserter(t, keys[x+1:])
+    insert(0, len(keys))
 
 
 def usage():
@@ -183,12 +341,12 @@ def usage():
     for key in universe:
         tree.insert(key)
     # print(tree)
-    # print(tree.preorder())
+    # print(tree.root.preorder())
 
     node5 = tree.root.left
     node5.rotate()
     print(tree)
-    # print(' '.join([str(key) for key in tree.preorder()]))
+    # print(' '.join([str(node.key) for node in tree.preorder()]))
 
     from viewer.treeview import TreeView
     tv = TreeView(tree)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A persistent BST keeping every version of the tree (path copying).
+
+Nodes are never modified after their creation. An update copies the nodes
+on the search path and links the copies to the unchanged subtrees, so all
+versions share everything off their paths. The tree is kept
+height-balanced (AVL) with the height stored in every Node anyway, so each
+version costs O(log n) new nodes and a history of s updates of an n-node
+tree needs O(n + s log n) memory instead of O(n s) for full copies.
+
+Nodes are shared between versions, so they can not have a parent: the
+parent of every node is None. Everything reading the tree top-down
+(search, traversals, select/rank, range, layouts) works, successor() and
+Cursor do not.
+"""
+
+from . import cost
+from .bintree import BinaryTree, Node
+from .naive import perfect_split
+
+
+def _height(p):
+    return p.height if p is not None else -1
+
+
+def _balance(key, data, left, right):
+    """
+    Returns a new node with the given fields, rebalanced with one or two
+    rotations if the heights of left and right differ by 2.
+
+    Only new nodes are created, the children are not modified.
+    """
+    hl = _height(left)
+    hr = _height(right)
+    if hl > hr + 1:
+        if _height(left.left) >= _height(left.right):
+            if cost.active is not None:
+                cost.active.rotations += 1
+            return Node(left.key, left.data, left=left.left,
+                        right=Node(key, data, left=left.right, right=right))
+        lr = left.right
+        if cost.active is not None:
+            cost.active.rotations += 2
+        return Node(lr.key, lr.data,
+                    left=Node(left.key, left.data, left=left.left,
+                              right=lr.left),
+                    right=Node(key, data, left=lr.right, right=right))
+    if hr > hl + 1:
+        if _height(right.right) >= _height(right.left):
+            if cost.active is not None:
+                cost.active.rotations += 1
+            return Node(right.key, right.data,
+                        left=Node(key, data, left=left, right=right.left),
+                        right=right.right)
+        rl = right.left
+        if cost.active is not None:
+            cost.active.rotations += 2
+        return Node(rl.key, rl.data,
+                    left=Node(key, data, left=left, right=rl.left),
+                    right=Node(right.key, right.data, left=rl.right,
+                               right=right.right))
+    return Node(key, data, left=left, right=right)
+
+
+def _rebuild(path, p):
+    """
+    Copy the nodes of a search path bottom-up.
+
+    Args:
+        path (list): (node, went_left) from the top to the bottom.
+        p (Node): The new subtree replacing the end of the path.
+
+    Returns:
+        The new top of the path.
+    """
+    for node, went_left in reversed(path):
+        if went_left:
+            p = _balance(node.key, node.data, p, node.right)
+        else:
+            p = _balance(node.key, node.data, node.left, p)
+    return p
+
+
+class PersistentTree(BinaryTree):
+
+    """
+    A persistent height-balanced BST.
+
+    Every insert() and delete() which changes the tree adds a version.
+    versions[i] is the root of version i, version 0 is the initial tree.
+    version(i) opens a version in O(1) as a PersistentTree of its own, so
+    it can be read and even updated without affecting this tree.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.versions = [None]
+
+    @classmethod
+    def from_sorted(cls, keys, data=None):
+        """
+        Build a perfect tree from sorted keys in O(n).
+
+        Args:
+            keys (list): A sorted list of distinct keys.
+            data (list, optional): The data for each key.
+
+        Returns:
+            A new tree containing the keys as its version 0.
+        """
+        def build(lo, hi):
+            """Build the subtree of keys[lo:hi]."""
+            if lo == hi:
+                return None
+            mid = lo + perfect_split(hi - lo)
+            return Node(keys[mid], data[mid] if data is not None else None,
+                        left=build(lo, mid), right=build(mid + 1, hi))
+
+        t = cls()
+        t.root = t.versions[0] = build(0, len(keys))
+        return t
+
+    def version(self, i):
+        """Returns version i as a new PersistentTree in O(1)."""
+        t = type(self)()
+        t.root = t.versions[0] = self.versions[i]
+        return t
+
+    def _commit(self, root):
+        """Make root the current version."""
+        self.root = root
+        self.versions.append(root)
+
+    def _path(self, key):
+        """
+        Returns (path, p) - the search path to key as (node, went_left)
+        pairs and the node with key or None.
+        """
+        path = []
+        p = self.root
+        steps = 0
+        while p is not None:
+            steps += 1
+            if key < p.key:
+                path.append((p, True))
+                p = p.left
+            elif p.key < key:
+                path.append((p, False))
+                p = p.right
+            else:
+                break
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+        return path, p
+
+    def search(self, key):
+        p = self._path(key)[1]
+        if p is None:
+            raise KeyError("Key {} not found".format(key))
+        return p.data
+
+    def insert(self, key, data=None):
+        """
+        Insert or update data for given key in a new version.
+
+        Returns True for insert (key is new) and
+        False for update (key already present).
+        """
+        path, p = self._path(key)
+        if p is None:
+            self._commit(_rebuild(path, Node(key, data)))
+            return True
+        self._commit(_rebuild(path, Node(key, data, left=p.left,
+                                         right=p.right)))
+        return False
+
+    def delete(self, key):
+        """
+        Delete the node with the given key in a new version.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        path, z = self._path(key)
+        if z is None:
+            return False
+
+        if z.left is None:
+            p = z.right
+        elif z.right is None:
+            p = z.left
+        else:
+            # Replace z with the minimum of its right subtree.
+            min_path = []
+            m = z.right
+            while m.left is not None:
+                min_path.append((m, True))
+                m = m.left
+            if cost.active is not None:
+                cost.active.moves += len(min_path) + 1
+            p = _balance(m.key, m.data, z.left, _rebuild(min_path, m.right))
+        self._commit(_rebuild(path, p))
+        return True
+
+
+def main():
+    import random
+    random.seed(0)
+
+    t = PersistentTree()
+    keys = list(range(16))
+    random.shuffle(keys)
+    for key in keys:
+        t.insert(key)
+    for key in keys[:8]:
+        t.delete(key)
+
+    # Every version is still there.
+    for i in (0, 8, 16, len(t.versions) - 1):
+        v = t.version(i)
+        print("version {:2}: {}".format(i, [p.key for p in v.inorder()]))
+
+
+if __name__ == '__main__':
+    main()
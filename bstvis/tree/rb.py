@@ -1,3 +1,4 @@
+from . import cost
 from .bintree import Node
 from .naive import NaiveBST
 
@@ -15,6 +16,8 @@ class RBNode(Node):
     The black-height has to be maintained during rotations.
     """
 
+    __slots__ = ('color', 'bh')
+
     def __init__(self, key,
                  data=None, parent=None, left=None, right=None, tree=None,
                  color=RED, bh=0):
@@ -25,46 +28,6 @@ class RBNode(Node):
         self.color = color
         self.bh = bh
 
-    @property
-    def grand_parent(self):
-        if self.parent:
-            return self.parent.parent
-        else:
-            return None
-
-    def rotate(self):
-        """
-        Rotate node with parent if present.
-        """
-        if self.parent is None:
-            return
-
-        parent = self.parent
-
-        if parent.parent:
-            if parent.parent.left == parent:
-                parent.parent.left = self
-            elif parent.parent.right == parent:
-                parent.parent.right = self
-        else:
-            # we rotate to root -> change in tree
-            self.tree = parent.tree
-            self.tree.root = self
-            parent.tree = None
-        self.parent = parent.parent
-
-        if parent.left == self:
-            parent.left = self.right
-            if self.right:
-                self.right.parent = parent
-            self.right = parent
-        elif parent.right == self:
-            parent.right = self.left
-            if self.left:
-                self.left.parent = parent
-            self.left = parent
-        parent.parent = self
-
 
 class RBTree(NaiveBST):
 
@@ -87,6 +50,21 @@ class RBTree(NaiveBST):
         super().__init__()
     # drawing reads color attributes so use constants of matplotlib
 
+    def _perfect_node(self, key, data, depth, height):
+        """
+        Create a node for from_sorted().
+
+        The nodes of the last level are RED, all other nodes (and the root)
+        are BLACK. Since all leaves of a perfect tree have depth height or
+        height - 1 every root-to-leaf-path has height BLACK nodes.
+        """
+        if depth == 0 and height == 0:
+            return RBNode(key, data, color=BLACK, bh=1)
+        elif depth < height:
+            return RBNode(key, data, color=BLACK, bh=height - depth)
+        else:
+            return RBNode(key, data, color=RED, bh=0)
+
     # search like NaiveBST
 
     def insert(self, key, data=None):
@@ -105,11 +83,12 @@ class RBTree(NaiveBST):
         p = self.root
         parent = None
         isLeftChild = False
+        steps = 0
 
         while p is not None:
+            steps += 1
             if key == p.key:
-                p.data = data
-                return False
+                break
             elif key < p.key:
                 parent = p
                 p = p.left
@@ -119,6 +98,12 @@ class RBTree(NaiveBST):
                 p = p.right
                 isLeftChild = False
 
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1, comparisons=steps)
+        if p is not None:
+            p.data = data
+            return False
+
         p = RBNode(key, data, parent)
         if isLeftChild:
             parent.left = p
@@ -127,6 +112,10 @@ class RBTree(NaiveBST):
         p.color = RED
         p.bh = 0
         RBTree._insert_fixup(p)
+        # the rotations keep size and height of the rotated nodes, only the
+        # ancestors of p have to be updated
+        p._update_path()
+        return True
 
     def _insert_fixup(p):
         """fix rb-properties"""
@@ -146,6 +135,8 @@ class RBTree(NaiveBST):
                     y.bh += 1
                     p.parent.parent.color = RED
                     p = p.parent.parent
+                    if cost.active is not None:
+                        cost.active.moves += 2
                 else:
                     #   gB             gB          qB
                     #  / \            / \         / \
@@ -170,6 +161,8 @@ class RBTree(NaiveBST):
                     y.bh += 1
                     p.parent.parent.color = RED
                     p = p.parent.parent
+                    if cost.active is not None:
+                        cost.active.moves += 2
                 else:
                     if p == p.parent.left:
                         p.rotate()
@@ -185,7 +178,162 @@ class RBTree(NaiveBST):
             p.bh += 1
 
     def delete(self, key):
-        pass
+        """
+        Delete the node with the given key.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        try:
+            z = self._search(key)
+        except KeyError:
+            return False
+
+        # Like NaiveBST.delete() but we remember the color of the removed
+        # node y and the node x moved into its place (x may be None, so we
+        # remember its parent as well).
+        y_color = z.color
+        if z.left is None:
+            x = z.right
+            x_parent = z.parent
+            self._transplant(z, z.right)
+        elif z.right is None:
+            x = z.left
+            x_parent = z.parent
+            self._transplant(z, z.left)
+        else:
+            y = z.right
+            steps = 1
+            while y.left:
+                y = y.left
+                steps += 1
+            if cost.active is not None:
+                cost.active.moves += steps
+            y_color = y.color
+            x = y.right
+
+            if y.parent == z:
+                x_parent = y
+            else:
+                x_parent = y.parent
+                self._transplant(y, y.right)
+                y.right = z.right
+                y.right.parent = y
+            self._transplant(z, y)
+            y.left = z.left
+            y.left.parent = y
+            y.color = z.color
+            y.bh = z.bh
+
+        z.parent = z.left = z.right = None
+
+        if y_color == BLACK:
+            self._delete_fixup(x, x_parent)
+        # the rotations keep size and height of the rotated nodes and
+        # x_parent is still the parent of x
+        if x_parent:
+            x_parent._update_path()
+        return True
+
+    def _delete_fixup(self, x, parent):
+        """
+        fix rb-properties after a BLACK node was removed
+
+        x (maybe None) with the given parent is "doubly black", i.e.
+        bh(x) is one less than the black-height of its sibling w.
+        The ancestors of x keep their black-height until the missing BLACK
+        node is restored.
+        """
+        while x != self.root and (x is None or x.color == BLACK):
+            if x == parent.left:
+                w = parent.right
+                if w.color == RED:
+                    #    pB           wB
+                    #   / \          / \
+                    #  x   wR  -->   pR  B
+                    #     / \       / \
+                    #    B   B     x   B (new w)
+                    w.color = BLACK
+                    w.bh += 1
+                    parent.color = RED
+                    parent.bh -= 1
+                    w.rotate()
+                    w = parent.right
+                if (w.left is None or w.left.color == BLACK) and \
+                        (w.right is None or w.right.color == BLACK):
+                    # recolor w and move the missing BLACK up
+                    w.color = RED
+                    w.bh -= 1
+                    x = parent
+                    if cost.active is not None:
+                        cost.active.moves += 1
+                    x.bh -= 1
+                    parent = x.parent
+                else:
+                    if w.right is None or w.right.color == BLACK:
+                        #   p          p
+                        #  / \        / \
+                        # x   wB -->  x   B (new w)
+                        #    /             \
+                        #   R               wR
+                        w.left.color = BLACK
+                        w.left.bh += 1
+                        w.color = RED
+                        w.bh -= 1
+                        w.left.rotate()
+                        w = parent.right
+                    #    p              w
+                    #   / \            / \
+                    #  x   wB   -->   pB  B
+                    #     / \        / \
+                    #    C   R      x   C
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.right.color = BLACK
+                    w.right.bh += 1
+                    w.rotate()
+                    parent.bh = (parent.right.bh if parent.right else 0) + 1
+                    w.bh = parent.bh + (w.color == BLACK)
+                    x = self.root
+            else:
+                # analog left <-> right
+                w = parent.left
+                if w.color == RED:
+                    w.color = BLACK
+                    w.bh += 1
+                    parent.color = RED
+                    parent.bh -= 1
+                    w.rotate()
+                    w = parent.left
+                if (w.left is None or w.left.color == BLACK) and \
+                        (w.right is None or w.right.color == BLACK):
+                    w.color = RED
+                    w.bh -= 1
+                    x = parent
+                    if cost.active is not None:
+                        cost.active.moves += 1
+                    x.bh -= 1
+                    parent = x.parent
+                else:
+                    if w.left is None or w.left.color == BLACK:
+                        w.right.color = BLACK
+                        w.right.bh += 1
+                        w.color = RED
+                        w.bh -= 1
+                        w.right.rotate()
+                        w = parent.left
+                    w.color = parent.color
+                    parent.color = BLACK
+                    w.left.color = BLACK
+                    w.left.bh += 1
+                    w.rotate()
+                    parent.bh = (parent.left.bh if parent.left else 0) + 1
+                    w.bh = parent.bh + (w.color == BLACK)
+                    x = self.root
+
+        if x is not None and x.color == RED:
+            x.color = BLACK
+            x.bh += 1
 
     def __repr__(self):
         return self.root.__repr__()
@@ -248,32 +396,364 @@ class RBTree(NaiveBST):
 
         if x.color == RED:
             RBTree._insert_fixup(x)
+        x._update_path()
+
+    def split(self, key):
+        """
+        Split the tree at key in O(log n).
 
-    def split(self, x):
-        # search for x
+        The subtrees hanging off the search path of key are joined bottom
+        up into the left and the right tree. Each join costs O(1 + the
+        difference of the black-heights) and the differences add up to the
+        black-height of the tree. This tree is empty afterwards.
+
+        Args:
+            key: The split key. It does not need to be in the tree.
+
+        Returns:
+            tuple: (left, right) - new trees with the keys smaller than key
+                and the keys greater or equal than key.
+        """
+        left, p, right = self._split(key)
+        if p is not None:
+            right._join(None, p, right.root)
+        return left, right
+
+    def _split(self, key):
+        """
+        Split the tree at key in O(log n).
+
+        Returns:
+            tuple: (left, p, right) - new trees with the keys smaller and
+                greater than key and the detached node p with key or None.
+        """
+        left = type(self)()
+        right = type(self)()
+
+        path = []
         p = self.root
         while p is not None:
-            if p.key == x:
-                break
-            elif p.key < x:
+            path.append(p)
+            if p.key < key:
                 p = p.right
-            else:
+            elif key < p.key:
                 p = p.left
-        else:
-            raise KeyError("Key {} not found".format(x))
-
-        while p != self.root:
-            if p == p.parent.left:
-                #     pp
-                #    /  \
-                #   p   r_n
-                #  / \
-                # L   R
-                p.rotate()
-                RBTree._concatenate(p.right)
             else:
-                p.rotate()
-                RBTree._concatenate(p.left)
+                break
+        if cost.active is not None:
+            cost.active.add(moves=max(len(path) - 1, 0),
+                            comparisons=len(path))
+
+        self.root = None
+        found = None
+        # The child of p on the path is already part of left or right.
+        for p in reversed(path):
+            if p.key < key:
+                # p and its left subtree are smaller than all nodes of left.
+                left._join(self._detach(p.left), p, left.root)
+            elif key < p.key:
+                right._join(right.root, p, self._detach(p.right))
+            else:
+                # p has the split key, so it is the bottom of the path.
+                left._set_subtree(self._detach(p.left))
+                right._set_subtree(self._detach(p.right))
+                p.left = p.right = p.parent = p.tree = None
+                found = p
+        return left, found, right
+
+    @staticmethod
+    def _detach(p):
+        """Cut the subtree p (may be None) off its parent. Returns p."""
+        if p is not None:
+            p.parent = None
+        return p
+
+    def _set_subtree(self, p):
+        """
+        Make the detached red-black subtree p (may be None) the root of this
+        tree. A RED root becomes BLACK.
+        """
+        self.root = p
+        if p is not None:
+            if p.color == RED:
+                p.color = BLACK
+                p.bh += 1
+            p.tree = self
+
+    @classmethod
+    def join(cls, left, key, right, data=None):
+        """
+        Join two trees and a new key in O(log n), where all keys of left are
+        smaller than key and all keys of right are greater than key.
+
+        Both trees are empty afterwards.
+
+        Args:
+            left (RBTree): The tree with the smaller keys.
+            key: The key between the trees.
+            right (RBTree): The tree with the greater keys.
+            data (optional): The data for key.
+
+        Returns:
+            RBTree: A new tree containing all keys.
+        """
+        t = cls()
+        l, r = left.root, right.root
+        left.root = right.root = None
+        if l is not None:
+            l.tree = None
+        if r is not None:
+            r.tree = None
+        t._join(l, RBNode(key, data), r)
+        return t
+
+    def _join(self, l, x, r):
+        """
+        Make x the parent of the red-black trees l and r (each may be None)
+        and store the resulting red-black tree as root of this tree.
+
+        If the black-heights differ, x is inserted as a RED node into the
+        higher tree where the right (left) spine reaches the black-height of
+        the lower tree and the RB properties are fixed as after an insert.
+        The cost is O(1 + the difference of the black-heights).
+        """
+        for t in (l, r):
+            if t is not None:
+                t.tree = None
+                if t.color == RED:
+                    t.color = BLACK
+                    t.bh += 1
+        l_bh = l.bh if l is not None else 0
+        r_bh = r.bh if r is not None else 0
+
+        x.parent = x.tree = None
+        if l_bh == r_bh:
+            x.left, x.right = l, r
+            for t in (l, r):
+                if t is not None:
+                    t.parent = x
+            x.color = BLACK
+            x.bh = l_bh + 1
+            x._update_augmentation()
+            self.root = x
+            x.tree = self
+            return
+
+        # Walk down the spine of the higher tree to the first BLACK node c
+        # with the black-height of the lower tree (c is None for height 0).
+        moves = 0
+        if l_bh > r_bh:
+            self.root = l
+            parent, c = None, l
+            while c is not None and (c.bh > r_bh or c.color == RED):
+                parent, c = c, c.right
+                moves += 1
+            parent.right = x
+            x.left, x.right = c, r
+        else:
+            self.root = r
+            parent, c = None, r
+            while c is not None and (c.bh > l_bh or c.color == RED):
+                parent, c = c, c.left
+                moves += 1
+            parent.left = x
+            x.left, x.right = l, c
+        if cost.active is not None:
+            cost.active.moves += moves
+        self.root.tree = self
+
+        x.parent = parent
+        for t in (x.left, x.right):
+            if t is not None:
+                t.parent = x
+        x.color = RED
+        x.bh = min(l_bh, r_bh)
+        x._update_augmentation()
+
+        RBTree._insert_fixup(x)
+        # The rotations keep size and height of the rotated nodes, so only
+        # the ancestors of x (the spine) have to be updated.
+        x._update_path()
+
+
+# Set operations
+#
+# union, intersection and difference divide and conquer with split and join
+# (Blelloch, Ferizovic, Sun - Just Join for Parallel Ordered Sets): split
+# the first tree at the root of the second tree, recurse on the two halves
+# independently and join the results. For trees of sizes m <= n this needs
+# O(m log(n/m + 1)) work.
+#
+# The operations reuse the nodes, so both trees are empty afterwards.
+#
+# The two recursive calls are independent, so the top of the recursion can
+# run in a concurrent.futures executor, e.g. a ProcessPoolExecutor. The
+# subproblems with less than grain nodes are submitted as tasks (their trees
+# are pickled to the workers and back) and the parent process joins the
+# results. Pickling costs about as much as the operation itself, so this
+# only pays off with several cores and large trees.
+
+UNION = 'union'
+INTERSECTION = 'intersection'
+DIFFERENCE = 'difference'
+
+
+def union(t1, t2, executor=None, grain=65536):
+    """
+    Returns a new tree with the keys of t1 or t2. For keys in both trees
+    the data of t2 is kept.
+
+    Args:
+        t1 (RBTree): The first tree.
+        t2 (RBTree): The second tree.
+        executor (concurrent.futures.Executor, optional): Run the
+            independent subproblems in this executor, default None, i.e. run
+            everything in this process.
+        grain (int, optional): The size (nodes of both trees) of the
+            subproblems submitted to the executor, default 65536.
+    """
+    return _set_operation(UNION, t1, t2, executor, grain)
+
+
+def intersection(t1, t2, executor=None, grain=65536):
+    """
+    Returns a new tree with the keys of t1 which are in t2 as well. The
+    data of t1 is kept.
+
+    See union() for the arguments.
+    """
+    return _set_operation(INTERSECTION, t1, t2, executor, grain)
+
+
+def difference(t1, t2, executor=None, grain=65536):
+    """
+    Returns a new tree with the keys of t1 which are not in t2.
+
+    See union() for the arguments.
+    """
+    return _set_operation(DIFFERENCE, t1, t2, executor, grain)
+
+
+def _set_operation(operation, t1, t2, executor, grain):
+    if executor is None:
+        result = _divide_and_conquer(operation, t1, t2)
+    else:
+        result = _collect(_submit(operation, t1, t2, executor, grain))
+
+    # The result may be one of the trees.
+    return _take(result)
+
+
+def _divide_and_conquer(operation, t1, t2):
+    """Apply the set operation in this process. Returns a tree."""
+    t = _base_case(operation, t1, t2)
+    if t is not None:
+        return t
+    l1, l2, pivot, r1, r2 = _divide(operation, t1, t2)
+    return _conquer(_divide_and_conquer(operation, l1, l2), pivot,
+                    _divide_and_conquer(operation, r1, r2))
+
+
+def _submit(operation, t1, t2, executor, grain):
+    """
+    Divide until the subproblems are smaller than grain and submit them.
+
+    Returns:
+        A tree, a Future of a tree or a tuple (left, pivot, right) where
+        left and right are returned by _submit().
+    """
+    t = _base_case(operation, t1, t2)
+    if t is not None:
+        return t
+    if t1.root.size + t2.root.size < grain:
+        # The executor may pickle the arguments later, so the task gets its
+        # own trees which this process does not touch any more.
+        return executor.submit(_divide_and_conquer, operation,
+                               _take(t1), _take(t2))
+    l1, l2, pivot, r1, r2 = _divide(operation, t1, t2)
+    return (_submit(operation, l1, l2, executor, grain), pivot,
+            _submit(operation, r1, r2, executor, grain))
+
+
+def _take(t):
+    """Returns a new tree with the nodes of t. t is empty afterwards."""
+    taken = type(t)()
+    taken._set_subtree(t.root)
+    t.root = None
+    return taken
+
+
+def _collect(result):
+    """Wait for the tasks of _submit() and join their results."""
+    if isinstance(result, tuple):
+        left, pivot, right = result
+        return _conquer(_collect(left), pivot, _collect(right))
+    if isinstance(result, RBTree):
+        return result
+    return result.result()
+
+
+def _base_case(operation, t1, t2):
+    """
+    Returns the result if one of the trees is empty, otherwise None. The
+    nodes of the other tree are dropped unless they are the result.
+    """
+    if t1.root is None:
+        if operation == UNION:
+            return t2
+        t2.root = None
+        return t1
+    if t2.root is None:
+        if operation == INTERSECTION:
+            t1.root = None
+            return t2
+        return t1
+    return None
+
+
+def _divide(operation, t1, t2):
+    """
+    Split t1 at the root k of t2.
+
+    Returns:
+        tuple: (l1, l2, pivot, r1, r2) - the halves of both trees with the
+            keys smaller and greater than k and the node to join them with
+            (or None).
+    """
+    k = t2.root
+    t2.root = None
+    l2 = type(t2)()
+    l2._set_subtree(t2._detach(k.left))
+    r2 = type(t2)()
+    r2._set_subtree(t2._detach(k.right))
+    k.left = k.right = k.tree = None
+
+    l1, found, r1 = t1._split(k.key)
+    if operation == UNION:
+        pivot = k
+    elif operation == INTERSECTION:
+        pivot = found
+    else:
+        pivot = None
+    return l1, l2, pivot, r1, r2
+
+
+def _conquer(left, pivot, right):
+    """Join the results of the halves with the pivot node (or None)."""
+    if pivot is None:
+        if left.root is None:
+            return right
+        if right.root is None:
+            return left
+        # Use the maximum of left as pivot.
+        pivot = left.root
+        while pivot.right is not None:
+            pivot = pivot.right
+        left.delete(pivot.key)
+
+    left._join(left.root, pivot, right.root)
+    right.root = None
+    return left
 
 
 def main():
@@ -308,25 +788,18 @@ def concatenateTest():
     t1 = RBTree()
     t2 = RBTree()
 
-    t = RBTree()
-    t.insert(middle)
-
     for i in left:
         t1.insert(i)
     for i in right:
         t2.insert(i)
 
-    t.root.left = t1.root
-    t1.root.parent = t.root
-    t1.root.tree = None
-    t.root.right = t2.root
-    t2.root.parent = t.root
-    t2.root.tree = None
-
+    t = RBTree.join(t1, middle, t2)
     tv = TreeView(t, node_attributes=['bh'])
     tv.view()
-    RBTree.concatenate(t)
-    tv.view()
+
+    t1, t2 = t.split(middle)
+    TreeView(t1, node_attributes=['bh']).view()
+    TreeView(t2, node_attributes=['bh']).view()
 
 if __name__ == '__main__':
     main()
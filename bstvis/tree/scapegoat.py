@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Scapegoat Trees keep a BST balanced without any balance information in the
+nodes (Galperin, Rivest - Scapegoat Trees).
+
+A tree with n nodes is alpha-height-balanced if its height is at most
+h_alpha(n) = floor(log_{1/alpha} n). If an insert puts the new node deeper
+than h_alpha(n), some ancestor x of it is not alpha-weight-balanced, i.e.
+one child of x has more than alpha * size(x) nodes. The first such ancestor
+is the scapegoat. Its subtree is rebuilt into a perfect tree with DSW in
+O(size(x)). A delete rebuilds the whole tree once the tree has shrunk below
+alpha times its maximum size.
+
+The sizes of the subtrees are maintained by Node anyway, so only the
+maximum size is stored in the tree. Updates take amortized O(log n) and the
+height is at most h_alpha(n) + 1.
+"""
+
+import math
+
+from bstvis.algorithm.dsw import dsw
+from . import cost
+from .naive import NaiveBST
+
+
+class ScapegoatTree(NaiveBST):
+
+    """
+    A Scapegoat Tree.
+
+    No augmented data besides size and height of Node.
+
+    Args:
+        alpha (float, optional): The balance parameter, 0.5 < alpha < 1,
+            default 0.7. A smaller alpha gives lower trees but more
+            rebuilds.
+    """
+
+    def __init__(self, alpha=0.7):
+        super().__init__()
+        if not 0.5 < alpha < 1:
+            raise ValueError("alpha has to be in (0.5, 1)")
+        self.alpha = alpha
+        # The maximum size since the last rebuild of the whole tree.
+        self.max_size = 0
+
+    def max_height(self, n):
+        """Returns h_alpha(n), the maximum height of a tree with n nodes."""
+        # Add a little so exact powers of 1/alpha are not rounded down.
+        return int(math.log(n) / -math.log(self.alpha) + 1e-9) if n else 0
+
+    def insert(self, key, data=None):
+        """
+        Insert or update data for given key.
+
+        Returns True for insert (key is new) and
+        False for update (key already present).
+        """
+        p, inserted = self._insert(key, data)
+        if not inserted:
+            return False
+
+        n = self.root.size
+        self.max_size = max(self.max_size, n)
+
+        depth = 0
+        q = p
+        while q.parent is not None:
+            q = q.parent
+            depth += 1
+        if cost.active is not None:
+            cost.active.moves += depth
+
+        if depth > self.max_height(n):
+            self._rebuild_scapegoat(p)
+        return True
+
+    def delete(self, key):
+        """
+        Delete the node with the given key.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        # A tree built with from_sorted() did not count its size.
+        n = self.root.size if self.root else 0
+        self.max_size = max(self.max_size, n)
+
+        if not super().delete(key):
+            return False
+
+        n -= 1
+        if n < self.alpha * self.max_size:
+            dsw(self)
+            self.max_size = n
+        return True
+
+    def _rebuild_scapegoat(self, p):
+        """
+        Rebuild the subtree of the first ancestor of p which is not
+        alpha-weight-balanced.
+        """
+        moves = 0
+        while p.parent is not None:
+            p = p.parent
+            moves += 1
+            left_size = p.left.size if p.left else 0
+            right_size = p.right.size if p.right else 0
+            if max(left_size, right_size) > self.alpha * p.size:
+                break
+
+        if cost.active is not None:
+            cost.active.moves += moves
+        dsw(self, root=p)
+
+
+def main():
+    import random
+    from bstvis.viewer import TreeView
+    random.seed(0)
+
+    t = ScapegoatTree()
+    tv = TreeView(t)
+
+    # Sorted inserts degenerate a NaiveBST but not a Scapegoat Tree.
+    for key in range(32):
+        t.insert(key)
+        tv.view()
+
+    keys = list(range(32))
+    random.shuffle(keys)
+    for key in keys[:24]:
+        t.delete(key)
+        tv.view()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+from . import cost
 from .bintree import Node
 from .naive import NaiveBST
 
@@ -5,24 +6,45 @@ from .naive import NaiveBST
 class SplayTree(NaiveBST):
 
     """
-    An unbalanced Binary Search Tree Implementation.
+    A Splay Tree.
 
     No augumented data.
+
+    Args:
+        top_down (bool): If True, accesses splay top down in a single pass
+            from the root (Sleator, Tarjan) instead of walking down to the
+            node and rotating it back up, default False.
     """
 
-    def __init__(self):
+    def __init__(self, top_down=False):
         super(SplayTree, self).__init__()
+        self.top_down = top_down
 
     def search(self, key):
+        if self.top_down:
+            if self.root is None:
+                raise KeyError("Key {} not found".format(key))
+            p = self._splay_top_down(self.root, key)
+            self._set_root(p)
+            if p.key != key:
+                raise KeyError("Key {} not found".format(key))
+            return p.data
+
         p = self.root
-        while p is None:
+        steps = 0
+        while p is not None:
+            steps += 1
             if p.key == key:
                 break
             elif p.key < key:
                 p = p.right
             else:
                 p = p.left
-        else:   # no break
+
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+        if p is None:
             raise KeyError("Key {} not found".format(key))
 
         self._splay(p)
@@ -30,10 +52,13 @@ class SplayTree(NaiveBST):
         # now p is the root
         return p.data
 
-    def _splay(self, p):
-        while p.parent is not None:
+    def _splay(self, p, top=None):
+        """
+        Splay p until its parent is top, i.e. by default until p is the root.
+        """
+        while p.parent is not top:
             # splay until root
-            if p.parent.parent is None:
+            if p.parent.parent is top:
                 # zig: one step left
                 p.rotate()
             elif p == p.parent.left and p.parent == p.grand_parent.left or \
@@ -47,6 +72,157 @@ class SplayTree(NaiveBST):
                 p.rotate()
                 p.rotate()
 
+    def _splay_top_down(self, t, key):
+        """
+        Splay the subtree rooted at t top down.
+
+        On the way down the nodes smaller than key are linked into a left
+        tree and the nodes greater than key into a right tree. Two steps in
+        the same direction rotate first (zig zig). At the end the last node
+        t on the search path becomes the root with the left tree and the
+        right tree as subtrees.
+
+        Args:
+            t (Node): The root of the subtree, not None.
+            key: The key to splay. If it is not in the subtree, the last node
+                on its search path is splayed.
+
+        Returns:
+            Node: The new root of the subtree. Its parent and tree pointers
+                are left for the caller to set.
+        """
+        # Every node of the left tree is the right child of the one before,
+        # every node of the right tree the left child of the one before.
+        left_spine = []
+        right_spine = []
+        rotations = 0
+
+        while True:
+            if key < t.key:
+                y = t.left
+                if y is None:
+                    break
+                if key < y.key:
+                    # zig zig: rotate right
+                    t.left = y.right
+                    if t.left:
+                        t.left.parent = t
+                    y.right = t
+                    t.parent = y
+                    t._update_augmentation()
+                    rotations += 1
+                    t = y
+                    if t.left is None:
+                        break
+                # link right
+                if right_spine:
+                    right_spine[-1].left = t
+                    t.parent = right_spine[-1]
+                right_spine.append(t)
+                t = t.left
+            elif key > t.key:
+                y = t.right
+                if y is None:
+                    break
+                if key > y.key:
+                    # zig zig: rotate left
+                    t.right = y.left
+                    if t.right:
+                        t.right.parent = t
+                    y.left = t
+                    t.parent = y
+                    t._update_augmentation()
+                    rotations += 1
+                    t = y
+                    if t.right is None:
+                        break
+                # link left
+                if left_spine:
+                    left_spine[-1].right = t
+                    t.parent = left_spine[-1]
+                left_spine.append(t)
+                t = t.right
+            else:
+                break
+
+        # assemble
+        if left_spine:
+            left_spine[-1].right = t.left
+            if t.left:
+                t.left.parent = left_spine[-1]
+            t.left = left_spine[0]
+            t.left.parent = t
+        if right_spine:
+            right_spine[-1].left = t.right
+            if t.right:
+                t.right.parent = right_spine[-1]
+            t.right = right_spine[0]
+            t.right.parent = t
+
+        # only the subtrees of the spine nodes changed, fix them bottom up
+        for p in reversed(left_spine):
+            p._update_augmentation()
+        for p in reversed(right_spine):
+            p._update_augmentation()
+        t._update_augmentation()
+
+        if cost.active is not None:
+            # every node on the path was visited by one move
+            moves = len(left_spine) + len(right_spine) + rotations
+            cost.active.add(moves=moves, rotations=rotations,
+                            comparisons=moves + 1)
+        return t
+
+    def _set_root(self, p):
+        """Make p the root of the tree."""
+        if self.root is not None and self.root is not p:
+            self.root.tree = None
+        self.root = p
+        if p is not None:
+            p.parent = None
+            p.tree = self
+
+    def _access(self, key):
+        """
+        Splay the node with key or the last node on its search path.
+
+        Returns:
+            Node: The new root or None if the tree is empty.
+        """
+        if self.root is None:
+            return None
+        if self.top_down:
+            self._set_root(self._splay_top_down(self.root, key))
+            return self.root
+
+        p = self.root
+        moves = 0
+        while True:
+            if key < p.key and p.left:
+                p = p.left
+            elif key > p.key and p.right:
+                p = p.right
+            else:
+                break
+            moves += 1
+        if cost.active is not None:
+            cost.active.add(moves=moves, comparisons=moves + 1)
+        self._splay(p)
+        return p
+
+    def _search_sorted(self, keys):
+        """
+        Splay the keys one after another.
+
+        Accessing the keys in sorted order is sequential access, which costs
+        only O(1) amortized per key for a splay tree.
+        """
+        nodes = []
+        for key in keys:
+            p = self._access(key)
+            nodes.append(p if p is not None and p.key == key else None)
+        return nodes
+
     def insert(self, key, data=None):
         """
         Insert or update data for given key.
@@ -59,15 +235,18 @@ class SplayTree(NaiveBST):
             self.root = Node(key, data, tree=self)
             return True
 
+        if self.top_down:
+            return self._insert_top_down(key, data)
+
         p = self.root
         parent = None
         isLeftChild = False
+        steps = 0
 
         while p is not None:
+            steps += 1
             if key == p.key:
-                p.data = data
-                self._splay(p)
-                return False
+                break
             elif key < p.key:
                 parent = p
                 p = p.left
@@ -77,23 +256,220 @@ class SplayTree(NaiveBST):
                 p = p.right
                 isLeftChild = False
 
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1, comparisons=steps)
+        if p is not None:
+            p.data = data
+            self._splay(p)
+            return False
+
         p = Node(key, data, parent)
         if isLeftChild:
             parent.left = p
         else:
             parent.right = p
         self._splay(p)
+        # Splaying recomputes size and height of every ancestor of p
+        # bottom up, so only the new root p is left.
+        p._update_path()
+        return True
+
+    def _insert_top_down(self, key, data):
+        """
+        Splay the search path of key and split at the new root.
+
+        The new node becomes the root with the two halves as subtrees.
+        """
+        t = self._splay_top_down(self.root, key)
+        if t.key == key:
+            t.data = data
+            self._set_root(t)
+            return False
+
+        p = Node(key, data)
+        if key < t.key:
+            p.left = t.left
+            p.right = t
+            t.left = None
+        else:
+            p.right = t.right
+            p.left = t
+            t.right = None
+        for child in (p.left, p.right):
+            if child:
+                child.parent = p
+        t._update_augmentation()
+        p._update_augmentation()
+        self._set_root(p)
         return True
 
     def delete(self, key):
-        pass
+        """
+        Delete the node with the given key.
+
+        The node is splayed to the root and removed. Then the maximum of
+        the left subtree is splayed to the top of the left subtree and
+        becomes the new root with the right subtree as right child.
+
+        Returns True for delete (key was present) and
+        False if the key is not in the tree.
+        """
+        if self.top_down:
+            return self._delete_top_down(key)
+
+        p = self.root
+        last = None
+        steps = 0
+        while p is not None:
+            steps += 1
+            if p.key == key:
+                break
+            last = p
+            if p.key < key:
+                p = p.right
+            else:
+                p = p.left
+        if cost.active is not None:
+            cost.active.add(moves=steps - 1 if steps else 0,
+                            comparisons=steps)
+
+        if p is None:
+            # splay the last node on the search path as for an access
+            if last is not None:
+                self._splay(last)
+            return False
+
+        self._splay(p)
+
+        # now p is the root
+        left = p.left
+        right = p.right
+        if left is None:
+            new_root = right
+        else:
+            m = left
+            moves = 1
+            while m.right:
+                m = m.right
+                moves += 1
+            if cost.active is not None:
+                cost.active.moves += moves
+            self._splay(m, p)
+            # m is the left child of p and has no right child
+            m.right = right
+            if right:
+                right.parent = m
+            new_root = m
+
+        p.left = p.right = p.tree = None
+        self.root = new_root
+        if new_root:
+            new_root.parent = None
+            new_root.tree = self
+            new_root._update_augmentation()
+        return True
+
+    def _delete_top_down(self, key):
+        """See delete(), both splays are top down."""
+        if self.root is None:
+            return False
+        p = self._splay_top_down(self.root, key)
+        if p.key != key:
+            self._set_root(p)
+            return False
+
+        if p.left is None:
+            new_root = p.right
+        else:
+            # every key of the left subtree is smaller than key, so its
+            # maximum ends up at the top without a right child
+            new_root = self._splay_top_down(p.left, key)
+            new_root.right = p.right
+            if p.right:
+                p.right.parent = new_root
+            new_root._update_augmentation()
+
+        p.left = p.right = p.parent = None
+        self._set_root(new_root)
+        return True
+
+    def split(self, key):
+        """
+        Split the tree at key.
+
+        The last node on the search path of key is splayed to the root
+        and one of its subtrees is cut off. This tree is empty afterwards.
+
+        Args:
+            key: The split key. It does not need to be in the tree.
+
+        Returns:
+            tuple: (left, right) - new trees with the keys smaller than key
+                and the keys greater or equal than key.
+        """
+        left = type(self)(top_down=self.top_down)
+        right = type(self)(top_down=self.top_down)
+
+        p = self._access(key)
+        if p is not None:
+            if p.key < key:
+                cut = p.right
+                p.right = None
+                left._set_root(p)
+                right._set_root(cut)
+            else:
+                cut = p.left
+                p.left = None
+                left._set_root(cut)
+                right._set_root(p)
+            p._update_augmentation()
+            self.root = None
+        return left, right
+
+    @classmethod
+    def join(cls, left, right):
+        """
+        Join two splay trees where all keys of left are smaller than the keys
+        of right.
+
+        The maximum of left is splayed to the root and right becomes its
+        right subtree. Both trees are empty afterwards.
+
+        Args:
+            left (SplayTree): The tree with the smaller keys.
+            right (SplayTree): The tree with the greater keys.
+
+        Returns:
+            SplayTree: A new tree containing all keys.
+        """
+        t = cls(top_down=left.top_down)
+
+        if left.root is None:
+            t._set_root(right.root)
+        else:
+            m = left.root
+            moves = 0
+            while m.right:
+                m = m.right
+                moves += 1
+            if cost.active is not None:
+                cost.active.moves += moves
+            # the maximum is already found, so splay it without searching
+            left._splay(m)
+            p = m
+            p.right = right.root
+            if p.right:
+                p.right.parent = p
+                p.right.tree = None
+            p._update_augmentation()
+            t._set_root(p)
+
+        left.root = right.root = None
+        return t
 
     def __repr__(self):
         return self.root.__repr__()
 
-    def preorder(self):
-        return self.root.preorder()
-
 
 def main():
     import random
@@ -107,9 +107,12 @@ You can even use aliases if you do not modify p before using the alias.
     // pp.color = RED   // ERROR - pp is now p.parent.parent
 """
 
+from bisect import bisect_left
+
+from . import cost
 from .bintree import BinaryTree
 from .rb import RBNode, RED, BLACK
-from .naive import perfect_inserter
+from .naive import build_perfect
 
 
 def is_root_or_None(node):
@@ -138,6 +141,8 @@ class TangoNode(RBNode):
         is_root (bool): True if this node is the root of an auxiliary tree.
     """
 
+    __slots__ = ('depth', 'min_depth', 'max_depth', 'is_root')
+
     def __init__(self, key,
                  data=None, parent=None, left=None, right=None, tree=None,
                  color=BLACK, bh=1,
@@ -235,6 +240,9 @@ class TangoNode(RBNode):
         parent.parent = self
         # ### End of rotation primitive ###
 
+        if cost.active is not None:
+            cost.active.rotations += 1
+
         # The following updates do not belong to the rotation primitive but
         # have to be performed after each rotation so they are included in the
         # function.
@@ -251,6 +259,10 @@ class TangoNode(RBNode):
         parent._update_depths()
         self._update_depths()
 
+        # The size and height of the subtrees in the whole tree.
+        parent._update_augmentation()
+        self._update_augmentation()
+
     # The following methods are only used as node_attributes for TreeView.
     @property
     def ir(self):   # is_root
@@ -276,64 +288,54 @@ class TangoTree(BinaryTree):
     They only support searches.
 
     Args:
-        keys (list): The static universe of keys.
+        keys (iterable): The static universe of keys.
+        data (iterable, optional): The data for each key.
     """
 
-    def __init__(self, keys):
+    def __init__(self, keys, data=None):
         super().__init__()
 
+        if data is None:
+            keys = sorted(keys)
+        else:
+            items = sorted(zip(keys, data))
+            keys = [key for key, _ in items]
+            data = [d for _, d in items]
+
         if not keys:
             raise AttributeError("No keys given")
 
-        # We want to use insert() to construct the initial tree.
-        # After that we disable insert() by setting constructed to True.
-        self.constructed = False
-
-        # Create perfect tree P (using insert()).
-        # TODO This is only a O(n log n) solution.
-        perfect_inserter(self, sorted(keys))
-        self.constructed = True
+        self._build(keys, data)
 
-        # Set min_depth and max_depth of each node.
-        def fix_depth(node, depth=0):
-            # d = min_d = max_d because each node forms its own auxiliary tree
-            # You could also invoke _update_depths() on each node.
-            if node:
-                fix_depth(node.left, depth + 1)
-                fix_depth(node.right, depth + 1)
-                node.depth = node.min_depth = node.max_depth = depth
-
-        fix_depth(self.root)
+    @classmethod
+    def from_sorted(cls, keys, data=None):
+        """
+        Build a Tango Tree from sorted keys in O(n).
 
-    def insert(self, key, data=None):
-        """A naive insert function only used to construct the tree."""
-        if self.constructed:
-            raise NotImplementedError(
-                "Original Tango Trees do not support insert")
+        Sorting already sorted keys takes linear time, so this is the same
+        as the constructor.
 
-        if self.root is None:
-            self.root = TangoNode(key, tree=self)
-            return
+        Args:
+            keys (list): A sorted list of distinct keys.
+            data (list, optional): The data for each key.
+        """
+        return cls(keys, data)
 
-        p = self.root
-        parent = None
-        is_left_child = False
+    def _build(self, keys, data=None):
+        """Create the perfect tree P of the sorted keys in O(n)."""
+        # The static universe, to tell accesses from other keys.
+        self._keys = keys
+        # Each node forms its own auxiliary tree so d = min_d = max_d.
+        self.root = build_perfect(keys, data, self._perfect_node)
+        self.root.tree = self
 
-        while p is not None:
-            if key < p.key:
-                parent = p
-                p = p.left
-                is_left_child = True
-            elif key > p.key:
-                parent = p
-                p = p.right
-                is_left_child = False
+    def _perfect_node(self, key, data, depth, height):
+        """Create a node of the perfect tree P at depth."""
+        return TangoNode(key, data, depth=depth)
 
-        p = TangoNode(key, parent=parent)
-        if is_left_child:
-            parent.left = p
-        else:
-            parent.right = p
+    def insert(self, key, data=None):
+        raise NotImplementedError(
+            "Original Tango Trees do not support insert")
 
     def search(self, key):
         """
@@ -356,13 +358,19 @@ class TangoTree(BinaryTree):
             elif p.key > key:
                 p = p.left
             else:
+                if cost.active is not None:
+                    cost.active.comparisons += 1
                 break
+            if cost.active is not None:
+                cost.active.add(moves=1, comparisons=1)
 
             # If we visit a marked node we have to modifiy the preferred paths
             # 1 Cut auxiliary tree containing the parent of p at p.min_depth-1.
             #       into a top and a bottom path.
             # 2 Join the top path with auxiliary tree rooted at p.
             if p.is_root:
+                if self._listeners:
+                    self._emit('marked', node=p, key=key)
                 depth = p.min_depth - 1
                 p = p.parent
 
@@ -391,7 +399,6 @@ class TangoTree(BinaryTree):
         # Finally set the preferred child of the access p to left.
         # 1 cut its auxiliary tree at depth p.depth
         # 2 join with preceding marked node
-        print("final cut&join")
         p = self._cut(p, p.depth)
 
         # Go down to node again.
@@ -434,9 +441,27 @@ class TangoTree(BinaryTree):
         # Search for p again to return pointer/data
         p = self._aux_go_to_root(p)
         p = self._aux_search(key, p)
-        print("Search: Found", p.key)
+        if self._listeners:
+            self._emit('access', node=p, key=key)
         return p
 
+    def _search_sorted(self, keys):
+        """
+        Access the keys of the batch one after another in sorted order.
+
+        search() is only defined for keys in the tree, so keys which are
+        not in the universe are skipped without touching the tree.
+        """
+        universe = self._keys
+        nodes = []
+        for key in keys:
+            i = bisect_left(universe, key)
+            if i < len(universe) and universe[i] == key:
+                nodes.append(self.search(key))
+            else:
+                nodes.append(None)
+        return nodes
+
     def _aux_search(self, key, root):
         """
         Search key in the auxiliary tree with the given root.
@@ -448,6 +473,8 @@ class TangoTree(BinaryTree):
         # Do an ordinary search until the next node would be a root or None.
         p = root
         while p.key != key:
+            if cost.active is not None:
+                cost.active.comparisons += 1
             if p.key < key:
                 if not is_root_or_None(p.right):
                     p = p.right
@@ -464,7 +491,11 @@ class TangoTree(BinaryTree):
                     #     key, root.key, p.key))
                     # self.view(highlight_nodes=[p])
                     return p
+            if cost.active is not None:
+                cost.active.moves += 1
 
+        if cost.active is not None:
+            cost.active.comparisons += 1
         # print("\taux_search of {} in {} successful".format(
         #     key, root.key))
         # self.view(highlight_nodes=[p])
@@ -477,8 +508,12 @@ class TangoTree(BinaryTree):
         if p is None:
             return None
 
+        moves = 0
         while not p.is_root:
             p = p.parent
+            moves += 1
+        if cost.active is not None:
+            cost.active.moves += moves
         # print("\tgoing up to", p.key)
         # self.view(highlight_nodes=[p])
         return p
@@ -590,7 +625,7 @@ class TangoTree(BinaryTree):
 
         # fix RB properties
         if p.color == RED:
-            p = TangoTree._insert_fixup(p)
+            p = TangoTree._insert_fixup(p, parent_key)
             # p moves only up as it does if we go to root.
 
         # go up to (new) root
@@ -602,18 +637,26 @@ class TangoTree(BinaryTree):
             while p.parent.key != parent_key:
                 p = p.parent
 
-        # print("\tconcatenated")
-        # self.view(highlight_nodes=[p])
+        if self._listeners:
+            self._emit('concatenate', node=p)
         return p
 
-    def _insert_fixup(p):
+    def _insert_fixup(p, top_key=None):
         """
         Fix RB properties.
 
+        The fixup stops at the root of the auxiliary tree or below the node
+        with top_key. During a split the nodes above the subtree being
+        concatenated are no red-black tree, so we must not look at them.
+
         Returns:
             The node where fixup stops.
         """
-        while not p.is_root and p.parent.color == RED:
+        def is_top(p):
+            return p.is_root or (top_key is not None and
+                                 p.parent.key == top_key)
+
+        while not is_top(p) and p.parent.color == RED:
             # p.parent.parent exists because p.parent.color == RED
             if p.parent == p.parent.parent.left:
                 y = p.parent.parent.right       # NOTE: y is just an alias
@@ -664,7 +707,7 @@ class TangoTree(BinaryTree):
                     p.parent.rotate()
 
         # if not p.parent and p.color == RED:
-        if p.is_root and p.color == RED:
+        if is_top(p) and p.color == RED:
             p.color = BLACK
             p.bh += 1
 
@@ -710,8 +753,8 @@ class TangoTree(BinaryTree):
 
             p = p.parent
 
-        # print("\tsplit")
-        # self.view(highlight_nodes=[p])
+        if self._listeners:
+            self._emit('split', node=p)
         return p
 
     def _cut(self, p, d):
@@ -723,7 +766,6 @@ class TangoTree(BinaryTree):
             The root of the top path.
         """
         # TODO explain cutting
-        print("Cut at", p.key, "depth", d)
         p = self._aux_go_to_root(p)
 
         # l .. smalles node with depth > d
@@ -736,6 +778,8 @@ class TangoTree(BinaryTree):
         if p.max_depth <= d:
             # There is no l and no r, i.e. the interval is empty
             # we can return
+            if self._listeners:
+                self._emit('cut', node=p, depth=d)
             return p
 
         # Find l.
@@ -833,12 +877,15 @@ class TangoTree(BinaryTree):
             #        --------
             p = p.left
 
-        # else:
-        # l_pre
-        #   \
-        #   /\
-        #  /D \
-        #  ----
+        else:
+            # l_pre
+            #   \
+            #   /\
+            #  /D \   <-  r = p is in D.
+            #  ----
+            # Go up to the root of D.
+            while p.key != subtree_root_key:
+                p = p.parent
 
         # Mark root of D as new auxiliary tree.
         self._aux_set_root_mark(p, True)
@@ -853,8 +900,8 @@ class TangoTree(BinaryTree):
                 p = p.parent
             p = self._aux_concatenate(p)
 
-        print("\tCut end.")
-        self.view(highlight_nodes=[p])
+        if self._listeners:
+            self._emit('cut', node=p, depth=d)
 
         return p
 
@@ -885,8 +932,6 @@ class TangoTree(BinaryTree):
         """
         if l_pre is not None:
             p = self._aux_split(l_pre)
-            print("Split l")
-            self.view(highlight_nodes=[p])
             # we need to mark the right child as root since we want to
             # use split later
             #
@@ -898,8 +943,6 @@ class TangoTree(BinaryTree):
             subtree_root_key = p.right.key if p.right else None
         else:
             p = self._aux_go_to_root(p)
-            print("l_pre is None: no left split")
-            self.view(highlight_nodes=[p])
             subtree_root_key = p.key
         return (p, subtree_root_key)
 
@@ -912,8 +955,6 @@ class TangoTree(BinaryTree):
         """
         if r_suc is not None:
             p = self._aux_split(r_suc, subtree_root_key)
-            print("Split r")
-            self.view(highlight_nodes=[p])
             # Result
             #       l_pre
             #      / \
@@ -923,8 +964,6 @@ class TangoTree(BinaryTree):
             #   ---- /D \/E \
             #        --------
             p = p.left      # TODO check None
-            print("Interval splitted")
-            self.view(highlight_nodes=[p])
             return p
         else:
             # l_pre
@@ -933,8 +972,6 @@ class TangoTree(BinaryTree):
             #  /D \
             #  ----
             p = p.right
-            print("Interval splitted (else)")
-            self.view(highlight_nodes=[p])
             return p
 
     def _join(self, p):
@@ -945,9 +982,6 @@ class TangoTree(BinaryTree):
         Returns:
             The root of the joined auxiliary tree.
         """
-        print("Join at", p.key)
-        self.view(highlight_nodes=[p])
-
         # Normalize p. We are now at the root of an bottom path.
         p = self._aux_go_to_root(p)
 
@@ -1023,8 +1057,8 @@ class TangoTree(BinaryTree):
                 p = p.parent
             p = self._aux_concatenate(p)
 
-        print("\tJoin end.")
-        self.view(highlight_nodes=[p])
+        if self._listeners:
+            self._emit('join', node=p)
 
         return p
 
@@ -1052,9 +1086,8 @@ class TangoTree(BinaryTree):
             else:
                 p = p.right
 
-
-        print("\tSet root to", mark)
-        self.view(highlight_nodes=[p])
+        if self._listeners:
+            self._emit('mark', node=p, mark=mark)
 
         return p
 
@@ -1167,12 +1200,18 @@ def node_shape(node):
 
 
 def main():
+    import logging
     from bstvis.viewer import TreeView
+    from bstvis.tree.events import EventLogger
+
+    logging.basicConfig(level=logging.DEBUG, format='%(message)s')
 
     t = TangoTree(range(12))
     tv = TreeView(t,
                   node_attributes=['d', 'min_d', 'max_d', 'bh'], width=800,
                   node_shape=node_shape)
+    t.subscribe(EventLogger())
+    t.subscribe(tv.on_event)
     tv.view()
     # t.search(4)
     # t.search(10)
@@ -1225,6 +1264,7 @@ def sample_tree():
     tv = TreeView(t,
                   node_attributes=['d', 'min_d', 'max_d'], width=800,
                   node_shape=node_shape)
+    t.subscribe(tv.on_event)
     tv.view()
     t.search(9)
     tv.view()
@@ -4,18 +4,61 @@ def set_parents(tree):
 
     Parent pointers can be inferred from the left and right pointers.
     This can be useful if you are building a tree manually.
+
+    The size and height of all subtrees are recomputed as well.
     """
     if tree is None or not hasattr(tree, 'root') or tree.root is None:
         return
 
     tree.root.tree = tree
+    tree.root.parent = None
+
+    # nodes in preorder, i.e. every node is visited before its children
+    nodes = []
+    stack = [tree.root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        for child in (node.left, node.right):
+            if child is not None:
+                child.parent = node
+                stack.append(child)
+
+    for node in reversed(nodes):
+        node._update_augmentation()
+
+
+# cache: class -> tuple of all slot names of the class and its bases
+_slot_names = {}
 
-    def set_parent(node, parent):
-        if node is None:
-            return
 
-        node.parent = parent
-        set_parent(node.left, node)
-        set_parent(node.right, node)
+def node_fields(node):
+    """
+    Returns a dict mapping field names to values of node.
+
+    This works for nodes using __slots__ (like bstvis.tree.bintree.Node) as
+    well as for nodes storing their fields in a __dict__, e.g. a subclass
+    which opted in by adding '__dict__' to its __slots__.
+
+    Node handles which compute their fields (e.g. bstvis.tree.flat.FlatNode)
+    can list the field names in a class attribute _fields.
+    """
+    cls = type(node)
+    names = _slot_names.get(cls)
+    if names is None and hasattr(cls, '_fields'):
+        names = _slot_names[cls] = tuple(cls._fields)
+    elif names is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            names.extend(name for name in slots
+                         if name not in ('__dict__', '__weakref__'))
+        names = _slot_names[cls] = tuple(names)
 
-    set_parent(tree.root, None)
+    fields = {name: getattr(node, name)
+              for name in names if hasattr(node, name)}
+    if hasattr(node, '__dict__'):
+        fields.update(node.__dict__)
+    return fields
@@ -1,2 +1,4 @@
 from .treeview import TreeView, Viewable, NodeShape
-from .treelayout import SimpleBinaryTreeLayout, SpaceEfficientBinaryTreeLayout
\ No newline at end of file
+from .treelayout import SimpleBinaryTreeLayout, SpaceEfficientBinaryTreeLayout
+from .history import SnapshotHistory
+from .render import SVGRenderer
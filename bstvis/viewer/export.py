@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Export a snapshot history as frame files or an animation.
+
+The snapshots are turned into scenes (plain data, see render.scene()) in
+this process. Formatting and writing the frames is independent per frame,
+so it is fanned out over a process pool. The results are collected in
+order with a bounded number of frames in flight, so arbitrarily long
+histories are streamed and not held in memory.
+
+The scenes can also be saved as a trace and exported later:
+
+    >>> save_trace(tv.snapshots, 'dsw.trace', frames_per_snapshot=3)
+
+    python3 -m bstvis.viewer.export dsw.trace out/ [--format svg|png]
+    python3 -m bstvis.viewer.export dsw.trace dsw.svg --format animated-svg
+    python3 -m bstvis.viewer.export dsw.trace dsw.gif --format gif
+
+GIF output needs cairosvg and Pillow.
+"""
+
+import argparse
+import io
+import itertools
+import os
+import pickle
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .render import SVGRenderer, scene, to_png, write
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# The number of frames in flight per worker.
+WINDOW = 8
+
+
+def scenes(history, frames_per_snapshot=1, node_attributes=None):
+    """
+    Generate the scene of every frame of a snapshot history.
+
+    Args:
+        history (SnapshotHistory): The snapshots.
+        frames_per_snapshot (int, optional): Animate the change to each
+            snapshot with this many frames, default 1, i.e. no animation.
+        node_attributes (list, optional): names of the viewed attributes of
+            the snapshots, default [].
+    """
+    for i in range(len(history)):
+        old_snapshot = dict(history.header(max(i - 1, 0)))
+        snapshot, changed = history.seek(i)
+        old_snapshot['nodes'] = {node: entry
+                                 for node, entry in changed.items()
+                                 if entry is not None and i > 0}
+        for frame in range(1, frames_per_snapshot + 1):
+            yield scene(snapshot, old_snapshot, frame/frames_per_snapshot,
+                        node_attributes)
+
+
+def save_trace(history, path, frames_per_snapshot=1, node_attributes=None):
+    """
+    Save the scenes of a snapshot history to a file (see scenes()).
+
+    Returns:
+        int: The number of frames.
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        for s in scenes(history, frames_per_snapshot, node_attributes):
+            pickle.dump(s, f, pickle.HIGHEST_PROTOCOL)
+            count += 1
+    return count
+
+
+def load_trace(path):
+    """Generate the scenes of a trace saved with save_trace()."""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _ordered(function, jobs, workers):
+    """
+    Generate function(*job) for each job in order.
+
+    With more than one worker the calls run in a process pool with at most
+    WINDOW jobs per worker in flight.
+    """
+    if workers == 1:
+        for job in jobs:
+            yield function(*job)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = WINDOW * (workers or os.cpu_count() or 1)
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(function, *job))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _write_frame(renderer, s, path, fmt):
+    write(renderer.render_scene(s), path, fmt)
+    return path
+
+
+def _frame_body(renderer, s):
+    return renderer.body(s)
+
+
+def _frame_png(renderer, s):
+    return to_png(renderer.render_scene(s))
+
+
+def export_frames(scenes, directory, renderer=None, fmt='svg',
+                  prefix='frame', workers=None):
+    """
+    Write scenes to numbered files.
+
+    Args:
+        scenes (iterable): The scenes, see scenes() and load_trace().
+        directory (str): The directory for the files, created if missing.
+        renderer (SVGRenderer, optional): default SVGRenderer().
+        fmt (str, optional): 'svg' or 'png', default 'svg'.
+        prefix (str, optional): The file names are prefix00000.fmt, ...,
+            default 'frame'.
+        workers (int, optional): The number of processes, default one per
+            CPU. 1 renders in this process.
+
+    Returns:
+        list: The paths of the files in order.
+    """
+    renderer = renderer if renderer is not None else SVGRenderer()
+    os.makedirs(directory, exist_ok=True)
+    jobs = ((renderer, s,
+             os.path.join(directory, '{}{:05d}.{}'.format(prefix, i, fmt)),
+             fmt)
+            for i, s in enumerate(scenes))
+    return list(_ordered(_write_frame, jobs, workers))
+
+
+def export_animated_svg(scenes, path, renderer=None, frame_duration=0.1,
+                        workers=None):
+    """
+    Write scenes as one SVG which shows them one after another.
+
+    Every frame is a group which is visible for frame_duration seconds
+    (SMIL animation). The last frame stays visible. All scenes should have
+    the same dimensions.
+
+    Returns:
+        int: The number of frames.
+    """
+    renderer = renderer if renderer is not None else SVGRenderer()
+    scenes = iter(scenes)
+    first = next(scenes, None)
+    width, height = (first['width'], first['height']) if first else (0, 0)
+    if first is not None:
+        scenes = itertools.chain([first], scenes)
+
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(renderer.header(width, height) + '\n')
+        # A frame is written once the next one is known, so the last one
+        # can stay visible.
+        previous = None
+        for body in _ordered(_frame_body, ((renderer, s) for s in scenes),
+                             workers):
+            if previous is not None:
+                f.write(_animated_group(previous, count - 1, frame_duration,
+                                        last=False))
+            previous = body
+            count += 1
+        if previous is not None:
+            f.write(_animated_group(previous, count - 1, frame_duration,
+                                    last=True))
+        f.write('</svg>\n')
+    return count
+
+
+def _animated_group(body, i, frame_duration, last):
+    """Returns the SVG group showing frame i at its time."""
+    return ('<g visibility="hidden"><set attributeName="visibility" '
+            'to="visible" begin="{:.3f}s"{}/>\n{}\n</g>\n'.format(
+                i * frame_duration,
+                ' fill="freeze"' if last
+                else ' dur="{:.3f}s"'.format(frame_duration),
+                body))
+
+
+def export_gif(scenes, path, renderer=None, frame_duration=0.1,
+               workers=None):
+    """
+    Write scenes as an animated GIF.
+
+    Raises:
+        ImportError: If cairosvg or Pillow is not installed.
+
+    Returns:
+        int: The number of frames.
+    """
+    if Image is None:
+        raise ImportError("GIF output requires Pillow")
+
+    renderer = renderer if renderer is not None else SVGRenderer()
+    frames = (Image.open(io.BytesIO(png)) for png in _ordered(
+        _frame_png, ((renderer, s) for s in scenes), workers))
+    first = next(frames, None)
+    if first is None:
+        return 0
+
+    count = 1
+
+    def counted():
+        nonlocal count
+        for frame in frames:
+            count += 1
+            yield frame
+
+    first.save(path, save_all=True, append_images=counted(),
+               duration=int(frame_duration * 1000), loop=0)
+    return count
+
+
+FORMATS = ('svg', 'png', 'animated-svg', 'gif')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export a trace saved with save_trace().")
+    parser.add_argument('trace', help="the trace file")
+    parser.add_argument('output',
+                        help="a directory for svg and png, otherwise a file")
+    parser.add_argument('--format', choices=FORMATS, default='svg')
+    parser.add_argument('--workers', type=int, default=None,
+                        help="number of processes, default one per CPU")
+    parser.add_argument('--node-radius', type=int, default=15)
+    parser.add_argument('--font-size', type=int, default=12)
+    parser.add_argument('--frame-duration', type=float, default=0.1,
+                        help="seconds per frame of an animation")
+    args = parser.parse_args(argv)
+
+    renderer = SVGRenderer(node_radius=args.node_radius,
+                           font_size=args.font_size)
+    frames = load_trace(args.trace)
+    if args.format in ('svg', 'png'):
+        count = len(export_frames(frames, args.output, renderer, args.format,
+                                  workers=args.workers))
+    elif args.format == 'animated-svg':
+        count = export_animated_svg(frames, args.output, renderer,
+                                    args.frame_duration, args.workers)
+    else:
+        count = export_gif(frames, args.output, renderer,
+                           args.frame_duration, args.workers)
+    print("{} frames".format(count))
+
+
+if __name__ == '__main__':
+    main()
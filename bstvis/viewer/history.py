@@ -0,0 +1,140 @@
+"""
+Delta-encoded history of the snapshots of a TreeView.
+
+A snapshot (see TreeView._create_snapshot) maps every node to an entry
+(position, node fields, viewed attributes, shape). Between two views usually
+only a few entries change, so the history stores each snapshot as the delta
+to its predecessor and a full copy of the nodes (a keyframe) only once the
+deltas since the last keyframe add up to the size of a snapshot. Then the
+keyframes take at most as much memory as the deltas.
+
+The history keeps a cursor with the nodes of one snapshot. seek() moves it
+by applying the deltas forward or backward, so stepping to the previous or
+next snapshot costs O(changed nodes). Far jumps start from the nearest
+keyframe instead.
+"""
+
+from bisect import bisect_right
+
+# The fields of a snapshot besides the nodes.
+_HEADER = ('root', 'width', 'height', 'info')
+
+
+class SnapshotHistory(object):
+
+    """
+    A list of snapshots stored as keyframes and deltas.
+
+    Indexing returns a copy of a snapshot, seek() returns the snapshot at the
+    cursor without copying.
+    """
+
+    def __init__(self):
+        # The header fields of every snapshot.
+        self._headers = []
+        # _deltas[i] maps the nodes changed from snapshot i-1 to i to
+        # (old entry, new entry). An entry is None if the node is missing.
+        self._deltas = []
+        # Index -> nodes of the snapshot, for the keyframes.
+        self._keyframes = {}
+        self._keyframe_indices = []
+        # The number of delta entries since the last keyframe.
+        self._delta_size = 0
+        # The nodes of the last appended snapshot.
+        self._last = {}
+
+        # The cursor, i.e. the nodes of snapshot _index.
+        self._index = -1
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self._headers)
+
+    def append(self, snapshot):
+        """Add a snapshot at the end. It must not be modified afterwards."""
+        nodes = snapshot['nodes']
+        last = self._last
+        delta = {}
+        for node, entry in nodes.items():
+            old = last.get(node)
+            if old != entry:
+                delta[node] = (old, entry)
+        for node, old in last.items():
+            if node not in nodes:
+                delta[node] = (old, None)
+
+        i = len(self._headers)
+        self._headers.append({name: snapshot[name] for name in _HEADER})
+        self._deltas.append(delta)
+        self._delta_size += len(delta)
+        if not self._keyframes or self._delta_size >= len(nodes):
+            self._keyframes[i] = nodes
+            self._keyframe_indices.append(i)
+            self._delta_size = 0
+        self._last = nodes
+
+    def __getitem__(self, i):
+        """Returns a copy of snapshot i."""
+        if i < 0:
+            i += len(self)
+        snapshot, _ = self.seek(i)
+        snapshot = dict(snapshot)
+        snapshot['nodes'] = dict(snapshot['nodes'])
+        return snapshot
+
+    def header(self, i):
+        """Returns the fields of snapshot i besides the nodes in O(1)."""
+        return self._headers[i]
+
+    def seek(self, i):
+        """
+        Move the cursor to snapshot i.
+
+        Returns:
+            tuple: (snapshot, changed) - the snapshot at i, whose nodes are
+                only valid until the next seek(), and a dict mapping the
+                nodes which changed since the previous position of the
+                cursor to their old entry or None if they were missing.
+        """
+        if not 0 <= i < len(self):
+            raise IndexError("Snapshot {} out of range".format(i))
+
+        changed = {}
+        nodes = self._nodes
+        keyframe = self._nearest_keyframe(i)
+        if abs(i - self._index) > i - keyframe:
+            # Starting at the keyframe is cheaper than walking there.
+            changed = dict(nodes)
+            nodes = self._nodes = dict(self._keyframes[keyframe])
+            for node in nodes:
+                changed.setdefault(node, None)
+            self._index = keyframe
+
+        while self._index < i:
+            self._index += 1
+            for node, (old, new) in self._deltas[self._index].items():
+                changed.setdefault(node, old)
+                if new is None:
+                    del nodes[node]
+                else:
+                    nodes[node] = new
+        while self._index > i:
+            for node, (old, new) in self._deltas[self._index].items():
+                changed.setdefault(node, new)
+                if old is None:
+                    del nodes[node]
+                else:
+                    nodes[node] = old
+            self._index -= 1
+
+        # Drop the nodes which changed back.
+        changed = {node: old for node, old in changed.items()
+                   if nodes.get(node) != old}
+        snapshot = dict(self._headers[i])
+        snapshot['nodes'] = nodes
+        return snapshot, changed
+
+    def _nearest_keyframe(self, i):
+        """Returns the index of the last keyframe at or before i."""
+        indices = self._keyframe_indices
+        return indices[bisect_right(indices, i) - 1]
@@ -0,0 +1,202 @@
+"""
+Headless rendering of snapshots to SVG and PNG files.
+
+The renderers only read the snapshot data (see SnapshotHistory), so they need
+neither Tk nor a display:
+
+    >>> tv = TreeView(t, headless=True)
+    >>> ...                                 # run the algorithm
+    >>> tv.export('frames/')                # frames/frame00000.svg, ...
+
+A snapshot is first turned into a scene, i.e. plain data, which the
+renderer formats (see bstvis.viewer.export for batch and parallel export).
+PNG output converts the SVG with cairosvg, which is optional.
+"""
+
+import os
+from xml.sax.saxutils import escape
+
+from .style import (INFO_SPACE, NodeShape, edge_style, node_colors,
+                    node_info, position)
+
+try:
+    import cairosvg
+except ImportError:
+    cairosvg = None
+
+FORMATS = ('svg', 'png')
+
+
+def scene(snapshot, old_snapshot=None, f=1, node_attributes=None):
+    """
+    Returns what to draw for a snapshot as plain data.
+
+    A scene only contains numbers and strings, so it is cheap to pickle,
+    e.g. to render it in another process (see bstvis.viewer.export). It is
+    a dict with the following data:
+        - 'width', 'height': the dimensions of the snapshot
+        - 'edges': (x1, y1, x2, y2, color, width, dash) for each edge
+        - 'nodes': (x, y, shape name, fill, label, label color, info)
+        - 'arrows': (x, y) of each highlighted node
+
+    Args:
+        snapshot (dict): The snapshot to draw.
+        old_snapshot (dict, optional): Draw an animation frame between
+            old_snapshot and snapshot, default no animation.
+        f (float, optional): The progress of the animation in [0..1],
+            default 1.
+        node_attributes (list, optional): names of the viewed attributes of
+            the snapshot, default [].
+    """
+    if old_snapshot is None:
+        old_snapshot = {'nodes': {}}
+    names = node_attributes if node_attributes else []
+    width = snapshot['width']
+    height = snapshot['height']
+    nodes = snapshot['nodes']
+
+    def pos(node):
+        return position(node, snapshot, old_snapshot, f, width, height)
+
+    edges = []
+    scene_nodes = []
+    for node, (_, node_dict, attr, shape) in nodes.items():
+        x, y = pos(node)
+        if node != snapshot['root']:
+            edges.append((x, y) + pos(node_dict['parent']) +
+                         edge_style(node_dict))
+        fill, label_color = node_colors(node_dict)
+        scene_nodes.append((x, y, shape.name if shape else None, fill,
+                            str(node.key), label_color,
+                            node_info(names, attr)))
+
+    arrows = [pos(node)
+              for node in snapshot['info'].get('highlight_nodes', [])
+              if node in nodes]
+
+    return {'width': width, 'height': height, 'edges': edges,
+            'nodes': scene_nodes, 'arrows': arrows}
+
+
+class SVGRenderer(object):
+
+    """
+    Draw snapshots as SVG documents.
+
+    Args:
+        node_attributes (list, optional): names of the viewed attributes of
+            the snapshots, default [].
+        node_radius (int, optional): radius of the nodes in px, default 15.
+        font_size (int, optional): font size of the node labels in pt,
+            default 12.
+    """
+
+    def __init__(self, node_attributes=None, node_radius=15, font_size=12):
+        self.node_attribute_names = node_attributes if node_attributes else []
+        self.node_radius = node_radius
+        self.font_size = font_size
+
+    def render(self, snapshot, old_snapshot=None, f=1):
+        """
+        Returns the SVG of a snapshot as a string (see scene() for the
+        arguments).
+        """
+        return self.render_scene(
+            scene(snapshot, old_snapshot, f, self.node_attribute_names))
+
+    def render_scene(self, scene):
+        """Returns the SVG document of a scene as a string."""
+        return '\n'.join([self.header(scene['width'], scene['height']),
+                          self.body(scene), '</svg>\n'])
+
+    def header(self, width, height):
+        """Returns the opening svg tag with the definitions."""
+        return '\n'.join([
+            '<svg xmlns="http://www.w3.org/2000/svg" width="{}" height="{}" '
+            'font-family="Verdana">'.format(width, height),
+            '<defs><marker id="arrow" markerWidth="8" markerHeight="8" '
+            'refX="8" refY="4" orient="auto"><path d="M0,0 L8,4 L0,8 z"/>'
+            '</marker></defs>'])
+
+    def body(self, scene):
+        """Returns the SVG elements of a scene."""
+        r = self.node_radius
+        elements = ['<rect width="100%" height="100%" fill="white"/>']
+
+        for x1, y1, x2, y2, color, width, dash in scene['edges']:
+            elements.append(
+                '<line x1="{:.1f}" y1="{:.1f}" x2="{:.1f}" y2="{:.1f}" '
+                'stroke="{}" stroke-width="{}"{}/>'.format(
+                    x1, y1, x2, y2, color, width,
+                    ' stroke-dasharray="{}"'.format(
+                        ','.join(map(str, dash))) if dash else ''))
+
+        for x, y, shape, fill, label, label_color, info in scene['nodes']:
+            if shape == NodeShape.square.name:
+                elements.append(
+                    '<rect x="{:.1f}" y="{:.1f}" width="{}" height="{}" '
+                    'fill="{}" stroke="black"/>'.format(
+                        x - r, y - r, 2*r, 2*r, fill))
+            else:
+                elements.append(
+                    '<circle cx="{:.1f}" cy="{:.1f}" r="{}" fill="{}" '
+                    'stroke="black"/>'.format(x, y, r, fill))
+            elements.append(
+                '<text x="{:.1f}" y="{:.1f}" fill="{}" font-size="{}pt" '
+                'text-anchor="middle" dominant-baseline="central">{}'
+                '</text>'.format(x, y, label_color, self.font_size,
+                                 escape(label)))
+
+            # additional info next to node
+            if info:
+                lines = info.split('\n')
+                line_height = self.font_size // 2 + 2
+                top = y - (len(lines) - 1) * line_height / 2
+                elements.append(
+                    '<text x="{:.1f}" y="{:.1f}" font-size="{}pt" '
+                    'dominant-baseline="central">{}</text>'.format(
+                        x + r + INFO_SPACE, top, self.font_size // 2,
+                        ''.join('<tspan x="{:.1f}" dy="{}">{}</tspan>'.format(
+                            x + r + INFO_SPACE, line_height if i else 0,
+                            escape(line)) for i, line in enumerate(lines))))
+
+        # highlight node
+        arrow_length = 2*r
+        for x, y in scene['arrows']:
+            elements.append(
+                '<line x1="{:.1f}" y1="{:.1f}" x2="{:.1f}" y2="{:.1f}" '
+                'stroke="black" stroke-width="2" '
+                'marker-end="url(#arrow)"/>'.format(
+                    x - r - arrow_length, y, x - r, y))
+
+        return '\n'.join(elements)
+
+
+def to_png(svg):
+    """
+    Returns the PNG of an SVG document as bytes.
+
+    Raises:
+        ImportError: If cairosvg is not installed.
+    """
+    if cairosvg is None:
+        raise ImportError("PNG output requires cairosvg")
+    return cairosvg.svg2png(bytestring=svg.encode('utf-8'))
+
+
+def write(svg, path, fmt='svg'):
+    """
+    Write an SVG document to path as SVG or PNG.
+
+    Raises:
+        ImportError: If fmt is 'png' and cairosvg is not installed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError("Unknown format {}".format(fmt))
+    if fmt == 'png':
+        png = to_png(svg)
+        with open(path, 'wb') as f:
+            f.write(png)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(svg)
@@ -0,0 +1,73 @@
+"""
+How the entries of a snapshot are drawn.
+
+Shared by the Tk canvas of TreeView and the headless renderers in
+bstvis.viewer.render, so both draw the same picture of a snapshot.
+"""
+
+from enum import Enum
+
+
+class NodeShape(Enum):
+    circle = 1
+    square = 2
+
+
+# Space between a node and its info text in px.
+INFO_SPACE = 5
+
+
+def node_colors(node_dict):
+    """Returns (fill, label color) of a node given its fields."""
+    if 'color' in node_dict:
+        return node_dict['color'], 'white'
+    return 'white', 'black'
+
+
+def edge_style(node_dict):
+    """
+    Returns (color, width, dash) of the edge from a node to its parent.
+
+    dash is None for solid edges.
+    """
+    # TODO for some trees arrows are required
+    # TODO refactor tango fix
+    if 'is_root' in node_dict:
+        # tango tree quick fix:
+        # highlight preferred paths
+        if node_dict['is_root']:
+            return 'green', 1.0, (4, 4)
+        return 'blue', 2.0, None
+    return 'black', 1.0, None
+
+
+def node_info(names, values):
+    """Returns the text with the viewed attributes next to a node."""
+    return "\n".join("{}: {}".format(name, str(value))
+                     for name, value in zip(names, values))
+
+
+def position(node, snapshot, old_snapshot, f, width, height):
+    """
+    Interpolate between the old and the new position of a node.
+
+    Args:
+        node: A node of snapshot.
+        snapshot (dict): The new snapshot.
+        old_snapshot (dict): The old snapshot. Nodes which are not in it
+            do not move.
+        f (float): The progress in [0..1].
+        width, height (float): The dimensions to scale to.
+    """
+    nx, ny = snapshot['nodes'][node][0]
+    nx *= width/snapshot['width']
+    ny *= height/snapshot['height']
+
+    if node in old_snapshot['nodes']:
+        ox, oy = old_snapshot['nodes'][node][0]
+        ox *= width/old_snapshot['width']
+        oy *= height/old_snapshot['height']
+    else:
+        ox, oy = nx, ny
+
+    return (nx*f + ox*(1-f), ny*f + oy*(1-f))
@@ -63,26 +63,26 @@ class SimpleBinaryTreeLayout():
             # horizontal spacing
             def dx(depth):
                 """Returns horizontal spacing for given level:"""
-                return (width / 2) / (2 ** depth)
-
-            def pos_from_parent(node, depth, parent_pos):
-                """Recursive helper to calculate position based on parent and
-                depth."""
+                return (width / 2) * 0.5 ** depth
+
+            # Calculate the positions top down based on parent and depth.
+            # The stack contains (node, depth, parent_x, is_left_child).
+            stack = [(tree.root.right, 1, x_0, False),
+                     (tree.root.left, 1, x_0, True)]
+            while stack:
+                node, depth, parent_x, is_left_child = stack.pop()
                 if node:
                     y = y_0 + depth * dy
 
-                    if node == node.parent.left:
-                        x = parent_pos[0] - dx(depth)
+                    if is_left_child:
+                        x = parent_x - dx(depth)
                     else:
-                        x = parent_pos[0] + dx(depth)
+                        x = parent_x + dx(depth)
 
                     pos[node] = (x, y)
 
-                    pos_from_parent(node.left, depth+1, (x, y))
-                    pos_from_parent(node.right, depth+1, (x, y))
-
-            pos_from_parent(tree.root.left, 1, (x_0, y_0))
-            pos_from_parent(tree.root.right, 1, (x_0, y_0))
+                    stack.append((node.right, depth+1, x, False))
+                    stack.append((node.left, depth+1, x, True))
 
         return pos
 
@@ -133,43 +133,17 @@ class SpaceEfficientBinaryTreeLayout():
         x_0, y_0 = 0, 0
         d = 1
 
-        def _layout_subtree(p, x_0, y_0):
-            """
-            Sets the virtual position off all nodes in the subtree rooted
-            at p where (x_0, y_0) are the coordinates of the
-            top-left corner of the region allocated for this subtree.
-
-            Returns the required width and height of this region.
-            """
-            # Case 1: Empty.
-            if p is None:
-                # No space required.
-                return 0, 0
-
-            # Case 2: Leaf.
-            elif p.left is None and p.right is None:
-                pos[p] = x_0, y_0
-                # Spacing is managed by parents.
-                return 0, 0
-
-            # Case 3: Has child(ren).
-            left_width, left_height = _layout_subtree(
-                p.left,
-                x_0,
-                y_0 + d)
-
-            if p.left is None:
-                # we do not need d/2 spacing
-                x = x_0
-            else:
-                x = x_0 + left_width + d/2
-
-            pos[p] = (x, y_0)
-
-            right_width, right_height = _layout_subtree(
-                p.right,
-                x + d/2,
-                y_0 + d)
+        # The layout of a subtree depends on the width of its left subtree.
+        # So we first calculate the required width and height of the region
+        # allocated for each subtree bottom up:
+        #  - Empty: no space required.
+        #  - Leaf: Spacing is managed by parents.
+        #  - Has child(ren): place the subtrees next to each other with
+        #    additional d/2 spacing for each child.
+        size = {None: (0, 0)}
+        for p in tree.postorder():
+            left_width, left_height = size[p.left]
+            right_width, right_height = size[p.right]
 
             # required_width = left_width + d + right_width
             required_width = left_width + right_width
@@ -178,11 +152,32 @@ class SpaceEfficientBinaryTreeLayout():
             if p.right is not None:
                 required_width += d/2
 
-            required_height = max(left_height, right_height) + d
+            if p.left is None and p.right is None:
+                size[p] = 0, 0
+            else:
+                size[p] = (required_width,
+                           max(left_height, right_height) + d)
+
+        # Then we set the virtual position of each node top down where
+        # (x_0, y_0) are the coordinates of the top-left corner of the region
+        # allocated for the subtree rooted at p.
+        stack = [(tree.root, x_0, y_0)]
+        while stack:
+            p, x_0, y_0 = stack.pop()
+
+            if p.left is None:
+                # we do not need d/2 spacing
+                x = x_0
+            else:
+                x = x_0 + size[p.left][0] + d/2
+                stack.append((p.left, x_0, y_0 + d))
 
-            return required_width, required_height
+            pos[p] = (x, y_0)
+
+            if p.right is not None:
+                stack.append((p.right, x + d/2, y_0 + d))
 
-        total_width, total_height = _layout_subtree(tree.root, x_0, y_0)
+        total_width, total_height = size[tree.root]
 
         # Pass 2: scaling
         # map 0, 0 to margin, margin
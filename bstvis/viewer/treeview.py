@@ -1,17 +1,22 @@
-import tkinter
-from tkinter import Tk, Button, Canvas
-from tkinter.constants import YES, BOTH
 import time
 import functools
 import types
-from enum import Enum
+from .history import SnapshotHistory
+from .export import export_frames, scenes
+from .render import SVGRenderer
+from .style import (INFO_SPACE, NodeShape, edge_style, node_colors,
+                    node_info, position)
 from .treelayout import SpaceEfficientBinaryTreeLayout
+from bstvis.util import node_fields
 import sys
 
-
-class NodeShape(Enum):
-    circle = 1
-    square = 2
+# Only the window needs Tk, a headless TreeView works without it.
+try:
+    import tkinter
+    from tkinter import Tk, Button, Canvas
+    from tkinter.constants import YES, BOTH
+except ImportError:
+    tkinter = None
 
 
 class Viewable(object):
@@ -58,6 +63,11 @@ class TreeView(object):
         font_size (int, optional): font_size of node labels in pt, default 12.
         animation (bool, optional): animate between tree snapshots,
             default True.
+        delay (float, optional): continue automatically after view() has
+            shown a snapshot for delay seconds, default None, i.e. wait
+            for Continue.
+        headless (bool, optional): only record the snapshots without a
+            window, e.g. to export() them, default False.
 
     Example:
         create a binary search tree
@@ -83,7 +93,9 @@ class TreeView(object):
                  node_radius=15, node_shape=None,
                  font_size=12,
                  layout_algorithm=None,
-                 animation=True):
+                 animation=True,
+                 delay=None,
+                 headless=False):
 
         self.tree = tree
         self.node_attribute_names = node_attributes if node_attributes else []
@@ -97,6 +109,7 @@ class TreeView(object):
         else:
             self.node_shape = lambda n: NodeShape.circle
 
+        self.font_size = font_size
         self.font = ('Verdana', font_size)
         self.small_font = ('Verdana', font_size//2)
 
@@ -106,27 +119,40 @@ class TreeView(object):
             self.layout_algorithm = SpaceEfficientBinaryTreeLayout
 
         self.animation = animation
-        self.end_pause = False   # controls the display loop
-        self.redraw = False      # set to True if redraw is needed
-        # TODO cleanly implement pause (continue after delay not button press)
-        # TODO implement animation with canvas.move() for performance?
-        #   store tk-index for each node
-
-        self._createGUI()
+        self.delay = delay
+        self.redraw = False      # set to True if a redraw is scheduled
+        # The after() job of the next animation frame and the function
+        # drawing a frame of the running animation.
+        self._animation_job = None
+        self._animation_draw = None
+
+        self.headless = headless
+        if not headless:
+            if tkinter is None:
+                raise ImportError("TreeView requires tkinter, "
+                                  "use headless=True without it")
+            self._createGUI()
+        # The canvas items of each node, their NodeShape and the highlight
+        # arrows, see _update_items. Only set up after the first _view.
+        self._drawn = False
+        self._items = {}
+        self._item_shapes = {}
+        self._arrows = []
         # Set to True if you want to exit the application via sys.exit(0)
         self.exit = False
 
         # Each display() creates a snapshot of the tree.
         # A snapshot is a dict with the following data:
-        #   - 'nodes': {node: ((x,y), node.__dict__) for all nodes}
+        #   - 'nodes': {node: ((x,y), node_fields(node)) for all nodes}
         #   - 'root': tree.root
         #   - 'info': the kwargs passed to view(..), e.g. the current method of
         #       the alg
         # The display position of the nodes is saved for animation.
+        # The snapshots are stored as deltas (see SnapshotHistory).
         # TODO do we need an initial snapshot?
-        self.snapshots = [self._create_snapshot()]
+        self.snapshots = SnapshotHistory()
+        self.snapshots.append(self._create_snapshot())
         self.current_snapshot_index = 0
-        # TODO (low priority) do incremental versions :)
 
         # provide self.view(**kwargs)
         if isinstance(tree, Viewable):
@@ -139,9 +165,12 @@ class TreeView(object):
         # main window
         self.window = Tk()
         self.window.bind('<Configure>', self._resize_callback)
+        self.window.protocol('WM_DELETE_WINDOW', self._close_callback)
         self.canvas = Canvas(self.window, width=self.width, height=self.height,
                              highlightthickness=0)
         self.canvas.pack(expand=YES, fill=BOTH)
+        # view() waits until Continue sets this variable.
+        self._continue = tkinter.BooleanVar(self.window, False)
 
         # controls
         self.continue_button = Button(
@@ -167,7 +196,7 @@ class TreeView(object):
         self.window.bind('<n>', lambda e: self.next_button.invoke())
 
     def _continue_callback(self, event=None):
-        self.end_pause = True   # exit the event loop
+        self._continue.set(True)    # exit the event loop
 
     def _previous_callback(self, event=None):
         self._view(self.current_snapshot_index - 1)
@@ -176,16 +205,23 @@ class TreeView(object):
         self._view(self.current_snapshot_index + 1)
 
     def _close_callback(self, event=None):
-        self.window.destroy()      # TODO or use destroy() (quit kills tcl)
         self.exit = True
+        self._continue.set(True)
+        self.window.destroy()      # TODO or use destroy() (quit kills tcl)
 
     def _resize_callback(self, event):
-        if self.width != self.canvas.winfo_width():
+        if (self.width, self.height) != (self.canvas.winfo_width(),
+                                         self.canvas.winfo_height()):
             self.width = self.canvas.winfo_width()
-            self.redraw = True
-        if self.height != self.canvas.winfo_height():
             self.height = self.canvas.winfo_height()
-            self.redraw = True
+            # Redraw once after all pending resize events.
+            if not self.redraw:
+                self.redraw = True
+                self.window.after_idle(self._redraw_callback)
+
+    def _redraw_callback(self):
+        self.redraw = False
+        self._view()
 
     def _create_snapshot(self):
         snapshot = {
@@ -203,11 +239,8 @@ class TreeView(object):
             # save other attributes
             snapshot['nodes'][node] = (
                 position,
-                # TODO is using __dict__ save
-                # or is a more advanced solution necessary? e.g.
-                #   inspect (see also vars(), dir())
-                #   or even use pickle
-                node.__dict__.copy(),
+                # Nodes use __slots__ so we can not simply copy __dict__.
+                node_fields(node),
                 [getattr(node, name) for name in self.node_attribute_names],
                 self.node_shape(node)
             )
@@ -226,180 +259,235 @@ class TreeView(object):
         snapshot = self._create_snapshot()
         snapshot['info'] = kwargs
         self.snapshots.append(snapshot)
+        if self.headless:
+            self.current_snapshot_index = len(self.snapshots) - 1
+            return
 
         # display the new snapshot and enter the event loop
-        # start = time.time()
         self._view(len(self.snapshots) - 1)
         self._pause_until_continue()
-        # duration = time.time() - start
-        # if wait:
-        #    self._pause_until_continue()
-        # elif pause > duration:
-        #    time.sleep(pause - duration)
+
+    def on_event(self, tree, event, payload):
+        """
+        View the tree after an event of the tree, highlighting the node of
+        the event. Subscribe it with tree.subscribe(viewer.on_event).
+        """
+        node = payload.get('node')
+        self.view(method=event,
+                  highlight_nodes=[node] if node is not None else [])
 
     def _view(self, new_snapshot_index=None):
-        if new_snapshot_index is None:
-            # redraw
+        redraw = new_snapshot_index is None
+        # Jump to the end of a running animation.
+        self._finish_animation()
+        if redraw:
             new_snapshot_index = self.current_snapshot_index
-            pass
         elif new_snapshot_index == self.current_snapshot_index \
                 or new_snapshot_index < 0 \
                 or new_snapshot_index >= len(self.snapshots):
             # nothing new
             return
 
-        old_snapshot = self.snapshots[self.current_snapshot_index]
-        new_snapshot = self.snapshots[new_snapshot_index]
+        # Only the nodes which changed are in old_snapshot['nodes'], the
+        # others did not move.
+        old_snapshot = self.snapshots.seek(self.current_snapshot_index)[0]
+        new_snapshot, changed = self.snapshots.seek(new_snapshot_index)
+        old_snapshot['nodes'] = {node: entry
+                                 for node, entry in changed.items()
+                                 if entry is not None}
         self.current_snapshot_index = new_snapshot_index
+        nodes = new_snapshot['nodes']
 
-        node_colors = {}
-        node_label_colors = {}
-        node_attributes = {}
-
-        for node, (pos, node_dict, attr, shape) \
-                in new_snapshot['nodes'].items():
-
-            node_attributes[node] = attr
-            try:
-                node_colors[node] = node_dict['color']
-                node_label_colors[node] = 'white'
-            except KeyError:
-                node_colors[node] = 'white'
-                node_label_colors[node] = 'black'
+        # The canvas items are kept between snapshots, only the items of
+        # changed nodes are updated (retained mode).
+        if redraw or not self._drawn:
+            self._drawn = True
+            self.canvas.delete(tkinter.ALL)
+            self._items = {}
+            self._item_shapes = {}
+            self._arrows = []
+            affected = set(nodes)
+        else:
+            affected = set(changed)
+            # The edges of the children of a moved node move as well.
+            for node in changed:
+                if node in nodes:
+                    fields = nodes[node][1]
+                    for child in (fields.get('left'), fields.get('right')):
+                        if child in nodes:
+                            affected.add(child)
+
+        for node in affected:
+            if node in nodes:
+                self._update_items(node, new_snapshot)
+            elif node in self._items:
+                self._delete_items(node)
+        self.canvas.tag_lower('edge')
+
+        for arrow in self._arrows:
+            self.canvas.delete(arrow)
+        highlight_nodes = [node for node in
+                           new_snapshot['info'].get('highlight_nodes', [])
+                           if node in nodes]
+        self._arrows = [self.canvas.create_line(0, 0, 0, 0, arrow='last',
+                                                width=2)
+                        for node in highlight_nodes]
 
         def currentPos(node, f):
             # interpolate between old and new pos of a node in new_snapshot
-            # where f is in [0..1]
-            nx, ny = new_snapshot['nodes'][node][0]
-            # scale to window dimensions
-            nx *= self.width/new_snapshot['width']
-            ny *= self.height/new_snapshot['height']
-
-            if node in old_snapshot['nodes']:
-                ox, oy = old_snapshot['nodes'][node][0]
-                ox *= self.width/old_snapshot['width']
-                oy *= self.height/old_snapshot['height']
-            else:
-                ox, oy = nx, ny
+            # where f is in [0..1], scaled to window dimensions
+            return position(node, new_snapshot, old_snapshot, f,
+                            self.width, self.height)
 
-            return (nx*f + ox*(1-f), ny*f + oy*(1-f))
+        moving = [node for node in affected if node in nodes]
 
         def draw(f=1):
-            self.canvas.delete(tkinter.ALL)
-            # TODO use self.canvas.move(item, dx, dy)
-
-            # edges
-            for node in new_snapshot['nodes']:
-                if node != new_snapshot['root']:
-                    # has parent
-                    # TODO for some trees arrows are required
-                    # TODO refactor tango fix
-                    if 'is_root' in new_snapshot['nodes'][node][1]:
-                        # tango tree quick fix:
-                        # highlight preferred paths
-                        if new_snapshot['nodes'][node][1]['is_root']:
-                            color = 'green'
-                            width = 1.0
-                            dash = (4, 4)
-                        else:
-                            color = 'blue'
-                            width = 2.0
-                            dash = None
-
-                        self.canvas.create_line(
-                            currentPos(node, f),
-                            currentPos(
-                                new_snapshot['nodes'][node][1]['parent'],
-                                f),
-                            fill=color,
-                            width=width,
-                            dash=dash
-                        )
-                    else:
-                        # other trees
-                        self.canvas.create_line(
-                            currentPos(node, f),
-                            currentPos(
-                                new_snapshot['nodes'][node][1]['parent'], f)
-                            )
-
-            # nodes
-            for node in new_snapshot['nodes']:
-                (x, y) = currentPos(node, f)
-                r = self.node_radius
-                shape = new_snapshot['nodes'][node][3]
-
-                if shape is NodeShape.circle:
-                    self.canvas.create_oval(    # node outline: circle
-                        x - r, y - r, x + r, y + r,
-                        fill=node_colors[node])
-                elif shape is NodeShape.square:
-                    self.canvas.create_rectangle(    # node outline: circle
-                        x - r, y - r, x + r, y + r,
-                        fill=node_colors[node])
-                self.canvas.create_text(    # node label: key
-                    x, y,
-                    text=str(node.key),
-                    fill=node_label_colors[node],
-                    font=self.font)
-
-                # additional info next to node
-                info_space = 5  # TODO setting
-                info = "\n".join(
-                    "{}: {}".format(name, str(value))
-                        for name, value in zip(
-                            self.node_attribute_names, node_attributes[node])
-                    )
-
-                self.canvas.create_text(
-                    x + self.node_radius + info_space, y,
-                    text=info,
-                    fill="black",
-                    font=self.small_font,
-                    anchor=tkinter.W)
-
-            # additional info
+            r = self.node_radius
+            for node in moving:
+                x, y = currentPos(node, f)
+                items = self._items[node]
+                if 'edge' in items:
+                    parent = nodes[node][1]['parent']
+                    self.canvas.coords(items['edge'],
+                                       x, y, *currentPos(parent, f))
+                self.canvas.coords(items['shape'], x - r, y - r, x + r, y + r)
+                self.canvas.coords(items['label'], x, y)
+                self.canvas.coords(items['info'], x + r + INFO_SPACE, y)
+
             # highlight node
-            highlight_nodes = new_snapshot['info'].get('highlight_nodes', [])
             arrow_length = 2*self.node_radius   # TODO setting
-            for node in highlight_nodes:
-                if node in new_snapshot['nodes']:
-                    x, y = currentPos(node, f)
-                    self.canvas.create_line(    # a arrow to the node
-                        x - self.node_radius - arrow_length, y,
-                        x - self.node_radius, y,
-                        arrow='last',
-                        width=2)
-
-            self.canvas.update()
-
-        if self.animation:
-            anim_duration = 0.1
-            FPS = 30
-            total_frames = int(max(anim_duration * FPS, 1))
-            start = time.time()
-
-            for frame in range(1, total_frames+1):
-                f = frame/total_frames
-                draw(f)
-                time_to_pause = max(0, anim_duration*f - (time.time() - start))
-                time.sleep(time_to_pause)
-
+            for arrow, node in zip(self._arrows, highlight_nodes):
+                x, y = currentPos(node, f)
+                self.canvas.coords(    # a arrow to the node
+                    arrow,
+                    x - self.node_radius - arrow_length, y,
+                    x - self.node_radius, y)
+
+        if self.animation and old_snapshot['nodes']:
+            self._animate(draw)
         else:
             draw()
 
+    def _animate(self, draw, duration=0.1, fps=30):
+        """
+        Run an animation in the event loop.
+
+        Every frame draws the progress by the time it is drawn, so frames
+        are dropped if drawing is slow instead of slowing down the
+        animation.
+
+        Args:
+            draw (function): (f) -> None drawing the frame at progress f in
+                [0..1].
+        """
+        start = time.time()
+        self._animation_draw = draw
+
+        def frame():
+            f = min(1, (time.time() - start) / duration)
+            draw(f)
+            if f < 1:
+                self._animation_job = self.window.after(1000 // fps, frame)
+            else:
+                self._animation_job = None
+                self._animation_draw = None
+
+        frame()
+
+    def _finish_animation(self):
+        """Draw the last frame of a running animation."""
+        if self._animation_job is not None:
+            self.window.after_cancel(self._animation_job)
+            self._animation_job = None
+            self._animation_draw(1)
+            self._animation_draw = None
+
+    def _update_items(self, node, snapshot):
+        """
+        Create or reconfigure the canvas items of a node in snapshot.
+
+        The items are positioned by _view. They are stored in
+        self._items[node] as a dict with the keys 'edge' (if the node has a
+        parent), 'shape', 'label' and 'info'.
+        """
+        _, node_dict, attr, shape = snapshot['nodes'][node]
+        items = self._items.get(node)
+        if items is not None and (
+                self._item_shapes[node] is not shape
+                or ('edge' in items) != (node != snapshot['root'])):
+            self._delete_items(node)
+            items = None
+        if items is None:
+            items = {}
+            self._item_shapes[node] = shape
+            if node != snapshot['root']:
+                items['edge'] = self.canvas.create_line(0, 0, 0, 0,
+                                                        tags='edge')
+            if shape is NodeShape.square:
+                items['shape'] = self.canvas.create_rectangle(0, 0, 0, 0)
+            else:
+                items['shape'] = self.canvas.create_oval(0, 0, 0, 0)
+            items['label'] = self.canvas.create_text(
+                0, 0, text=str(node.key), font=self.font)
+            items['info'] = self.canvas.create_text(
+                0, 0, fill="black", font=self.small_font, anchor=tkinter.W)
+            self._items[node] = items
+
+        node_color, node_label_color = node_colors(node_dict)
+        self.canvas.itemconfig(items['shape'], fill=node_color)
+        self.canvas.itemconfig(items['label'], fill=node_label_color)
+
+        # additional info next to node
+        self.canvas.itemconfig(
+            items['info'], text=node_info(self.node_attribute_names, attr))
+
+        if 'edge' in items:
+            color, width, dash = edge_style(node_dict)
+            self.canvas.itemconfig(items['edge'], fill=color, width=width,
+                                   dash=dash if dash else '')
+
+    def export(self, directory, fmt='svg', frames_per_snapshot=1,
+               prefix='frame', workers=None):
+        """
+        Render all snapshots to numbered files without a window.
+
+        See bstvis.viewer.export.export_frames() for the arguments.
+
+        Returns:
+            list: The paths of the files.
+        """
+        renderer = SVGRenderer(self.node_attribute_names, self.node_radius,
+                               self.font_size)
+        frames = scenes(self.snapshots, frames_per_snapshot,
+                        self.node_attribute_names)
+        return export_frames(frames, directory, renderer, fmt, prefix,
+                             workers)
+
+    def _delete_items(self, node):
+        """Delete the canvas items of a node."""
+        self.canvas.delete(*self._items.pop(node).values())
+        del self._item_shapes[node]
+
     def _pause_until_continue(self):
-        """A simple event loop."""
-        self.end_pause = False
-        while not self.end_pause:
-            if self.exit:
-                sys.exit(0)
-
-            self.window.update()
-            time.sleep(0.05)
-            if self.redraw:
-                self._view()
-                self.redraw = False
+        """
+        Run the Tk event loop until Continue is pressed or the delay is
+        over.
+
+        The callbacks (buttons, animation frames, redraws) run as soon as
+        their events arrive, there is no polling.
+        """
+        if self.exit:
+            sys.exit(0)
+        self._continue.set(False)
+        job = None
+        if self.delay is not None:
+            job = self.window.after(int(self.delay * 1000),
+                                    self._continue_callback)
+        self.window.wait_variable(self._continue)
+        if self.exit:
+            sys.exit(0)
+        if job is not None:
+            self.window.after_cancel(job)
 
     # TODO view_after redesign
     def _view_after(self, f):